@@ -0,0 +1,287 @@
+import math
+from config_SimPy import *
+from context_SimPy import SimContext
+from settings_SimPy import SimConfig
+
+
+# Settings of each process type: (number of servers, jobs per server, processing time)
+STATION_SETTINGS = {
+    'Proc_Build': ('NUM_MACHINES_BUILD', 'CAPACITY_MACHINE_BUILD', 'PROC_TIME_BUILD'),
+    'Proc_Wash': ('NUM_MACHINES_WASH', 'CAPACITY_MACHINE_WASH', 'PROC_TIME_WASH'),
+    'Proc_Dry': ('NUM_MACHINES_DRY', 'CAPACITY_MACHINE_DRY', 'PROC_TIME_DRY'),
+    'Proc_Inspect': ('NUM_WORKERS_IN_INSPECT', None, 'PROC_TIME_INSPECT'),
+}
+
+# Thresholds for flagging scenarios where the approximation is poor
+HEAVY_TRAFFIC_UTILIZATION = 0.9
+MIN_CYCLES_FOR_STEADY_STATE = 10
+# Arrivals burstier than Poisson come from order bulks (D^B); the GI/G/m formula overstates their waiting
+MAX_ARRIVAL_SCV = 1.0
+# Accuracy expected of unflagged stations: |estimated - simulated waiting| within this
+# fraction of the processing time (checked by cross_validate, see main_AnalyticCalibration.py)
+WAITING_ERROR_TOLERANCE = 0.25
+
+
+def uniform_range_moments(low, high, transform=lambda value: value):
+    """Mean and variance of transform(X) for X uniform on the integers low..high"""
+    values = [transform(value) for value in range(low, high + 1)]
+    mean = sum(values) / len(values)
+    return mean, sum((value - mean) ** 2 for value in values) / len(values)
+
+
+def erlang_c(num_servers, offered_load):
+    """Probability of waiting in an M/M/m queue (offered_load = arrival rate / service rate)"""
+    if offered_load >= num_servers:
+        return 1.0
+    # Erlang B by recursion, then converted to Erlang C
+    erlang_b = 1.0
+    for servers in range(1, num_servers + 1):
+        erlang_b = offered_load * erlang_b / (servers + offered_load * erlang_b)
+    utilization = offered_load / num_servers
+    return erlang_b / (1 - utilization + utilization * erlang_b)
+
+
+def serial_line(graph):
+    """Nodes of a serial routing graph in flow order"""
+    if graph.get('item_routes'):
+        raise ValueError("Analytic estimation supports a single route for all items")
+    nodes = [graph['entry']]
+    while graph['routes'].get(nodes[-1]):
+        successors = graph['routes'][nodes[-1]]
+        if len(successors) > 1:
+            raise ValueError("Analytic estimation supports serial lines only")
+        nodes.append(successors[0])
+    return nodes
+
+
+def estimate(config=None, sim_duration=None):
+    """
+    Open queueing-network estimate of a scenario (QNA / Allen-Cunneen)
+
+    Each process is a GI/G/m station with m = servers x jobs per server
+    (batch machines are treated as parallel slots). New jobs arrive in bulk
+    with each order; rework jobs of POLICY_NUM_DEFECT_PER_JOB items re-enter
+    the line at the rework node, so the item rate is inflated by 1 / (1 - p)
+    with p = DEFECT_RATE_PROC_BUILD. Arrival variability is propagated
+    downstream with the QNA departure approximation. A station paced by the
+    previous one (constant processing times, no longer than upstream, and at
+    least as many slots; no rework merging in) never queues and gets no waiting.
+
+    Stations are flagged where the approximation is known to break down:
+      - bulk_arrivals: arrival SCV above MAX_ARRIVAL_SCV (order bulks),
+      - batch_service: machines process several jobs at once (capacity > 1),
+    besides unstable and heavy_traffic stations.
+
+    Args:
+        config (SimConfig): Settings of the scenario (default: config_SimPy)
+        sim_duration (int): Horizon used to judge whether steady state applies
+                            (default: config.SIM_TIME)
+
+    Returns:
+        dict: Per-station utilization, queue length and waiting time, job and
+              item flow times, throughput, and flags where simulation is needed
+              (per station, and for the scenario as a whole)
+    """
+    config = config if config is not None else SimConfig()
+    sim_duration = sim_duration if sim_duration is not None else config.SIM_TIME
+    graph = config.ROUTING_GRAPH
+    nodes = serial_line(graph)
+    rework_from, rework_to = next(iter(graph['rework'].items()), (None, None))
+    flags = []
+
+    # Order arrivals: one bulk of jobs every order cycle
+    cycle = config.CUST_ORDER_CYCLE
+    pallet = config.PALLET_SIZE_LIMIT
+    patients_mean, patients_var = uniform_range_moments(*config.NUM_PATIENTS_PER_ORDER_RANGE)
+    items_range = config.NUM_ITEMS_PER_PATIENT_RANGE
+    items_mean, _ = uniform_range_moments(*items_range)
+    jobs_mean, jobs_var = uniform_range_moments(*items_range, lambda items: math.ceil(items / pallet))
+    bulk_mean = patients_mean * jobs_mean
+    bulk_var = patients_mean * jobs_var + patients_var * jobs_mean ** 2
+    bulk_scv = bulk_var / bulk_mean ** 2
+
+    new_job_rate = bulk_mean / cycle
+    new_item_rate = patients_mean * items_mean / cycle
+    # Deterministic order cycle; a bulk of b jobs adds b - 1 (heuristic for D^B arrivals)
+    new_job_scv = bulk_mean * bulk_scv + (bulk_mean - 1)
+    if sim_duration < MIN_CYCLES_FOR_STEADY_STATE * cycle:
+        flags.append('short_horizon')
+
+    # Rework feedback
+    defect_rate = config.DEFECT_RATE_PROC_BUILD
+    rework_batch = config.POLICY_NUM_DEFECT_PER_JOB
+    if defect_rate >= 1:
+        raise ValueError("DEFECT_RATE_PROC_BUILD must be below 1")
+    defect_item_rate = new_item_rate * defect_rate / (1 - defect_rate)
+    rework_job_rate = defect_item_rate / rework_batch if rework_to else 0.0
+
+    # Waiting in the rework pool for a full batch, capped by aging
+    pool_wait = (rework_batch - 1) / (2 * defect_item_rate) if defect_item_rate > 0 else 0.0
+    max_age = config.REWORK_MAX_AGE
+    if max_age is not None and pool_wait > max_age:
+        pool_wait = max_age
+        flags.append('rework_aging')
+
+    stations = {}
+    in_rework_loop = False
+    arrival_scv = new_job_scv
+    upstream = None
+    for node in nodes:
+        process_type = graph['nodes'][node]
+        servers_name, capacity_name, time_name = STATION_SETTINGS[process_type]
+        capacity = getattr(config, capacity_name) if capacity_name else 1
+        servers = getattr(config, servers_name) * capacity
+        service_time = getattr(config, time_name)
+        service_scv = 0.0  # Deterministic processing times
+        paced = (upstream is not None and node != rework_to and not upstream['random_service']
+                 and process_type not in config.PROC_TIME_DISTRIBUTIONS
+                 and service_time <= upstream['service_time'] and servers >= upstream['servers'])
+
+        if node == rework_to:
+            in_rework_loop = True
+            # Superposition of new jobs and (roughly Poisson) rework jobs
+            total_rate = new_job_rate + rework_job_rate
+            arrival_scv = (new_job_rate * arrival_scv + rework_job_rate * 1.0) / total_rate
+        arrival_rate = new_job_rate + (rework_job_rate if in_rework_loop else 0.0)
+
+        offered_load = arrival_rate * service_time
+        utilization = offered_load / servers
+        station_flags = []
+        if utilization >= 1:
+            station_flags.append('unstable')
+            waiting = math.inf
+        else:
+            if utilization > HEAVY_TRAFFIC_UTILIZATION:
+                station_flags.append('heavy_traffic')
+            waiting = 0.0 if paced else (erlang_c(servers, offered_load) * service_time
+                                         / (servers - offered_load) * (arrival_scv + service_scv) / 2)
+            if arrival_scv > MAX_ARRIVAL_SCV and not paced:
+                station_flags.append('bulk_arrivals')
+        if capacity > 1:
+            station_flags.append('batch_service')
+
+        stations[node] = {
+            'servers': servers,
+            'service_time': service_time,
+            'random_service': process_type in config.PROC_TIME_DISTRIBUTIONS,
+            'arrival_rate': arrival_rate,
+            'utilization': utilization,
+            'waiting_time': waiting,
+            'queue_length': arrival_rate * waiting,
+            'flow_time': waiting + service_time,
+            'arrival_scv': arrival_scv,
+            'flags': station_flags,
+            'needs_simulation': bool(station_flags),
+        }
+        flags.extend(f"{node}:{flag}" for flag in station_flags)
+
+        # QNA departure variability feeds the next station
+        rho = min(utilization, 1.0)
+        arrival_scv = (1 + (1 - rho ** 2) * (arrival_scv - 1)
+                       + rho ** 2 * (service_scv - 1) / math.sqrt(servers))
+
+        if node == rework_from:
+            in_rework_loop = False
+        upstream = stations[node]
+
+    job_flow_time = sum(station['flow_time'] for station in stations.values())
+    loop_flow_time = 0.0
+    if rework_to:
+        loop_nodes = nodes[nodes.index(rework_to):nodes.index(rework_from) + 1]
+        loop_flow_time = sum(stations[node]['flow_time'] for node in loop_nodes)
+    item_flow_time = job_flow_time + defect_rate / (1 - defect_rate) * (pool_wait + loop_flow_time)
+
+    stable = all(station['utilization'] < 1 for station in stations.values())
+    return {
+        'stations': stations,
+        'job_flow_time': job_flow_time,
+        'item_flow_time': item_flow_time,
+        'rework_pool_wait': pool_wait,
+        'throughput_items_per_day': new_item_rate * 24 * 60 if stable else math.nan,
+        'flags': flags,
+        'needs_simulation': bool(flags),
+    }
+
+
+class StationMonitor:
+    """
+    Measures per-process waiting time and utilization of a simulation run through hooks
+
+    Attributes:
+        waiting (dict): Total waiting time per process name
+        started (dict): Number of started jobs per process name
+        busy (dict): Total slot-time of started jobs per process name
+    """
+
+    def __init__(self):
+        self.waiting = {}
+        self.started = {}
+        self.busy = {}
+
+    def attach(self, hooks):
+        hooks.subscribe('job_start', self.on_job_start)
+
+    def on_job_start(self, process, processor_resource, jobs):
+        name = process.name_process
+        for job in jobs:
+            self.waiting[name] = self.waiting.get(name, 0) + job.time_waiting_end - job.time_waiting_start
+        self.started[name] = self.started.get(name, 0) + len(jobs)
+        self.busy[name] = self.busy.get(name, 0) + len(jobs) * processor_resource.processing_time
+
+
+def simulate_stations(config=None, seed=RANDOM_SEED, replication=0, sim_duration=SIM_TIME):
+    """Simulated utilization and average waiting time of each node"""
+    monitor = StationMonitor()
+    context = SimContext(config, seed, replication)
+    monitor.attach(context.hooks)
+    manager = context.build(horizon=sim_duration).manager
+    context.run(sim_duration)
+
+    results = {}
+    for node, proc in manager.processes.items():
+        slots = sum(res.capacity for res in proc.processor_resources.values())
+        name = proc.name_process
+        started = monitor.started.get(name, 0)
+        results[node] = {
+            'utilization': min(monitor.busy.get(name, 0), slots * sim_duration) / (slots * sim_duration),
+            'waiting_time': monitor.waiting.get(name, 0) / started if started else 0.0,
+        }
+    return results
+
+
+def cross_validate(points, num_replications=3, seed=RANDOM_SEED, sim_duration=SIM_TIME):
+    """
+    Compare analytic estimates with simulation
+
+    Args:
+        points (list): Scenario overrides
+        num_replications (int): Replications per scenario
+
+    Returns:
+        list: One row per scenario and node with analytic and simulated
+              utilization and waiting time, the waiting error as a fraction
+              of the processing time, whether it is within
+              WAITING_ERROR_TOLERANCE, and the flags of the station
+    """
+    rows = []
+    for params in points:
+        config = SimConfig(params)
+        analytic = estimate(config, sim_duration)
+        runs = [simulate_stations(config, seed, replication, sim_duration)
+                for replication in range(num_replications)]
+        for node, station in analytic['stations'].items():
+            sim_waiting_time = sum(run[node]['waiting_time'] for run in runs) / num_replications
+            waiting_error = (station['waiting_time'] - sim_waiting_time) / station['service_time']
+            rows.append({
+                'params': params,
+                'node': node,
+                'utilization': station['utilization'],
+                'sim_utilization': sum(run[node]['utilization'] for run in runs) / num_replications,
+                'waiting_time': station['waiting_time'],
+                'sim_waiting_time': sim_waiting_time,
+                'waiting_error': waiting_error,
+                'within_tolerance': abs(waiting_error) <= WAITING_ERROR_TOLERANCE,
+                'flags': station['flags'],
+                'needs_simulation': station['needs_simulation'],
+            })
+    return rows
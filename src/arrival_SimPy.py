@@ -0,0 +1,181 @@
+import numpy as np
+from config_SimPy import *
+from base_Customer import Customer, Order
+from settings_SimPy import SimConfig
+
+
+class FixedCycleArrivals:
+    """Orders arrive every `cycle` minutes starting at time 0 (same as Customer)"""
+
+    def __init__(self, cycle=CUST_ORDER_CYCLE):
+        self.cycle = cycle
+
+    def sample_times(self, rng, horizon):
+        return np.arange(0, horizon, self.cycle, dtype=float)
+
+
+class PoissonArrivals:
+    """Homogeneous Poisson arrivals with `rate` orders per minute"""
+
+    def __init__(self, rate=CUST_ORDER_RATE):
+        self.rate = rate
+
+    def sample_times(self, rng, horizon):
+        return poisson_times(rng, self.rate, horizon)
+
+
+class NonHomogeneousPoissonArrivals:
+    """
+    Poisson arrivals with a daily and weekly rate profile, sampled by thinning
+
+    The rate at time t is rate * daily_profile[hour of day] * weekly_profile[day of week].
+
+    Attributes:
+        rate (float): Base arrival rate (unit: orders per minute)
+        daily_profile (np.ndarray): Relative rate for each of the 24 hours
+        weekly_profile (np.ndarray): Relative rate for each of the 7 days
+    """
+
+    def __init__(self, rate=CUST_ORDER_RATE, daily_profile=CUST_DAILY_PROFILE,
+                 weekly_profile=CUST_WEEKLY_PROFILE):
+        self.rate = rate
+        self.daily_profile = np.asarray(daily_profile, dtype=float)
+        self.weekly_profile = np.asarray(weekly_profile, dtype=float)
+
+    def rate_at(self, times):
+        """Arrival rate at each of the given times"""
+        hours = (times // 60).astype(np.int64)
+        return (self.rate * self.daily_profile[hours % 24]
+                * self.weekly_profile[(hours // 24) % 7])
+
+    def sample_times(self, rng, horizon):
+        max_rate = self.rate * self.daily_profile.max() * self.weekly_profile.max()
+        if max_rate <= 0:
+            return np.zeros(0)
+        candidates = poisson_times(rng, max_rate, horizon)
+        accept = rng.random(len(candidates)) * max_rate < self.rate_at(candidates)
+        return candidates[accept]
+
+
+class BatchArrivals:
+    """Each arrival of an underlying process releases a batch of orders at once"""
+
+    def __init__(self, arrivals, batch_size_range=CUST_BATCH_SIZE_RANGE):
+        self.arrivals = arrivals
+        self.batch_size_range = batch_size_range
+
+    def sample_times(self, rng, horizon):
+        epochs = self.arrivals.sample_times(rng, horizon)
+        batch_sizes = rng.integers(
+            *self.batch_size_range, size=len(epochs), endpoint=True)
+        return np.repeat(epochs, batch_sizes)
+
+
+def poisson_times(rng, rate, horizon):
+    """Sample homogeneous Poisson arrival times in [0, horizon) in bulk"""
+    if rate <= 0:
+        return np.zeros(0)
+    expected = rate * horizon
+    chunks = []
+    last = 0.0
+    while last < horizon:
+        # Draw enough inter-arrival times to cover the horizon in one or two passes
+        size = int(expected + 4 * np.sqrt(expected) + 16)
+        times = last + np.cumsum(rng.exponential(1 / rate, size))
+        chunks.append(times)
+        last = times[-1]
+    times = np.concatenate(chunks)
+    return times[times < horizon]
+
+
+def create_arrival_process(name=None, config=None):
+    """Create an arrival process from its configuration name (CUST_ARRIVAL_PROCESS if None)"""
+    config = config if config is not None else SimConfig()
+    name = name if name is not None else config.CUST_ARRIVAL_PROCESS
+    if name == "FIXED_CYCLE":
+        return FixedCycleArrivals(config.CUST_ORDER_CYCLE)
+    if name == "POISSON":
+        return PoissonArrivals(config.CUST_ORDER_RATE)
+    if name == "NHPP":
+        return NonHomogeneousPoissonArrivals(
+            config.CUST_ORDER_RATE, config.CUST_DAILY_PROFILE, config.CUST_WEEKLY_PROFILE)
+    if name == "BATCH_POISSON":
+        return BatchArrivals(PoissonArrivals(config.CUST_ORDER_RATE), config.CUST_BATCH_SIZE_RANGE)
+    raise ValueError(f"Unknown arrival process: {name}")
+
+
+class OrderPlan:
+    """
+    Arrival times and order contents for a whole horizon, stored as flat arrays
+
+    Attributes:
+        times (np.ndarray): Release time of each order
+        num_patients (np.ndarray): Number of patients of each order
+        patient_offsets (np.ndarray): Start index of each order in items_per_patient
+        items_per_patient (np.ndarray): Number of items of each patient (all orders)
+    """
+
+    def __init__(self, times, num_patients, items_per_patient):
+        self.times = times
+        self.num_patients = num_patients
+        self.patient_offsets = np.concatenate(
+            ([0], np.cumsum(num_patients)[:-1])).astype(np.int64)
+        self.items_per_patient = items_per_patient
+
+    @classmethod
+    def sample(cls, rng, arrivals, horizon, config=None):
+        """Sample arrival times, patient counts and item counts in bulk"""
+        config = config if config is not None else SimConfig()
+        times = arrivals.sample_times(rng, horizon)
+        num_patients = rng.integers(
+            *config.NUM_PATIENTS_PER_ORDER_RANGE, size=len(times), endpoint=True)
+        items_per_patient = rng.integers(
+            *config.NUM_ITEMS_PER_PATIENT_RANGE, size=int(num_patients.sum()), endpoint=True)
+        return cls(times, num_patients, items_per_patient)
+
+    def __len__(self):
+        return len(self.times)
+
+    def items_of_order(self, index):
+        """Item counts of the patients of the order at `index`"""
+        start = self.patient_offsets[index]
+        return self.items_per_patient[start:start + self.num_patients[index]]
+
+    @property
+    def total_items(self):
+        return int(self.items_per_patient.sum())
+
+
+class BulkCustomer(Customer):
+    """
+    Customer that samples the whole order plan up front with numpy
+
+    Orders, patients and items are only materialized when an order is released.
+
+    Attributes:
+        arrivals: Arrival process with sample_times(rng, horizon)
+        horizon (float): Sampling horizon (unit: minutes)
+        plan (OrderPlan): Sampled order plan
+    """
+
+    def __init__(self, env, order_receiver, logger, rng=None, arrivals=None, horizon=None, config=None):
+        config = config if config is not None else SimConfig()
+        self.arrivals = arrivals if arrivals is not None else create_arrival_process(config=config)
+        self.horizon = horizon if horizon is not None else config.SIM_TIME
+        self.plan = None
+        super().__init__(env, order_receiver, logger, rng, config)
+
+    def create_order(self):
+        """Release planned orders at their arrival times"""
+        self.plan = OrderPlan.sample(self.rng, self.arrivals, self.horizon, self.config)
+        times = self.plan.times
+
+        for index in range(len(self.plan)):
+            delay = times[index] - self.env.now
+            if delay > 0:
+                yield self.env.timeout(delay)
+
+            order = Order(self.env, self.get_next_order_id(), self.rng,
+                          self.plan.items_of_order(index), self.config)
+            order.time_start = self.env.now
+            self.send_order(order)
@@ -1,4 +1,6 @@
 from config_SimPy import *
+from rng_SimPy import RandomStreams
+from settings_SimPy import SimConfig
 
 class Item:
     """
@@ -11,6 +13,8 @@ class Item:
         type_item: Type of item (e.g., aligner, retainer)
         is_completed: Flag indicating if the manufacturing of the item is completed
         is_defect: Flag indicating if the item is defective
+        patient: Patient this item belongs to (None for standalone test items)
+        num_rework: Number of rework loops this item went through
     """
 
     def __init__(self, id_order, id_patient, id_item):
@@ -20,13 +24,23 @@ class Item:
         self.type_item = "aligner"  # default
         self.is_completed = False
         self.is_defect = False
+        self.patient = None
+        self.num_rework = 0
 
         self.time_completed = None  # 완료 시점 기록
 
     def check_completion(self,env):
-        """Item 완료 처리 및 완료 시간 기록"""
+        """
+        Item 완료 처리 및 완료 시간 기록
+
+        Returns:
+            bool: True if this item completed its patient
+        """
         self.is_completed = True
         self.time_completed = env.now
+        if self.patient is None:
+            return False
+        return self.patient.item_completed()
 
 
 class Patient:
@@ -40,32 +54,41 @@ class Patient:
         list_items: List of items for this patient
         is_completed: Flag indicating if the manufacturing of all items for this patient is completed
         item_counter: Counter for item IDs
+        order: Order this patient belongs to
+        num_items_remaining: Number of items not completed yet
     """
 
-    def __init__(self, env, id_order, id_patient):
+    def __init__(self, env, id_order, id_patient, rng, num_items=None, config=None):
         """
         Create a patient with the given IDs.
 
         Args:
             id_order: ID of the order this patient belongs to
             id_patient: ID of this patient
+            rng: Random number generator of the customer
+            num_items: Number of items (sampled from NUM_ITEMS_PER_PATIENT_RANGE if None)
+            config: Simulation settings (SimConfig)
         """
         self.env = env
         
         self.id_order = id_order
         self.id_patient = id_patient
-        self.num_items = NUM_ITEMS_PER_PATIENT()
+        if num_items is None:
+            num_items = (config if config is not None else SimConfig()).num_items_per_patient(rng)
+        self.num_items = num_items
         self.list_items = []
         self.is_completed = False
         self.item_counter = 1
+        self.order = None
 
-        self.time.start = env.now #환자 생성 시점
+        self.time_start = env.now #환자 생성 시점
         self.time_end = None #완료시간
         self.makespan = None #총 소요시간
 
         # Create items for this patient using the provided function
         self.list_items = self._create_items_for_patient(
             self.id_order, self.id_patient, self.num_items)
+        self.num_items_remaining = len(self.list_items)
 
     def _create_items_for_patient(self, id_order, id_patient, num_items):
         """Create items for a patient"""
@@ -73,6 +96,7 @@ class Patient:
         for _ in range(num_items):
             item_id = self._get_next_item_id()
             item = Item(id_order, id_patient, item_id)
+            item.patient = self
             items.append(item)
 
             # # Debugging
@@ -86,14 +110,26 @@ class Patient:
         self.item_counter += 1
         return item_id
 
+    def item_completed(self):
+        """
+        Count down one completed item (O(1))
+
+        Returns:
+            bool: True if this was the last remaining item of the patient
+        """
+        self.num_items_remaining -= 1
+        if self.num_items_remaining > 0:
+            return False
+
+        self.is_completed = True
+        self.time_end = self.env.now
+        self.makespan = self.time_end - self.time_start
+        if self.order is not None:
+            self.order.patient_completed()
+        return True
+
     def check_completion(self):
         """Check if all items for this patient are completed"""
-        if all(item.is_completed for item in self.list_items):
-            self.is_completed = True
-            self.time_end = max(item.time_completed for item in self.list_items if item.time_completed is not None)
-            self.makespan = self.time_end - self.time_start
-            print(f"Patient {self.id_patient} completed. Makespan: {self.makespan}")
-
         return self.is_completed
     
 
@@ -109,37 +145,59 @@ class Order:
         time_start: Start time of this order
         time_end: End time of this order
         patient_counter: Counter for patient IDs
+        num_patients_remaining: Number of patients not completed yet
+        is_completed: Flag indicating if all patients of this order are completed
+        makespan: Time from order receipt to completion
+        tardiness: Completion time beyond the due date (0 if on time)
+        config: Simulation settings (SimConfig)
 
     """
 
-    def __init__(self,env, id_order):
+    def __init__(self, env, id_order, rng, items_per_patient=None, config=None):
         """
         Create an order with the given ID.
 
         Args:
             id_order: ID of this order 
+            rng: Random number generator of the customer
+            items_per_patient: Number of items of each patient (sampled if None)
+            config: Simulation settings (SimConfig)
         """
         self.env = env
+        self.rng = rng
+        self.config = config if config is not None else SimConfig()
+        self.items_per_patient = items_per_patient
 
         self.id_order = id_order
-        self.num_patients = NUM_PATIENTS_PER_ORDER()
+        if items_per_patient is not None:
+            self.num_patients = len(items_per_patient)
+        else:
+            self.num_patients = self.config.num_patients_per_order(rng)
         self.list_patients = []
-        self.due_date = ORDER_DUE_DATE
+        self.due_date = self.config.ORDER_DUE_DATE
         self.time_start = None
         self.time_end = None
         self.patient_counter = 1
+        self.is_completed = False
+        self.makespan = None
+        self.tardiness = None
 
         # Create patients for this order using the provided function
         self.list_patients = self._create_patients_for_order(
             self.id_order, self.num_patients)
+        self.num_patients_remaining = len(self.list_patients)
 
     def _create_patients_for_order(self, id_order, num_patients):
         """Create patients for an order"""
         patients = []
-        for _ in range(num_patients):
+        for index in range(num_patients):
             patient_id = self._get_next_patient_id()
+            num_items = None
+            if self.items_per_patient is not None:
+                num_items = int(self.items_per_patient[index])
             
-            patient = Patient(id_order, patient_id)
+            patient = Patient(self.env, id_order, patient_id, self.rng, num_items, self.config)
+            patient.order = self
             patients.append(patient)
 
             ## Debugging: Print patient and item details
@@ -154,11 +212,26 @@ class Order:
         self.patient_counter += 1
         return patient_id
 
-    def check_completion(self,patient):
+    def patient_completed(self):
+        """
+        Count down one completed patient (O(1))
+
+        Returns:
+            bool: True if this was the last remaining patient of the order
+        """
+        self.num_patients_remaining -= 1
+        if self.num_patients_remaining > 0:
+            return False
+
+        self.is_completed = True
+        self.time_end = self.env.now
+        self.makespan = self.time_end - self.time_start
+        self.tardiness = max(0, self.makespan - self.due_date)
+        return True
+
+    def check_completion(self):
         """Check if all patients in this order are completed"""
-        if all(patient.check_completion() for patient in self.list_patients):
-            return True
-        return False 
+        return self.is_completed
 
 
 class Customer():
@@ -169,14 +242,18 @@ class Customer():
         env: Simulation environment
         order_receiver: Order receiver object
         logger: Logger object
+        rng: Random number generator for order contents
+        config: Simulation settings (SimConfig)
         order_counter: Counter for order IDs
         processing: Process for creating orders
     """
 
-    def __init__(self, env, order_receiver, logger):
+    def __init__(self, env, order_receiver, logger, rng=None, config=None):
         self.env = env
         self.order_receiver = order_receiver
         self.logger = logger
+        self.rng = rng if rng is not None else RandomStreams().stream("customer")
+        self.config = config if config is not None else SimConfig()
 
         # Initialize ID counters
         self.order_counter = 1
@@ -195,7 +272,7 @@ class Customer():
         while True:
             # Create a new order
             order_id = self.get_next_order_id()
-            order = Order(order_id)
+            order = Order(self.env, order_id, self.rng, config=self.config)
             order.time_start = self.env.now
 
             # # Log order creation
@@ -212,7 +289,7 @@ class Customer():
             self.send_order(order)
             
             # Wait for next order cycle
-            yield self.env.timeout(CUST_ORDER_CYCLE)
+            yield self.env.timeout(self.config.CUST_ORDER_CYCLE)
 
     def send_order(self, order):
         """Send the order to the receiver"""
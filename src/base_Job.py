@@ -15,6 +15,8 @@ class Job:
         time_waiting_end (float): Time when waiting ended
         is_reprocess (bool): Flag for reprocessed jobs
         processing_history (list): List of processing history
+        traced (bool): Flag for jobs whose history and trace records are kept
+                       (False: outside the sample of sampled tracing)
     """
 
     def __init__(self, id_job, list_items):
@@ -26,6 +28,7 @@ class Job:
         self.time_waiting_start = None
         self.time_waiting_end = None
         self.is_reprocess = False  # Flag for reprocessed jobs
+        self.traced = True  # Decided once when the job is created (see Manager.create_job)
 
         # Add processing history to track jobs across all processes
         self.processing_history = []  # Will store each process step details
@@ -39,16 +42,29 @@ class JobStore(simpy.Store):
         env (simpy.Environment): Simulation environment
         name (str): Name of the JobStore
         queue_length_history (list): Queue length
+        owner (Process): Process that owns this queue (passed to hooks)
+        hooks (HookBus): Hook bus for queue events (None if not observed)
     """
 
-    def __init__(self, env, name="JobStore"):
+    def __init__(self, env, name="JobStore", owner=None, hooks=None):
         super().__init__(env)
         self.name = name
         self.queue_length_history = []  # Track queue length history
+        self.owner = owner
+        self.hooks = hooks
 
-    def put(self, item):
-        """Add Job to Store (override)"""
+    def put(self, item, position=None):
+        """
+        Add Job to Store (override)
+
+        Args:
+            item (Job): Job to add
+            position (int): Queue index to insert at (None: end of queue)
+        """
         result = super().put(item)
+        # Store is unbounded, so the job is already appended to items
+        if position is not None and self.items[-1] is item:
+            self.items.insert(position, self.items.pop())
         # Record queue length
         self.queue_length_history.append((self._env.now, len(self.items)))
         return result
@@ -62,6 +78,8 @@ class JobStore(simpy.Store):
         def process_get(env, result):
             job = yield result
             self.queue_length_history.append((self._env.now, len(self.items)))
+            if self.hooks is not None and self.hooks.queue_get:
+                self.hooks.emit('queue_get', self.owner, job)
             return job
 
         return self._env.process(process_get(self._env, result))
@@ -1,5 +1,6 @@
 from base_Job import JobStore
 from base_Processor import ProcessorResource
+from hooks_SimPy import HookBus
 
 class Process:
     """
@@ -14,19 +15,26 @@ class Process:
         processor_resources (dict): Processor resources (Machine, Worker)
         completed_jobs (list): List of completed jobs
         next_process (Process): Next process in the flow
+        router (RoutingTable): Compiled routing table (overrides next_process when set)
+        route_index (int): Node index of this process in the routing table
+        upstream_processes (list): Processes that send jobs to this process
+        batch_wakeup_time (float): Time of the pending partial-batch wake-up (None if not scheduled)
+        hooks (HookBus): Hook bus for observing process events
         resource_trigger (simpy.Event): Resource trigger event
         job_added_trigger (simpy.Event): Job added trigger event
         process (simpy.Process): Main process execution
     """
 
-    def __init__(self, name_process, env, logger=None):
+    def __init__(self, name_process, env, logger=None, hooks=None):
         self.name_process = name_process
         self.env = env
         self.logger = logger
+        self.hooks = hooks if hooks is not None else HookBus()
         self.list_processors = []  # Processor list
 
         # Implement queue with JobStore (Inherits SimPy Store)
-        self.job_store = JobStore(env, f"{name_process}_JobStore")
+        self.job_store = JobStore(
+            env, f"{name_process}_JobStore", self, self.hooks)
 
         # Processor resource management
         self.processor_resources = {}  # {processor_id: ProcessorResource}
@@ -36,6 +44,12 @@ class Process:
 
         # Next process
         self.next_process = None
+        self.router = None
+        self.route_index = None
+        self.upstream_processes = []
+
+        # Pending wake-up for partially filled batches
+        self.batch_wakeup_time = None
 
         # Add new events
         self.resource_trigger = env.event()
@@ -51,6 +65,7 @@ class Process:
     def connect_to_next_process(self, next_process):
         """Connect directly to next process. Used for process initialization."""
         self.next_process = next_process
+        next_process.upstream_processes.append(self)
         # if self.logger:
         #     self.logger.log_event(
         #         "Process", f"Process {self.name_process} connected to {next_process.name_process}")
@@ -85,13 +100,22 @@ class Process:
         #else:
         #   print("Resource", f"Registered {processor_resource.name} | Processing time {processor_resource.processing_time} |to process {self.name_process}")
     
-    def add_to_queue(self, job):
-        """Add job to queue"""
+    def add_to_queue(self, job, position=None):
+        """
+        Add job to queue
+
+        Args:
+            job (Job): Job to add
+            position (int): Queue index to insert at (None: end of queue)
+        """
         job.time_waiting_start = self.env.now
         job.workstation["Process"] = self.name_process
 
         # Add job to JobStore
-        self.job_store.put(job)
+        self.job_store.put(job, position)
+
+        if self.hooks.queue_put:
+            self.hooks.emit('queue_put', self, job)
 
         # Trigger job added event
         self.job_added_trigger.succeed()
@@ -152,12 +176,19 @@ class Process:
 
         # Try processing with all processors
         for processor_resource in available_processors:
+            # Earlier processors may have taken every queued job
+            if self.job_store.is_empty:
+                break
             # print(
             #     f"[DEBUG] {self.name_process}: attempting to process with {processor_resource.name}")
             # Determine number of jobs to assign (up to capacity)
             remaining_capacity = processor_resource.capacity - processor_resource.count
             jobs_to_assign = []
 
+            # Hold partial batches according to batch formation policy
+            if not self.ready_to_start_batch(processor_resource, remaining_capacity):
+                continue
+
             # Assign jobs
             try:
                 for i in range(min(remaining_capacity, self.job_store.size)):
@@ -182,6 +213,76 @@ class Process:
         for processor_resource, jobs in processor_assignments:
             self.env.process(self.delay_resources(processor_resource, jobs))
 
+    def ready_to_start_batch(self, processor_resource, remaining_capacity):
+        """
+        Decide whether a multi-capacity machine starts now or holds for a fuller batch
+
+        A batch starts when the machine can be filled, when the oldest waiting job
+        has been held for batch_max_hold_time, or when no upstream process has
+        anything left to send. Otherwise a single wake-up is scheduled at the
+        hold deadline.
+
+        Args:
+            processor_resource (ProcessorResource): Candidate processor resource
+            remaining_capacity (int): Number of jobs the processor can still take
+        """
+        # Nothing to start (no wake-up needed, the next arrival triggers allocation)
+        if self.job_store.is_empty:
+            return False
+
+        hold_time = processor_resource.batch_max_hold_time
+        if hold_time is None or remaining_capacity <= 1:
+            return True
+
+        # Machine can be filled
+        if self.job_store.size >= remaining_capacity:
+            return True
+
+        # Oldest job in queue has been held long enough
+        hold_deadline = self.job_store.items[0].time_waiting_start + hold_time
+        if self.env.now >= hold_deadline:
+            return True
+
+        # Nothing more is on its way from upstream
+        if self.upstream_drained():
+            return True
+
+        self.schedule_batch_wakeup(hold_deadline)
+        return False
+
+    def upstream_drained(self):
+        """Check if all upstream processes have empty queues and idle processors"""
+        for upstream in self.upstream_processes:
+            if not upstream.is_drained():
+                return False
+        return True
+
+    def is_drained(self):
+        """Check if this process has an empty queue and idle processors"""
+        if not self.job_store.is_empty:
+            return False
+        for res in self.processor_resources.values():
+            if res.count > 0:
+                return False
+        return True
+
+    def schedule_batch_wakeup(self, wakeup_time):
+        """Schedule a re-check of held batches (at most one pending wake-up)"""
+        if self.batch_wakeup_time is not None and self.batch_wakeup_time <= wakeup_time:
+            return
+        self.batch_wakeup_time = wakeup_time
+        self.env.process(self.batch_wakeup(wakeup_time))
+
+    def batch_wakeup(self, wakeup_time):
+        """Wake the process at the hold deadline of a partial batch"""
+        yield self.env.timeout(wakeup_time - self.env.now)
+
+        # A sooner wake-up may have replaced this one
+        if self.batch_wakeup_time == wakeup_time:
+            self.batch_wakeup_time = None
+            self.resource_trigger.succeed()
+            self.resource_trigger = self.env.event()
+
     def delay_resources(self, processor_resource, jobs):
         """
         Process jobs with processor (integrated for Machine, Worker)
@@ -205,18 +306,23 @@ class Process:
             # Record job start time
             job.time_processing_start = self.env.now
 
-            # Record job processing history
-            process_step = self.create_process_step(job, processor_resource)    
-            if not hasattr(job, 'processing_history'):
-                job.processing_history = []
-            job.processing_history.append(process_step)
+            # Record job processing history (only sampled jobs under sampled tracing)
+            if job.traced:
+                process_step = self.create_process_step(job, processor_resource)
+                if not hasattr(job, 'processing_history'):
+                    job.processing_history = []
+                job.processing_history.append(process_step)
+
+        if self.hooks.job_start:
+            self.hooks.emit('job_start', self, processor_resource, jobs)
 
         # Request processor resource
         request = processor_resource.request()
         yield request
+        processor_resource.batch_sizes.append(len(jobs))
 
         # Calculate and wait for processing time
-        processing_time = processor_resource.processing_time
+        processing_time = processor_resource.next_processing_time()
         yield self.env.timeout(processing_time)
 
         # Special processing (if needed)
@@ -248,7 +354,11 @@ class Process:
             # else:
             #   print("Created process step:", process_step)   
 
-            # Send job to next process
+        if self.hooks.job_end:
+            self.hooks.emit('job_end', self, processor_resource, jobs)
+
+        # Send jobs to next process
+        for job in jobs:
             self.send_job_to_next(job)
 
         # Release resources
@@ -291,12 +401,17 @@ class Process:
 
     def send_job_to_next(self, job):
         """Send job to next process"""
-        if self.next_process:
+        if self.router is not None:
+            next_process = self.router.next_process(self, job)
+        else:
+            next_process = self.next_process
+
+        if next_process:
         # if self.logger:
         #       self.logger.log_event(
-        #           "Process Flow", f"Moving job {job.id_job} from {self.name_process} to {self.next_process.name_process}")
+        #           "Process Flow", f"Moving job {job.id_job} from {self.name_process} to {next_process.name_process}")
             # Add job to next process queue
-            self.next_process.add_to_queue(job)
+            next_process.add_to_queue(job)
             return True
         else:
             # Final process or no next process set
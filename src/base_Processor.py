@@ -46,9 +46,10 @@ class Machine:
         busy_time (int): Total time spent processing jobs
         last_status_change (int): Time of last status change
         allows_job_addition_during_processing (bool): Flag to allow job addition during processing
+        batch_max_hold_time (int): Maximum time a partial batch is held before starting (None: start immediately)
     """
 
-    def __init__(self, id_machine, name_process, name_machine, processing_time, capacity_jobs=1):
+    def __init__(self, id_machine, name_process, name_machine, processing_time, capacity_jobs=1, batch_max_hold_time=None):
         self.type_processor = "Machine"
         self.id_machine = id_machine
         self.name_process = name_process
@@ -60,6 +61,7 @@ class Machine:
         self.busy_time = 0
         self.last_status_change = 0
         self.allows_job_addition_during_processing = False
+        self.batch_max_hold_time = batch_max_hold_time
 
 
 class ProcessorResource(simpy.Resource):
@@ -73,8 +75,11 @@ class ProcessorResource(simpy.Resource):
         allows_job_addition_during_processing (bool): Flag to allow job addition during processing
         current_jobs (list): List of jobs currently being processed (Machines)
         current_job (Job): Job currently being processed (Worker)
-        processing_time (int): Time taken to process a job
+        processing_time (int): Time taken to process a job (mean if processing times vary)
+        processing_time_variates (VariateBuffer): Buffer of random processing times (None: constant)
         processing_started (bool): Flag to prevent further resource allocation after processing starts
+        batch_max_hold_time (int): Maximum hold time for a partial batch (None: start immediately)
+        batch_sizes (list): Number of jobs in each started batch (for fill-rate statistics)
 
     """
 
@@ -92,6 +97,9 @@ class ProcessorResource(simpy.Resource):
                 processor, 'allows_job_addition_during_processing', True)
             # Current jobs being processed
             self.current_jobs = []
+            # Batch formation hold time (only meaningful for multi-capacity machines)
+            self.batch_max_hold_time = getattr(
+                processor, 'batch_max_hold_time', None) if capacity > 1 else None
         elif self.processor_type == "Worker":
             capacity = 1  # Worker always processes one job at a time
             self.id = getattr(processor, 'id_worker', 0)
@@ -101,27 +109,31 @@ class ProcessorResource(simpy.Resource):
             # Current job being processed
             self.current_job = None
             self.current_jobs = []  # Added for consistency
+            self.batch_max_hold_time = None
 
         # Initialize Resource
         super().__init__(env, capacity=capacity)
 
         self.processor = processor
         self.processing_time = getattr(processor, 'processing_time', 10)
+        self.processing_time_variates = None
 
         # Flag to prevent further resource allocation after processing starts
         self.processing_started = False
 
+        # Number of jobs in each started batch
+        self.batch_sizes = []
+
     def request(self, *args, **kwargs):
         """
         Override resource request - Check if addition during processing is allowed
         """
-        # If already processing and addition not allowed, reject request
+        # If already processing and addition not allowed, reject request.
+        # Callers must check is_available first; an event that never fires would
+        # leave the requesting process suspended forever.
         if self.processing_started and not self.allows_job_addition_during_processing:
-            # Return a dummy event that mimics SimPy request but waits indefinitely
-            dummy_event = self._env.event()
-            dummy_event.callbacks.append(
-                lambda _: None)  # Add callback to set to infinite wait state
-            return dummy_event
+            raise RuntimeError(
+                f"{self.name} is already processing and does not accept additional jobs")
 
         # Set flag when job is first assigned to resource
         if not self.processing_started and self.count == 0:
@@ -157,6 +169,12 @@ class ProcessorResource(simpy.Resource):
         # Available if capacity has room
         return self.count < self.capacity  # Use count attribute instead of count()
 
+    def next_processing_time(self):
+        """Processing time of the next job or batch"""
+        if self.processing_time_variates is None:
+            return self.processing_time
+        return self.processing_time_variates.next()
+
     def start_job(self, job):
         """Process job start"""
         if self.processor_type == "Machine":
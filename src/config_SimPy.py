@@ -1,11 +1,11 @@
-import random
-
-
 """ Simulation settings """
 
 # Simulation time settings
 SIM_TIME = 7 * 24 * 60  # (unit: minutes)
 
+# Root seed for random number streams (see rng_SimPy.RandomStreams)
+RANDOM_SEED = 42
+
 # Logging and visualization settings
 EVENT_LOGGING = True  # Event logging enable/disable flag
 DETAILED_STATS_ENABLED = True  # Detailed statistics display flag
@@ -15,6 +15,23 @@ GANTT_CHART_ENABLED = False  # Gantt chart visualization enable/disable flag
 VIS_STAT_ENABLED = False  # Statistical graphs visualization enable/disable flag
 SHOW_GANTT_DEBUG = False  # 기본값은 False로 설정
 
+# Event trace recording (replay with main_Replay.py)
+TRACE_RECORDING_ENABLED = False  # Binary event trace recording enable/disable flag
+TRACE_FILE_PATH = "sim_trace.bin"  # Output path of the event trace
+# Sampled tracing (sampling_SimPy): processing histories and trace rows of a deterministic
+# sample only; manager statistics and trace event counts stay exact
+TRACE_SAMPLE_RATE = 1.0  # Fraction of jobs or orders traced in detail (1.0: all)
+TRACE_SAMPLE_UNIT = "JOB"  # Sampling unit: "JOB" (hash of id_job) or "ORDER" (whole orders)
+
+# Timeline export (Chrome trace-event JSON for chrome://tracing or ui.perfetto.dev, see timeline_SimPy)
+TIMELINE_EXPORT_ENABLED = False  # Timeline export enable/disable flag
+TIMELINE_FILE_PATH = "sim_timeline.json.gz"  # Output path (.gz: gzip-compressed)
+
+# Live view (throttled snapshots of the running simulation, see hooks_SimPy)
+LIVE_VIEW_ENABLED = False  # Live snapshot streaming enable/disable flag
+LIVE_VIEW_INTERVAL = 24 * 60  # Snapshot interval (unit: simulated minutes)
+LIVE_VIEW_FILE_PATH = "sim_live.jsonl"  # Output path of the snapshots (JSON lines)
+
 
 """ Process settings """
 
@@ -27,6 +44,13 @@ PROC_TIME_WASH = 120  # Process time for wash (unit: minutes)
 PROC_TIME_DRY = 120  # Process time for dry (unit: minutes)
 PROC_TIME_INSPECT = 120  # Process time for inspect per item (unit: minutes)
 
+# Processing time distributions per process type (variates_SimPy); types not listed use the
+# constant PROC_TIME_* above. LOGNORMAL/GAMMA keep the PROC_TIME_* mean, EMPIRICAL resamples
+# observed times, e.g. {'Proc_Build': {'type': 'LOGNORMAL', 'cv': 0.2},
+#                       'Proc_Wash': {'type': 'EMPIRICAL', 'path': 'wash_times.csv'}}
+PROC_TIME_DISTRIBUTIONS = {}
+VARIATE_BLOCK_SIZE = 4096  # Processing times sampled per buffer refill
+
 # Machine settings
 NUM_MACHINES_BUILD = 3  # Number of 3D print machines
 NUM_MACHINES_WASH = 1  # Number of wash machines
@@ -40,33 +64,88 @@ DEFECT_RATE_PROC_BUILD = 0.2  # 5% defect rate in build process
 NUM_WORKERS_IN_INSPECT = 5  # Number of workers in inspection process
 
 
+# Process routing graph (compiled by routing_SimPy.compile_routing)
+# nodes: node name -> process type, routes: node -> successors (several = alternative
+# parallel stations), item_routes: item type -> route overrides, rework: defect destination
+ROUTING_GRAPH = {
+    'nodes': {
+        'build': 'Proc_Build',
+        'wash': 'Proc_Wash',
+        'dry': 'Proc_Dry',
+        'inspect': 'Proc_Inspect',
+    },
+    'entry': 'build',
+    'routes': {
+        'build': ['wash'],
+        'wash': ['dry'],
+        'dry': ['inspect'],
+    },
+    'item_routes': {},
+    'rework': {
+        'inspect': 'build',
+    },
+}
+
+# Multi-site farm (multisite_SimPy.py)
+NUM_SITES = 3  # Number of sites, each with its own manager and processes
+# Transfer delay between sites (unit: minutes); also the synchronization window length
+SITE_TRANSFER_DELAY = 4 * 60
+# Entry queue length above which new jobs overflow to the least loaded other site
+SITE_OVERFLOW_QUEUE_LIMIT = 10
+# Site that processes all rework jobs (None: rework stays at the detecting site)
+SITE_REWORK_TARGET = None
+
+
 """ Policy settings """
 # Number of defective items to collect for rework
 POLICY_NUM_DEFECT_PER_JOB = 3
-# Policy for placing rework jobs in queue
+# Maximum time defective items wait for a full rework job before a partial one is flushed
+# (unit: minutes, None: wait for a full job)
+REWORK_MAX_AGE = 24 * 60
+# Policy for placing rework jobs in queue: "QUEUE_LAST", "QUEUE_FIRST" or "PRIORITY"
+# (PRIORITY: ahead of all new jobs, behind rework jobs already waiting)
 POLICY_REPROC_SEQ_IN_QUEUE = "QUEUE_LAST"
 # Policy for extracting jobs from queue
 POLICY_DISPATCH_FROM_QUEUE = "FIFO"
 # Policy for dividing orders into jobs: "EQUAL_SPLIT" or "MAX_PER_JOB"
 POLICY_ORDER_TO_JOB = "MAX_PER_JOB"
+# Policy for forming batches on multi-capacity machines: "IMMEDIATE" or "FULL_OR_TIMEOUT"
+# FULL_OR_TIMEOUT holds a partial batch until the machine is full, the oldest job
+# has waited BATCH_MAX_HOLD_TIME_*, or the upstream process has nothing left to send
+POLICY_BATCH_FORMATION = "IMMEDIATE"
+BATCH_MAX_HOLD_TIME_WASH = 60  # Maximum hold time for a partial wash batch (unit: minutes)
+BATCH_MAX_HOLD_TIME_DRY = 60  # Maximum hold time for a partial dry batch (unit: minutes)
 
 
 """ Customer settings """
 
-# Number of patients per order
+# Number of patients per order (uniform integer range, inclusive)
+NUM_PATIENTS_PER_ORDER_RANGE = (3, 3)
 
 
-def NUM_PATIENTS_PER_ORDER(): return random.randint(
-    3, 3)
+def NUM_PATIENTS_PER_ORDER(rng): return int(rng.integers(
+    *NUM_PATIENTS_PER_ORDER_RANGE, endpoint=True))
 
-# Number of items per patient
+# Number of items per patient (uniform integer range, inclusive)
+NUM_ITEMS_PER_PATIENT_RANGE = (5, 5)
 
 
-def NUM_ITEMS_PER_PATIENT(): return random.randint(
-    5, 5)
+def NUM_ITEMS_PER_PATIENT(rng): return int(rng.integers(
+    *NUM_ITEMS_PER_PATIENT_RANGE, endpoint=True))
 
 
 # Customer settings
 CUST_ORDER_CYCLE = 4 * 24 * 60  # Customer order cycle (1 week in minutes)
+# Order generator: "PER_ORDER" (Customer), "BULK" (arrival_SimPy.BulkCustomer)
+# or "TRACE" (orderbook_SimPy.TraceCustomer)
+CUST_ORDER_GENERATOR = "PER_ORDER"
+# Historical order book for TRACE generation (.csv, .parquet or .bin)
+CUST_ORDER_TRACE_PATH = "orders.csv"
+# Arrival process for BULK generation: "FIXED_CYCLE", "POISSON", "NHPP" or "BATCH_POISSON"
+CUST_ARRIVAL_PROCESS = "FIXED_CYCLE"
+CUST_ORDER_RATE = 1 / CUST_ORDER_CYCLE  # Mean order arrival rate (unit: orders per minute)
+CUST_DAILY_PROFILE = [1.0] * 24  # Relative arrival rate per hour of day (NHPP)
+CUST_WEEKLY_PROFILE = [1.0] * 7  # Relative arrival rate per day of week (NHPP)
+CUST_BATCH_SIZE_RANGE = (1, 3)  # Orders released together per arrival (BATCH_POISSON)
 # Order settings
 ORDER_DUE_DATE = 7 * 24 * 60  # Order due date (1 week in minutes)
\ No newline at end of file
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+import simpy
+from base_Customer import Customer
+from arrival_SimPy import BulkCustomer
+from orderbook_SimPy import TraceCustomer
+from manager import Manager
+from hooks_SimPy import HookBus
+from rng_SimPy import RandomStreams
+from settings_SimPy import SimConfig
+
+# Replication backends of run_replications
+BACKENDS = ("serial", "thread")
+
+
+class SimContext:
+    """
+    All state of one simulation run
+
+    The environment, random streams, hook bus, settings and model objects of
+    a run live here instead of in module globals, so any number of runs can
+    be built and executed side by side in one interpreter (e.g., one per
+    thread) without influencing each other.
+
+    Attributes:
+        config (SimConfig): Settings of the run
+        seed (int): Root seed of the experiment
+        replication (int): Replication index
+        env (simpy.Environment): Simulation environment
+        streams (RandomStreams): Random number streams of this replication
+        hooks (HookBus): Hook bus of the manager and all processes
+        manager (Manager): Manager (None until build)
+        customer (Customer): Order generator (None until build)
+    """
+
+    def __init__(self, config=None, seed=None, replication=0):
+        self.config = config if config is not None else SimConfig()
+        self.seed = seed if seed is not None else self.config.RANDOM_SEED
+        self.replication = replication
+        self.env = simpy.Environment()
+        self.streams = RandomStreams(self.seed, replication)
+        self.hooks = HookBus()
+        self.manager = None
+        self.customer = None
+
+    def build(self, logger=None, horizon=None):
+        """
+        Create the manager and the order generator selected by CUST_ORDER_GENERATOR
+
+        Args:
+            logger: Logger object (None: no logging)
+            horizon (float): Order sampling horizon of the BULK generator (default: SIM_TIME)
+        """
+        config = self.config
+        self.manager = self.create_manager(logger)
+        rng = self.streams.stream("customer")
+        if config.CUST_ORDER_GENERATOR == "BULK":
+            self.customer = BulkCustomer(self.env, self.manager, logger, rng,
+                                         horizon=horizon, config=config)
+        elif config.CUST_ORDER_GENERATOR == "TRACE":
+            self.customer = TraceCustomer(self.env, self.manager, logger, rng=rng, config=config)
+        else:
+            self.customer = Customer(self.env, self.manager, logger, rng, config)
+        return self
+
+    def create_manager(self, logger=None):
+        """Create the manager of the run (overridden by contexts with a specialized manager)"""
+        return Manager(self.env, logger, self.streams, self.hooks, config=self.config)
+
+    def run(self, until=None):
+        """Run the simulation until `until` (default: SIM_TIME)"""
+        self.env.run(until=until if until is not None else self.config.SIM_TIME)
+        return self
+
+    def kpis(self):
+        """Manager statistics plus throughput and WIP at the current time"""
+        kpis = self.manager.collect_statistics()
+        kpis['throughput_items_per_day'] = kpis['completed_items'] / (self.env.now / (24 * 60))
+        kpis['wip_jobs'] = sum(proc.job_store.size for proc in self.manager.processes.values())
+        return kpis
+
+
+def run_replication(config=None, seed=None, replication=0, sim_duration=None, attach=None):
+    """
+    Build and run one replication without logging and return its KPIs
+
+    Args:
+        config (SimConfig): Settings of the run (None: current config_SimPy)
+        seed (int): Root seed of the experiment (None: RANDOM_SEED)
+        replication (int): Replication index
+        sim_duration (int): Simulation duration (unit: minutes, None: SIM_TIME)
+        attach (callable): Called with the built SimContext before the run (e.g., to subscribe recorders)
+    """
+    context = SimContext(config, seed, replication)
+    sim_duration = sim_duration if sim_duration is not None else context.config.SIM_TIME
+    context.build(horizon=sim_duration)
+    if attach is not None:
+        attach(context)
+    return context.run(sim_duration).kpis()
+
+
+def run_replications(num_replications, config=None, seed=None, sim_duration=None,
+                     backend="serial", num_workers=None, attach=None):
+    """
+    Run replications 0..num_replications-1 on the selected backend
+
+    The thread backend runs replications on a ThreadPoolExecutor. Runs share
+    nothing but the read-only config, so results are identical to the serial
+    backend whatever the scheduling. Under the GIL threads mainly overlap I/O
+    of attached recorders; on a free-threaded interpreter they run in parallel.
+
+    Args:
+        backend (str): One of BACKENDS
+        num_workers (int): Threads of the thread backend (None: executor default)
+
+    Returns:
+        list: KPIs of each replication, in replication order
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend} (expected one of {BACKENDS})")
+    config = config if config is not None else SimConfig()
+
+    def run(replication):
+        return run_replication(config, seed, replication, sim_duration, attach)
+
+    if backend == "serial":
+        return [run(replication) for replication in range(num_replications)]
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(run, range(num_replications)))
@@ -0,0 +1,240 @@
+import copy
+import json
+import math
+import time
+import hashlib
+import simpy
+from base_Customer import Item
+from base_Job import Job
+from base_Process import Process
+from base_Processor import Machine, Worker
+from context_SimPy import run_replication
+from hooks_SimPy import HookBus
+from settings_SimPy import SimConfig
+from trace_SimPy import TraceRecorder, NUM_EVENT_KINDS
+from config_SimPy import *
+
+# Reference scenarios: 'line' runs the full model with setting overrides,
+# 'two_stage' the two-process validation line of main_Process
+GOLDEN_SCENARIOS = {
+    'default': {'kind': 'line', 'overrides': {}, 'replications': 3, 'sim_duration': 4 * 7 * 24 * 60},
+    'high_defect': {'kind': 'line', 'overrides': {'DEFECT_RATE_PROC_BUILD': 0.5, 'CUST_ORDER_CYCLE': 6 * 60},
+                    'replications': 3, 'sim_duration': 4 * 7 * 24 * 60},
+    'multi_capacity': {'kind': 'line',
+                       'overrides': {'CAPACITY_MACHINE_BUILD': 2, 'CAPACITY_MACHINE_WASH': 4,
+                                     'CAPACITY_MACHINE_DRY': 4, 'POLICY_BATCH_FORMATION': "FULL_OR_TIMEOUT",
+                                     'CUST_ORDER_CYCLE': 4 * 60},
+                       'replications': 3, 'sim_duration': 4 * 7 * 24 * 60},
+    'multi_machine_batch': {'kind': 'line',
+                            'overrides': {'NUM_MACHINES_WASH': 2, 'CAPACITY_MACHINE_WASH': 4,
+                                          'POLICY_BATCH_FORMATION': "FULL_OR_TIMEOUT",
+                                          'CUST_ORDER_CYCLE': 4 * 60},
+                            'replications': 3, 'sim_duration': 4 * 7 * 24 * 60},
+    'two_stage': {'kind': 'two_stage', 'replications': 1, 'sim_duration': 500},
+}
+
+
+class FingerprintRecorder(TraceRecorder):
+    """
+    TraceRecorder hashing its records instead of writing a file
+
+    The digest covers exactly the record bytes a trace file would contain,
+    so any change in the time, order or content of events changes it.
+
+    Attributes:
+        digest (hashlib.sha256): Running SHA-256 of the records
+    """
+
+    def __init__(self, env, flush_every=65536):
+        self.env = env
+        self.flush_every = flush_every
+        self.processes = []
+        self.resources = []
+        self.num_records = 0
+        self.sampler = None
+        self.event_counts = [0] * NUM_EVENT_KINDS
+        self._registered = []
+        self.digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self._buffered = 0
+
+    def flush(self):
+        if self._buffer:
+            self.digest.update(self._buffer)
+            self.num_records += self._buffered
+            self._buffer = bytearray()
+            self._buffered = 0
+
+    def close(self):
+        """Hex digest of all records"""
+        self.flush()
+        return self.digest.hexdigest()
+
+
+def run_line(spec, replication, engine=run_replication):
+    """
+    One replication of a 'line' scenario
+
+    Args:
+        engine (callable): engine(config, seed, replication, sim_duration, attach) -> KPIs,
+                           with the signature of context_SimPy.run_replication
+
+    Returns:
+        tuple: (KPIs, trace SHA-256, number of events)
+    """
+    recorder = None
+
+    def attach(context):
+        nonlocal recorder
+        recorder = FingerprintRecorder(context.env)
+        recorder.attach(context.manager)
+
+    kpis = engine(SimConfig(spec['overrides']), RANDOM_SEED, replication, spec['sim_duration'], attach)
+    return kpis, recorder.close(), recorder.num_records
+
+
+def run_two_stage(spec, replication=0, engine=None):
+    """
+    The main_Process validation line: two processes, a mixed-capacity stage and a worker
+
+    Runs on Process, JobStore and ProcessorResource directly (no manager, no
+    randomness), so the engine is not used.
+    """
+    env = simpy.Environment()
+    hooks = HookBus()
+    process_a = Process("Process_A", env, hooks=hooks)
+    process_b = Process("Process_B", env, hooks=hooks)
+    process_a.register_processor(Machine(1, "Process_A", "Machine_A1", 30, 2))
+    process_a.register_processor(Machine(2, "Process_A", "Machine_A2", 30, 1))
+    process_b.register_processor(Worker(1, "Worker_B1", 15))
+    process_a.connect_to_next_process(process_b)
+
+    recorder = FingerprintRecorder(env)
+    recorder.register_process('a', process_a)
+    recorder.register_process('b', process_b)
+    recorder.subscribe(hooks)
+
+    for id_job in range(1, 5):
+        process_a.add_to_queue(Job(id_job, [Item(0, f"patient_{id_job}", f"item_{id_job}_{index}")
+                                            for index in range(2)]))
+    env.run(until=spec['sim_duration'])
+
+    kpis = {
+        'Process_A_completed_jobs': len(process_a.completed_jobs),
+        'Process_B_completed_jobs': len(process_b.completed_jobs),
+        'last_end_time': max((job.time_processing_end for job in process_b.completed_jobs), default=None),
+        'total_duration': sum(step['duration'] for job in process_b.completed_jobs
+                              for step in job.processing_history),
+    }
+    return kpis, recorder.close(), recorder.num_records
+
+
+SCENARIO_RUNNERS = {'line': run_line, 'two_stage': run_two_stage}
+
+
+def run_catalog(scenarios=GOLDEN_SCENARIOS, engine=run_replication):
+    """
+    Run every replication of every scenario and fingerprint it
+
+    Returns:
+        dict: {scenario name: {'spec', 'runs': [{'kpis', 'trace_sha256', 'num_events'}], 'wall_time'}}
+    """
+    results = {}
+    for name, spec in scenarios.items():
+        runner = SCENARIO_RUNNERS[spec['kind']]
+        start_time = time.perf_counter()
+        runs = []
+        for replication in range(spec['replications']):
+            kpis, digest, num_events = runner(spec, replication, engine)
+            runs.append({'kpis': kpis, 'trace_sha256': digest, 'num_events': num_events})
+        results[name] = {'spec': copy.deepcopy(spec), 'runs': runs,
+                         'wall_time': time.perf_counter() - start_time}
+    return results
+
+
+def save_golden(results, path):
+    with open(path, 'w') as f:
+        json.dump({'seed': RANDOM_SEED, 'scenarios': results}, f, indent=1, sort_keys=True)
+
+
+def load_golden(path):
+    with open(path) as f:
+        return json.load(f)['scenarios']
+
+
+def kpi_equal(reference, candidate, rel_tol=0.0, abs_tol=0.0):
+    """Compare two KPI values (None and NaN only equal themselves)"""
+    if reference is None or candidate is None:
+        return reference is candidate
+    if isinstance(reference, (int, float)) and isinstance(candidate, (int, float)):
+        if math.isnan(reference) or math.isnan(candidate):
+            return math.isnan(reference) and math.isnan(candidate)
+        if rel_tol == 0.0 and abs_tol == 0.0:
+            return reference == candidate
+        return math.isclose(reference, candidate, rel_tol=rel_tol, abs_tol=abs_tol)
+    return reference == candidate
+
+
+def compare_results(golden, candidate, rel_tol=0.0, abs_tol=0.0):
+    """
+    Verdict of a candidate run of the catalog against the golden outputs
+
+    With no tolerance, KPIs and trace digests must be identical. With a
+    tolerance, KPIs must be close; traces may differ (e.g., a reordering of
+    simultaneous events) and are only reported.
+
+    Returns:
+        list: Per scenario {'scenario', 'verdict' ('identical', 'within tolerance',
+              'DIFFERENT', 'STALE' or 'MISSING'), 'differences', 'traces_identical',
+              'golden_time', 'candidate_time', 'time_ratio'}
+    """
+    report = []
+    exact = rel_tol == 0.0 and abs_tol == 0.0
+    for name, reference in golden.items():
+        row = {'scenario': name, 'differences': [], 'traces_identical': None,
+               'golden_time': reference['wall_time'], 'candidate_time': None, 'time_ratio': None}
+        report.append(row)
+        result = candidate.get(name)
+        if result is None:
+            row['verdict'] = 'MISSING'
+            continue
+        row['candidate_time'] = result['wall_time']
+        row['time_ratio'] = result['wall_time'] / reference['wall_time'] if reference['wall_time'] else None
+        if json.loads(json.dumps(result['spec'])) != reference['spec']:
+            row['verdict'] = 'STALE'
+            row['differences'].append("scenario definition changed since the golden outputs were recorded")
+            continue
+
+        traces_identical = True
+        for replication, (expected, actual) in enumerate(zip(reference['runs'], result['runs'])):
+            if (expected['trace_sha256'] != actual['trace_sha256']
+                    or expected['num_events'] != actual['num_events']):
+                traces_identical = False
+            for kpi in sorted(set(expected['kpis']) | set(actual['kpis'])):
+                if not kpi_equal(expected['kpis'].get(kpi), actual['kpis'].get(kpi), rel_tol, abs_tol):
+                    row['differences'].append(
+                        f"rep {replication} {kpi}: {expected['kpis'].get(kpi)} -> {actual['kpis'].get(kpi)}")
+        row['traces_identical'] = traces_identical
+        if row['differences'] or (exact and not traces_identical):
+            row['verdict'] = 'DIFFERENT'
+        else:
+            row['verdict'] = 'identical' if traces_identical else 'within tolerance'
+    return report
+
+
+def check_golden(path, engine=run_replication, rel_tol=0.0, abs_tol=0.0, scenarios=GOLDEN_SCENARIOS):
+    """Run the catalog with a candidate engine and compare it against a golden file"""
+    return compare_results(load_golden(path), run_catalog(scenarios, engine), rel_tol, abs_tol)
+
+
+def format_report(report):
+    lines = []
+    for row in report:
+        timing = (f"{row['candidate_time']:.2f}s vs {row['golden_time']:.2f}s "
+                  f"(x{row['time_ratio']:.2f})" if row['time_ratio'] is not None else "")
+        trace = {True: "traces identical", False: "traces differ", None: ""}[row['traces_identical']]
+        lines.append(f"{row['scenario']:20s} {row['verdict']:16s} {trace:17s} {timing}")
+        lines.extend(f"    {difference}" for difference in row['differences'][:10])
+        if len(row['differences']) > 10:
+            lines.append(f"    ... {len(row['differences']) - 10} more")
+    return "\n".join(lines)
@@ -0,0 +1,198 @@
+import json
+import queue
+import threading
+
+
+class HookBus:
+    """
+    Publish/subscribe bus for simulation events
+
+    Each hook is a plain list of callbacks. Call sites test the list before
+    building any arguments, so a hook without subscribers costs a single
+    attribute check in the event loop.
+
+    Hooks and callback arguments:
+        order_received(order)
+        queue_put(process, job)
+        queue_get(process, job)
+        job_start(process, processor_resource, jobs)
+        job_end(process, processor_resource, jobs)
+        defects_found(process, job, defective_items)
+        rework_created(process, job)
+        order_completed(order)
+    """
+
+    HOOKS = ('order_received', 'queue_put', 'queue_get', 'job_start',
+             'job_end', 'defects_found', 'rework_created', 'order_completed')
+
+    def __init__(self):
+        for hook in self.HOOKS:
+            setattr(self, hook, [])
+
+    def subscribe(self, hook, callback):
+        """Register a callback for a hook"""
+        if hook not in self.HOOKS:
+            raise ValueError(f"Unknown hook: {hook}")
+        getattr(self, hook).append(callback)
+
+    def unsubscribe(self, hook, callback):
+        """Remove a callback from a hook"""
+        getattr(self, hook).remove(callback)
+
+    def emit(self, hook, *args):
+        """Call all callbacks of a hook (call sites check for subscribers first)"""
+        for callback in getattr(self, hook):
+            callback(*args)
+
+
+class LiveAggregator:
+    """
+    Throttled live view of a running simulation
+
+    Subscribes to a HookBus, accumulates counters per process and pushes one
+    snapshot to each sink every `interval` simulated minutes. Snapshots are
+    taken on the next hook call after the interval elapses, so no extra
+    events are added to the simulation.
+
+    Attributes:
+        env (simpy.Environment): Simulation environment
+        interval (float): Snapshot interval (unit: simulated minutes)
+        sinks (list): Callables receiving snapshot dicts
+        next_push (float): Simulation time of the next snapshot
+        counters (dict): Per-process counters {process name: {counter: value}}
+        totals (dict): Counters that are not tied to a process
+    """
+
+    def __init__(self, env, interval, sinks=None):
+        self.env = env
+        self.interval = interval
+        self.sinks = list(sinks) if sinks else []
+        self.next_push = env.now + interval
+        self.counters = {}
+        self.totals = {'orders_received': 0, 'orders_completed': 0,
+                       'defective_items': 0, 'rework_jobs': 0}
+
+    def attach(self, hooks):
+        """Subscribe to all hooks of a bus"""
+        hooks.subscribe('order_received', self.on_order_received)
+        hooks.subscribe('queue_put', self.on_queue_put)
+        hooks.subscribe('queue_get', self.on_queue_get)
+        hooks.subscribe('job_start', self.on_job_start)
+        hooks.subscribe('job_end', self.on_job_end)
+        hooks.subscribe('defects_found', self.on_defects_found)
+        hooks.subscribe('rework_created', self.on_rework_created)
+        hooks.subscribe('order_completed', self.on_order_completed)
+
+    def process_counters(self, process):
+        counters = self.counters.get(process.name_process)
+        if counters is None:
+            counters = {'queue_length': 0, 'in_process': 0,
+                        'started': 0, 'completed': 0}
+            self.counters[process.name_process] = counters
+        return counters
+
+    def on_order_received(self, order):
+        self.totals['orders_received'] += 1
+        self.maybe_push()
+
+    def on_queue_put(self, process, job):
+        self.process_counters(process)['queue_length'] = process.job_store.size
+        self.maybe_push()
+
+    def on_queue_get(self, process, job):
+        self.process_counters(process)['queue_length'] = process.job_store.size
+        self.maybe_push()
+
+    def on_job_start(self, process, processor_resource, jobs):
+        counters = self.process_counters(process)
+        counters['started'] += len(jobs)
+        counters['in_process'] += len(jobs)
+        self.maybe_push()
+
+    def on_job_end(self, process, processor_resource, jobs):
+        counters = self.process_counters(process)
+        counters['completed'] += len(jobs)
+        counters['in_process'] -= len(jobs)
+        self.maybe_push()
+
+    def on_defects_found(self, process, job, defective_items):
+        self.totals['defective_items'] += len(defective_items)
+        self.maybe_push()
+
+    def on_rework_created(self, process, job):
+        self.totals['rework_jobs'] += 1
+        self.maybe_push()
+
+    def on_order_completed(self, order):
+        self.totals['orders_completed'] += 1
+        self.maybe_push()
+
+    def maybe_push(self):
+        """Push a snapshot if the interval has elapsed"""
+        if self.env.now >= self.next_push:
+            self.push()
+            # Skip intervals without events
+            while self.next_push <= self.env.now:
+                self.next_push += self.interval
+
+    def push(self):
+        """Send the current snapshot to all sinks"""
+        snapshot = {
+            'time': self.env.now,
+            'totals': dict(self.totals),
+            'processes': {name: dict(counters) for name, counters in self.counters.items()},
+        }
+        for sink in self.sinks:
+            sink(snapshot)
+
+
+class JsonLinesSink:
+    """Writes each snapshot as one JSON line (e.g., for a dashboard tailing the file)"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def __call__(self, snapshot):
+        self.file.write(json.dumps(snapshot) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ThreadedSink:
+    """
+    Moves slow sink I/O (file, socket, websocket send) off the simulation thread
+
+    Snapshots are handed to a background thread through a bounded queue; when
+    the queue is full the oldest pending snapshot is dropped.
+    """
+
+    def __init__(self, sink, max_pending=64):
+        self.sink = sink
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, snapshot):
+        while True:
+            try:
+                self.pending.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.pending.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            snapshot = self.pending.get()
+            if snapshot is None:
+                break
+            self.sink(snapshot)
+
+    def close(self):
+        """Deliver pending snapshots and stop the background thread"""
+        self.pending.put(None)
+        self.thread.join()
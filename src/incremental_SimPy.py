@@ -0,0 +1,351 @@
+from bisect import bisect_right
+from config_SimPy import *
+from context_SimPy import SimContext, run_replication
+from manager import Manager
+from routing_SimPy import compile_routing
+from settings_SimPy import SimConfig
+
+
+# Settings that only act on the stages of one process type
+STAGE_PARAMETERS = {
+    'Proc_Build': ('NUM_MACHINES_BUILD', 'PROC_TIME_BUILD', 'CAPACITY_MACHINE_BUILD',
+                   'DEFECT_RATE_PROC_BUILD'),
+    'Proc_Wash': ('NUM_MACHINES_WASH', 'PROC_TIME_WASH', 'CAPACITY_MACHINE_WASH',
+                  'BATCH_MAX_HOLD_TIME_WASH'),
+    'Proc_Dry': ('NUM_MACHINES_DRY', 'PROC_TIME_DRY', 'CAPACITY_MACHINE_DRY',
+                 'BATCH_MAX_HOLD_TIME_DRY'),
+    'Proc_Inspect': ('NUM_WORKERS_IN_INSPECT', 'PROC_TIME_INSPECT',
+                     'POLICY_NUM_DEFECT_PER_JOB', 'REWORK_MAX_AGE'),
+}
+
+
+class StageRecording:
+    """
+    Output streams of all stages of one run
+
+    Attributes:
+        config (SimConfig): Settings of the recorded run
+        seed (int): Root seed of the recorded run
+        replication (int): Replication index of the recorded run
+        sim_duration (float): Simulation duration (unit: minutes)
+        node_names (list): Routing node names in index order
+        departures (list): (time, source node, target node, id_job, item defect flags)
+                           of every job moved between stages, in event order
+        busy_times (list): Per node, times at which its number of present jobs changed
+        busy_levels (list): Per node, number of jobs queued or in process after each change
+        completed_jobs (list): Per node, IDs of the jobs completed by the stage
+        kpis (dict): KPIs of the recorded run
+    """
+
+    def __init__(self, config, seed, replication, sim_duration, node_names):
+        self.config = config
+        self.seed = seed
+        self.replication = replication
+        self.sim_duration = sim_duration
+        self.node_names = node_names
+        self.departures = []
+        self.busy_times = [[] for _ in node_names]
+        self.busy_levels = [[] for _ in node_names]
+        self.completed_jobs = [[] for _ in node_names]
+        self.kpis = None
+
+    def is_drained(self, node, time):
+        """Check if a stage had no job queued or in process at `time` (after all changes at `time`)"""
+        index = bisect_right(self.busy_times[node], time) - 1
+        return index < 0 or self.busy_levels[node][index] == 0
+
+
+class StageRecorder:
+    """
+    Hook subscriber recording the departure stream and occupancy of every stage
+
+    Jobs keep their identity from the entry process to inspection, so a
+    departure is detected when a job is queued at a stage after having been
+    at another one.
+    """
+
+    def __init__(self, env, recording):
+        self.env = env
+        self.recording = recording
+        self.location = {}
+        self.levels = [0] * len(recording.node_names)
+
+    def attach(self, hooks):
+        hooks.subscribe('queue_put', self.on_queue_put)
+        hooks.subscribe('job_end', self.on_job_end)
+
+    def change_level(self, node, delta):
+        self.levels[node] += delta
+        times = self.recording.busy_times[node]
+        levels = self.recording.busy_levels[node]
+        if times and times[-1] == self.env.now:
+            levels[-1] = self.levels[node]
+        else:
+            times.append(self.env.now)
+            levels.append(self.levels[node])
+
+    def on_queue_put(self, process, job):
+        node = process.route_index
+        source = self.location.get(job.id_job)
+        if source is not None:
+            self.recording.departures.append((
+                self.env.now, source, node, job.id_job,
+                tuple(item.is_defect for item in job.list_items)))
+        self.location[job.id_job] = node
+        self.change_level(node, 1)
+
+    def on_job_end(self, process, processor_resource, jobs):
+        node = process.route_index
+        for job in jobs:
+            self.recording.completed_jobs[node].append(job.id_job)
+        self.change_level(node, -len(jobs))
+
+
+def record_stages(overrides=None, seed=RANDOM_SEED, replication=0, sim_duration=SIM_TIME):
+    """
+    Run a scenario and record the output stream of every stage
+
+    Returns:
+        StageRecording: Recording to re-simulate downstream what-ifs from
+    """
+    config = SimConfig(overrides)
+    routing = compile_routing(config.ROUTING_GRAPH)
+    recording = StageRecording(config, seed, replication, sim_duration, routing.node_names)
+
+    def attach(context):
+        StageRecorder(context.env, recording).attach(context.hooks)
+
+    recording.kpis = run_replication(config, seed, replication, sim_duration, attach)
+    return recording
+
+
+def changed_settings(recording, overrides):
+    """Names of the overridden settings that differ from the recorded run"""
+    config = recording.config.replace(overrides or {})
+    return sorted(name for name in (overrides or {})
+                  if getattr(config, name) != getattr(recording.config, name))
+
+
+def plan_resimulation(recording, overrides):
+    """
+    Decide which stages a what-if has to re-simulate
+
+    The changed stages and everything downstream of them are re-simulated;
+    inspection stages always are, since item and order completion happen
+    there. A stage routing to alternatives by queue length is added when one
+    of its alternatives is re-simulated. A rework edge from a re-simulated
+    stage back to a recorded one is a feedback loop: unless the recording
+    shows that no defective item can reach the re-simulated stages, the loop
+    is re-simulated as well. If that reaches the entry stage, nothing can be
+    replayed and the whole line is simulated.
+
+    Returns:
+        dict: 'changed' settings, 'resimulated' and 'replayed' node names,
+              'loop_detected' and 'full' (True: full re-simulation) flags and a 'reason'
+    """
+    changed = changed_settings(recording, overrides)
+    routing = compile_routing(recording.config.ROUTING_GRAPH)
+    node_names = routing.node_names
+    plan = {'changed': changed, 'resimulated': [], 'replayed': list(node_names),
+            'loop_detected': False, 'full': False, 'reason': None}
+    if not changed:
+        plan['reason'] = "no setting changed"
+        return plan
+
+    stage_types = set()
+    for name in changed:
+        process_type = next((process_type for process_type, names in STAGE_PARAMETERS.items()
+                             if name in names), None)
+        if process_type is None:
+            plan['resimulated'], plan['replayed'] = list(node_names), []
+            plan['full'] = True
+            plan['reason'] = f"{name} is not a stage setting"
+            return plan
+        stage_types.add(process_type)
+
+    nodes = {index for index, process_type in enumerate(routing.node_types)
+             if process_type in stage_types or process_type == "Proc_Inspect"}
+    while True:
+        grown = set(nodes)
+        for index in nodes:
+            grown |= routing.downstream_nodes(index)
+        for table in routing.successors:
+            for index, targets in enumerate(table):
+                if len(targets) > 1 and grown.intersection(targets):
+                    grown.add(index)
+
+        # Rework edges leaving the re-simulated stages
+        loops = [routing.rework_target[index] for index in grown
+                 if routing.rework_target[index] >= 0 and routing.rework_target[index] not in grown]
+        if loops and rework_possible(recording, routing, grown):
+            plan['loop_detected'] = True
+            grown.update(loops)
+        if grown == nodes:
+            break
+        nodes = grown
+
+    plan['resimulated'] = [name for index, name in enumerate(node_names) if index in nodes]
+    plan['replayed'] = [name for index, name in enumerate(node_names) if index not in nodes]
+    if routing.entry in nodes:
+        plan['full'] = True
+        plan['reason'] = "rework loop reaches the entry stage" if plan['loop_detected'] else \
+            "entry stage changed"
+    elif plan['loop_detected']:
+        plan['reason'] = "rework loop re-simulated"
+    return plan
+
+
+def rework_possible(recording, routing, nodes):
+    """
+    Check if rework can occur when `nodes` are re-simulated
+
+    Defects are only drawn at build stages. If none is re-simulated and no
+    recorded job entering the re-simulated stages carries a defective item,
+    no rework job can be created, whatever the timing downstream.
+    """
+    if any(routing.node_types[index] == "Proc_Build" for index in nodes):
+        return True
+    for _, source, target, _, defects in recording.departures:
+        if source not in nodes and target in nodes and any(defects):
+            return True
+    return False
+
+
+class RecordedQueue:
+    """Queue of a replayed stage at the end of the recorded run (only its length is known)"""
+
+    def __init__(self, size):
+        self.size = size
+        self.items = ()
+
+    @property
+    def is_empty(self):
+        return self.size == 0
+
+
+class RecordedStage:
+    """
+    Stand-in for a stage that is replayed instead of simulated
+
+    It answers the queries downstream stages make about it (batch formation
+    asks whether upstream is drained) from the recording and reports the
+    recorded statistics. It runs no SimPy process.
+
+    Attributes:
+        name_process (str): Process name
+        completed_jobs (list): IDs of the jobs the stage completed in the recording
+        job_store (RecordedQueue): Queue at the end of the recorded run
+    """
+
+    def __init__(self, name_process, node, env, recording):
+        self.name_process = name_process
+        self.env = env
+        self.recording = recording
+        self.node = node
+        self.router = None
+        self.route_index = None
+        self.upstream_processes = []
+        self.processor_resources = {}
+        self.completed_jobs = recording.completed_jobs[node]
+        self.job_store = RecordedQueue(
+            recording.kpis[f'{recording.node_names[node]}_queue'])
+
+    def is_drained(self):
+        return self.recording.is_drained(self.node, self.env.now)
+
+
+class ReplayManager(Manager):
+    """
+    Manager that re-simulates some stages and replays the others from a recording
+
+    Orders are generated as in the recorded run (the customer stream is the
+    same), but jobs released to a replayed stage are held back. They enter
+    the re-simulated stages at their recorded departure times, with the
+    defect flags they had then.
+
+    Attributes:
+        recording (StageRecording): Recorded run
+        resimulated (set): Names of the re-simulated nodes
+        held_jobs (dict): Jobs released to replayed stages {id_job: Job}
+    """
+
+    def __init__(self, env, recording, resimulated, logger=None, streams=None, hooks=None, config=None):
+        self.recording = recording
+        self.resimulated = set(resimulated)
+        self.held_jobs = {}
+        super().__init__(env, logger, streams, hooks, config=config)
+
+        node_index = self.routing.node_index
+        indices = {node_index[name] for name in self.resimulated}
+        self.replayed_departures = [
+            departure for departure in recording.departures
+            if departure[1] not in indices and departure[2] in indices]
+        env.process(self.replay_departures())
+
+    def create_process(self, node, process_type, manager=None):
+        if node in self.resimulated:
+            return super().create_process(node, process_type, manager)
+        return RecordedStage(self.process_name(node, process_type),
+                             self.routing.node_index[node], self.env, self.recording)
+
+    def release_job(self, job, process=None, position=None):
+        if process is None:
+            process = self.proc_build
+        if isinstance(process, RecordedStage):
+            self.held_jobs[job.id_job] = job
+            return
+        super().release_job(job, process, position)
+
+    def replay_departures(self):
+        """Move held jobs into the re-simulated stages at their recorded departure times"""
+        processes = self.routing.processes
+        for time, _, target, id_job, defects in self.replayed_departures:
+            if time > self.env.now:
+                yield self.env.timeout(time - self.env.now)
+            job = self.held_jobs.pop(id_job, None)
+            if job is None:
+                raise RuntimeError(f"Recorded job {id_job} was not released in the replay")
+            for item, is_defect in zip(job.list_items, defects):
+                item.is_defect = is_defect
+            processes[target].add_to_queue(job)
+
+
+class ReplayContext(SimContext):
+    """SimContext of a partial re-simulation (see ReplayManager)"""
+
+    def __init__(self, recording, resimulated, config):
+        super().__init__(config, recording.seed, recording.replication)
+        self.recording = recording
+        self.resimulated = resimulated
+
+    def create_manager(self, logger=None):
+        return ReplayManager(self.env, self.recording, self.resimulated, logger,
+                             self.streams, self.hooks, self.config)
+
+
+def resimulate(recording, overrides, plan=None, attach=None):
+    """
+    KPIs of a what-if, re-simulating only the stages it affects
+
+    Args:
+        recording (StageRecording): Recorded run of the base scenario
+        overrides (dict): Settings of the what-if (on top of the recorded settings)
+        plan (dict): Plan from plan_resimulation (computed if None)
+        attach (callable): Called with the built SimContext before the run
+
+    Returns:
+        dict: KPIs as returned by run_scenario
+    """
+    plan = plan if plan is not None else plan_resimulation(recording, overrides)
+    config = recording.config.replace(overrides or {})
+    if not plan['changed']:
+        return dict(recording.kpis)
+    if plan['full']:
+        return run_replication(config, recording.seed, recording.replication,
+                               recording.sim_duration, attach)
+
+    context = ReplayContext(recording, plan['resimulated'], config)
+    context.build(horizon=recording.sim_duration)
+    if attach is not None:
+        attach(context)
+    return context.run(recording.sim_duration).kpis()
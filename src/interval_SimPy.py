@@ -0,0 +1,247 @@
+import numpy as np
+from trace_SimPy import read_trace, EVENT_START, EVENT_END
+from stats_SimPy import visit_keys
+
+
+def display_names(resource_keys):
+    """Resource names, qualified as 'process/resource' where several processes share a name"""
+    processes_of = {}
+    for process, name in resource_keys:
+        processes_of.setdefault(name, set()).add(process)
+    return [name if len(processes_of[name]) == 1 else f"{process}/{name}"
+            for process, name in resource_keys]
+
+
+class IntervalIndex:
+    """
+    Per-resource index of processing intervals for point-in-time queries
+
+    Intervals [start, end) of each resource are kept in arrays sorted by
+    start. Since no interval of a resource is longer than its longest
+    finished interval, the intervals containing t start in
+    (t - max_duration, t]; two binary searches bound the candidates, so
+    stabbing and range queries take O(log n + candidates). Steps still in
+    process (no end yet) are kept apart and always checked (at most the
+    capacity of the resource).
+
+    Occupancy is a step function per resource with prefix integrals, so the
+    number of jobs at t and busy or job time over [t1, t2] take O(log n).
+
+    Resources are identified by (process name, resource name), so equally
+    named resources of duplicate routing nodes (e.g., Washer_1 of two wash
+    nodes) are kept apart. Their display names are qualified with the
+    process name only where a resource name is shared.
+
+    Attributes:
+        resource_keys (list): (process name, resource name) of each resource in index order
+        resource_names (list): Display names in index order
+        resource_index (dict): {display name or (process name, resource name): index}
+        starts, ends, jobs, processes (list): Per resource, sorted arrays of finished intervals
+        max_durations (np.ndarray): Longest finished interval of each resource
+        open_steps (list): Per resource, (id_job, start, process) of unfinished steps
+        process_names (list): Process names referenced by the process arrays
+    """
+
+    def __init__(self, resource_keys, resource, job, start, end, process=None, process_names=None):
+        self.resource_keys = [tuple(key) for key in resource_keys]
+        self.resource_names = display_names(self.resource_keys)
+        self.resource_index = {name: index for index, name in enumerate(self.resource_names)}
+        self.resource_index.update((key, index) for index, key in enumerate(self.resource_keys))
+        self.process_names = list(process_names) if process_names is not None else []
+
+        resource = np.asarray(resource, dtype=np.int64)
+        job = np.asarray(job, dtype=np.int64)
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+        process = (np.asarray(process, dtype=np.int64) if process is not None
+                   else np.full(len(resource), -1, dtype=np.int64))
+
+        finished = ~np.isnan(end)
+        self.open_steps = [[] for _ in self.resource_names]
+        for r, j, s, p in zip(resource[~finished].tolist(), job[~finished].tolist(),
+                              start[~finished].tolist(), process[~finished].tolist()):
+            self.open_steps[r].append((j, s, p))
+
+        resource, job, start, end, process = (
+            resource[finished], job[finished], start[finished], end[finished], process[finished])
+        order = np.lexsort((start, resource))
+        resource, job, start, end, process = (
+            resource[order], job[order], start[order], end[order], process[order])
+        bounds = np.searchsorted(resource, np.arange(len(self.resource_names) + 1))
+        self.starts, self.ends, self.jobs, self.processes = [], [], [], []
+        self.max_durations = np.zeros(len(self.resource_names))
+        for index in range(len(self.resource_names)):
+            part = slice(bounds[index], bounds[index + 1])
+            self.starts.append(start[part])
+            self.ends.append(end[part])
+            self.jobs.append(job[part])
+            self.processes.append(process[part])
+            if bounds[index + 1] > bounds[index]:
+                self.max_durations[index] = (end[part] - start[part]).max()
+
+        self._build_occupancy()
+
+    @classmethod
+    def from_processes(cls, processes):
+        """
+        Build the index from the processing history of jobs
+
+        Works on live processes (Manager.get_processes()) and on processes
+        rebuilt by TraceReplayer. Jobs are collected from the completed jobs of
+        every process and from the jobs currently on a resource.
+        """
+        jobs = {}
+        for proc in processes.values():
+            if proc is None:
+                continue
+            for job in proc.completed_jobs:
+                jobs[id(job)] = job
+            for res in proc.processor_resources.values():
+                for job in getattr(res, 'current_jobs', ()):
+                    jobs[id(job)] = job
+
+        resource_index, process_index = {}, {}
+        columns = ([], [], [], [], [])
+        for job in jobs.values():
+            for step in job.processing_history:
+                columns[0].append(resource_index.setdefault((step['process'], step['resource_name']),
+                                                            len(resource_index)))
+                columns[1].append(job.id_job)
+                columns[2].append(step['start_time'])
+                columns[3].append(step['end_time'] if step['end_time'] is not None else np.nan)
+                columns[4].append(process_index.setdefault(step['process'], len(process_index)))
+        return cls(list(resource_index), *columns[:4], columns[4], list(process_index))
+
+    @classmethod
+    def from_records(cls, records, footer):
+        """Build the index from trace records (TRACE_DTYPE) and the trace footer"""
+        kinds = records['kind']
+        starts = records[kinds == EVENT_START]
+        ends = records[kinds == EVENT_END]
+
+        # End of each start with the same (process, job, visit) key; NaN if still in process
+        end_time = np.full(len(starts), np.nan)
+        _, start_index, end_index = np.intersect1d(
+            visit_keys(starts), visit_keys(ends), assume_unique=True, return_indices=True)
+        end_time[start_index] = ends['time'][end_index]
+
+        process_names = [info['name'] for info in footer['processes']]
+        return cls([(process_names[info['process']], info['name']) for info in footer['resources']],
+                   starts['resource'], starts['job'], starts['time'], end_time,
+                   starts['process'], process_names)
+
+    @classmethod
+    def from_trace(cls, path):
+        records, footer = read_trace(path)
+        return cls.from_records(records, footer)
+
+    def _build_occupancy(self):
+        """Step function of the number of jobs on each resource, with prefix integrals"""
+        self.occupancy_times, self.occupancy_levels = [], []
+        self._job_area, self._busy_area = [], []
+        for index in range(len(self.resource_names)):
+            open_starts = [start for _, start, _ in self.open_steps[index]]
+            times = np.concatenate((self.starts[index], open_starts, self.ends[index]))
+            deltas = np.concatenate((np.ones(len(self.starts[index]) + len(open_starts)),
+                                     -np.ones(len(self.ends[index]))))
+            order = np.argsort(times, kind='stable')
+            times, deltas = times[order], deltas[order]
+
+            # Level after all changes at the same time
+            unique_times, first = np.unique(times, return_index=True)
+            levels = np.cumsum(deltas)[np.append(first[1:], len(times)) - 1] if len(times) else deltas
+            durations = np.diff(unique_times)
+            self.occupancy_times.append(unique_times)
+            self.occupancy_levels.append(levels.astype(np.int64))
+            self._job_area.append(np.concatenate(([0.0], np.cumsum(levels[:-1] * durations))))
+            self._busy_area.append(np.concatenate(([0.0], np.cumsum((levels[:-1] > 0) * durations))))
+
+    def _resource(self, resource):
+        if isinstance(resource, (int, np.integer)):
+            return resource
+        return self.resource_index[resource]
+
+    def at(self, time, resource=None):
+        """
+        Intervals containing `time` (start <= time < end)
+
+        Args:
+            resource: Display name, (process name, resource name) or index (None: all resources)
+
+        Returns:
+            list of (id_job, start, end) for one resource (end None if unfinished),
+            or {resource name: list} of the non-empty resources
+        """
+        return self.overlapping(time, time, resource)
+
+    def overlapping(self, start_time, end_time, resource=None):
+        """
+        Intervals overlapping [start_time, end_time) (start_time == end_time: stabbing query)
+
+        Returns:
+            Same layout as at()
+        """
+        if resource is None:
+            result = {}
+            for index, name in enumerate(self.resource_names):
+                intervals = self.overlapping(start_time, end_time, index)
+                if intervals:
+                    result[name] = intervals
+            return result
+
+        index = self._resource(resource)
+        starts, ends = self.starts[index], self.ends[index]
+        low = np.searchsorted(starts, start_time - self.max_durations[index], side='right')
+        if start_time == end_time:
+            high = np.searchsorted(starts, end_time, side='right')
+        else:
+            high = np.searchsorted(starts, end_time, side='left')
+        candidates = np.arange(low, high)
+        hits = candidates[ends[candidates] > start_time]
+        intervals = list(zip(self.jobs[index][hits].tolist(), starts[hits].tolist(), ends[hits].tolist()))
+        for id_job, start, _ in self.open_steps[index]:
+            if start <= start_time or start < end_time:
+                intervals.append((id_job, start, None))
+        return intervals
+
+    def occupancy(self, resource, time):
+        """Number of jobs on a resource at `time`"""
+        index = self._resource(resource)
+        position = np.searchsorted(self.occupancy_times[index], time, side='right') - 1
+        return int(self.occupancy_levels[index][position]) if position >= 0 else 0
+
+    def occupancy_timeline(self, resource):
+        """
+        Occupancy step function of a resource
+
+        Returns:
+            tuple: (change times, number of jobs after each change)
+        """
+        index = self._resource(resource)
+        return self.occupancy_times[index], self.occupancy_levels[index]
+
+    def _integral(self, index, areas, time, busy):
+        times = self.occupancy_times[index]
+        position = np.searchsorted(times, time, side='right') - 1
+        if position < 0:
+            return 0.0
+        level = self.occupancy_levels[index][position]
+        return float(areas[position] + (level > 0 if busy else level) * (time - times[position]))
+
+    def busy_time(self, resource, start_time, end_time):
+        """Time in [start_time, end_time] with at least one job on the resource"""
+        index = self._resource(resource)
+        return (self._integral(index, self._busy_area[index], end_time, True)
+                - self._integral(index, self._busy_area[index], start_time, True))
+
+    def job_time(self, resource, start_time, end_time):
+        """Job-minutes spent on the resource in [start_time, end_time] (batches count every job)"""
+        index = self._resource(resource)
+        return (self._integral(index, self._job_area[index], end_time, False)
+                - self._integral(index, self._job_area[index], start_time, False))
+
+    def utilization(self, resource, start_time, end_time):
+        """Share of [start_time, end_time] the resource was busy"""
+        if end_time <= start_time:
+            return 0.0
+        return self.busy_time(resource, start_time, end_time) / (end_time - start_time)
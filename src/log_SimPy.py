@@ -5,6 +5,8 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 from config_SimPy import *
+from stats_SimPy import STAT_PERCENTILES, time_weighted_queue_stats
+from interval_SimPy import IntervalIndex
 
 
 class Logger:
@@ -85,6 +87,8 @@ class Logger:
                         waiting_times) / len(waiting_times)
                     stats[f'{process_id}_waiting_time_std'] = np.std(
                         waiting_times) if len(waiting_times) > 1 else 0
+                    for percentile, value in zip(STAT_PERCENTILES, np.percentile(waiting_times, STAT_PERCENTILES)):
+                        stats[f'{process_id}_waiting_time_p{percentile}'] = value
 
                 # Processing time statistics
                 processing_times = [(job.time_processing_end - job.time_processing_start)
@@ -96,30 +100,33 @@ class Logger:
                         processing_times) / len(processing_times)
                     stats[f'{process_id}_processing_time_std'] = np.std(
                         processing_times) if len(processing_times) > 1 else 0
+                    for percentile, value in zip(STAT_PERCENTILES, np.percentile(processing_times, STAT_PERCENTILES)):
+                        stats[f'{process_id}_processing_time_p{percentile}'] = value
 
         # Queue length statistics
         for proc in available_processes:
             if hasattr(proc, 'job_store') and hasattr(proc.job_store, 'queue_length_history'):
                 if proc.job_store.queue_length_history:
-                    # Calculate average queue length
-                    times = [t for t, _ in proc.job_store.queue_length_history]
-                    lengths = [
-                        l for _, l in proc.job_store.queue_length_history]
-
-                    if times and lengths:
-                        # Add final point if needed
-                        if times[-1] < self.env.now:
-                            times.append(self.env.now)
-                            lengths.append(lengths[-1])
-
-                        # Calculate time-weighted average
-                        weighted_sum = 0
-                        for i in range(1, len(times)):
-                            weighted_sum += lengths[i-1] * \
-                                (times[i] - times[i-1])
-
-                        avg_length = weighted_sum / self.env.now if self.env.now > 0 else 0
-                        stats[f'{proc.name_process}_avg_queue_length'] = avg_length
+                    # Calculate time-weighted average (vectorized)
+                    history = np.asarray(
+                        proc.job_store.queue_length_history, dtype=float)
+                    avg_length, _ = time_weighted_queue_stats(
+                        history[:, 0], history[:, 1], self.env.now)
+                    stats[f'{proc.name_process}_avg_queue_length'] = avg_length
+
+        # Batch fill statistics for multi-capacity machines
+        for proc in available_processes:
+            batch_sizes = []
+            capacity_slots = 0
+            for res in proc.processor_resources.values():
+                if res.capacity > 1 and res.batch_sizes:
+                    batch_sizes.extend(res.batch_sizes)
+                    capacity_slots += res.capacity * len(res.batch_sizes)
+            if batch_sizes:
+                stats[f'{proc.name_process}_num_batches'] = len(batch_sizes)
+                stats[f'{proc.name_process}_avg_batch_size'] = np.mean(batch_sizes)
+                stats[f'{proc.name_process}_avg_batch_fill'] = sum(
+                    batch_sizes) / capacity_slots
 
         # Count defective items if inspection process exists
         if proc_inspect and hasattr(proc_inspect, 'defective_items'):
@@ -274,6 +281,9 @@ class Logger:
         # Important: track job-machine slot assignments (for job slot consistency)
         job_machine_slot = {}  # {(job_id, machine_name): assigned_slot_name}
 
+        # Interval index for hover data (jobs sharing the resource with each step)
+        interval_index = IntervalIndex.from_processes(processes)
+
         # Collect all completed jobs
         completed_jobs = []
         for proc_name, proc in processes.items():
@@ -385,7 +395,9 @@ class Logger:
                         name=trace_name,
                         marker_color=job_color,
                         text=f"Job {job_id}",
-                        hovertext=f"Job {job_id} - {step['process']} - Duration: {duration_min} mins",
+                        hovertext=(f"Job {job_id} - {step['process']} - Duration: {duration_min} mins"
+                                   f"<br>{start_min} -> {end_min} min on {orig_resource}, jobs: "
+                                   f"{[job for job, _, _ in interval_index.at(start_min, (step['process'], orig_resource))]}"),
                         showlegend=show_legend,
                         legendgroup=trace_key,
                     ))
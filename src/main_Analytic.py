@@ -0,0 +1,50 @@
+# main_Analytic.py
+import time
+from analytic_SimPy import estimate, cross_validate
+from settings_SimPy import SimConfig
+from config_SimPy import *
+
+
+def run_analytic(overrides=None, validate=True, num_replications=3, sim_duration=8 * 7 * 24 * 60):
+    """
+    Print the analytic estimate of a scenario and compare it with simulation
+
+    Args:
+        overrides (dict): config_SimPy settings of the scenario
+        validate (bool): Cross-validate against the simulator
+        num_replications (int): Replications for cross-validation
+        sim_duration (int): Horizon of the estimate and of the validation runs
+    """
+    print("================ Analytic Queueing Estimate ================")
+    overrides = overrides or {}
+
+    start_time = time.perf_counter()
+    result = estimate(SimConfig(overrides), sim_duration)
+    elapsed = (time.perf_counter() - start_time) * 1e6
+    print(f"Scenario: {overrides or 'default'} ({elapsed:.0f} microseconds)")
+
+    for node, station in result['stations'].items():
+        flags = f" [{', '.join(station['flags'])}]" if station['needs_simulation'] else ""
+        print(f"  {node}: utilization {station['utilization']:.3f}, "
+              f"queue {station['queue_length']:.2f} jobs, waiting {station['waiting_time']:.1f} minutes{flags}")
+    print(f"Job flow time: {result['job_flow_time']:.1f} minutes")
+    print(f"Item flow time (incl. rework): {result['item_flow_time']:.1f} minutes")
+    print(f"Throughput: {result['throughput_items_per_day']:.2f} items/day")
+    if result['needs_simulation']:
+        print(f"Approximation flagged, simulate to confirm: {', '.join(result['flags'])}")
+
+    if validate:
+        print(f"\nCross-validation ({num_replications} replications):")
+        for row in cross_validate([overrides], num_replications, sim_duration=sim_duration):
+            print(f"  {row['node']}: utilization {row['utilization']:.3f} vs {row['sim_utilization']:.3f}, "
+                  f"waiting {row['waiting_time']:.1f} vs {row['sim_waiting_time']:.1f} minutes "
+                  f"({row['waiting_error']:+.2f} of processing time"
+                  f"{', within tolerance' if row['within_tolerance'] else ''})"
+                  f"{' (flagged)' if row['needs_simulation'] else ''}")
+
+    print("\n================ Estimate Ended ================")
+    return result
+
+
+if __name__ == "__main__":
+    run_analytic({'CUST_ORDER_CYCLE': 6 * 60})
@@ -0,0 +1,59 @@
+# main_AnalyticCalibration.py
+import time
+import itertools
+from analytic_SimPy import cross_validate, WAITING_ERROR_TOLERANCE
+from config_SimPy import *
+
+# Calibration grid: order cycles x patients per order x wash/dry batch capacity
+ORDER_CYCLES = [3 * 60, 4 * 60, 6 * 60, 12 * 60, 24 * 60]
+PATIENT_RANGES = [(1, 1), (3, 3), (1, 5)]
+BATCH_CAPACITIES = [1, 2]
+
+
+def calibration_points():
+    """Scenario overrides of the calibration grid"""
+    return [{'CUST_ORDER_CYCLE': cycle, 'NUM_PATIENTS_PER_ORDER_RANGE': patients,
+             'CAPACITY_MACHINE_WASH': capacity, 'CAPACITY_MACHINE_DRY': capacity}
+            for cycle, patients, capacity in itertools.product(ORDER_CYCLES, PATIENT_RANGES, BATCH_CAPACITIES)]
+
+
+def run_calibration(num_replications=2, sim_duration=8 * 7 * 24 * 60, verbose=True):
+    """
+    Check the station flags of the analytic estimate against simulation
+
+    Unflagged stations should have waiting errors within WAITING_ERROR_TOLERANCE
+    of the processing time; each flag shows how often the stations it marks are outside.
+    """
+    print("================ Analytic Calibration ================")
+    points = calibration_points()
+    print(f"{len(points)} scenarios, {num_replications} replications of {sim_duration // (24 * 60)} days, "
+          f"tolerance {WAITING_ERROR_TOLERANCE:.0%} of the processing time\n")
+
+    start_time = time.time()
+    rows = cross_validate(points, num_replications, sim_duration=sim_duration)
+    if verbose:
+        for row in rows:
+            params = row['params']
+            print(f"  cycle {params['CUST_ORDER_CYCLE']:5d} patients {str(params['NUM_PATIENTS_PER_ORDER_RANGE']):6s} "
+                  f"capacity {params['CAPACITY_MACHINE_WASH']} {row['node']:8s} "
+                  f"utilization {row['utilization']:.2f} vs {row['sim_utilization']:.2f}, "
+                  f"waiting {row['waiting_time']:7.1f} vs {row['sim_waiting_time']:6.1f} "
+                  f"({row['waiting_error']:+.2f}) {', '.join(row['flags'])}")
+
+    print("\nStations outside the tolerance:")
+    unflagged = [row for row in rows if not row['needs_simulation']]
+    groups = [('unflagged', unflagged)]
+    flags = sorted({flag for row in rows for flag in row['flags']})
+    groups += [(flag, [row for row in rows if flag in row['flags']]) for flag in flags]
+    for name, group in groups:
+        outside = [row for row in group if not row['within_tolerance']]
+        max_error = max((abs(row['waiting_error']) for row in group), default=0.0)
+        print(f"  {name:18s} {len(outside):3d} of {len(group):3d} (largest error {max_error:.2f})")
+    print(f"\n{time.time() - start_time:.1f} seconds")
+
+    print("\n================ Calibration Ended ================")
+    return rows
+
+
+if __name__ == "__main__":
+    run_calibration()
@@ -0,0 +1,72 @@
+# main_Arrival.py
+import time
+import simpy
+from arrival_SimPy import BulkCustomer, create_arrival_process
+from base_Customer import Customer, OrderReceiver
+from rng_SimPy import RandomStreams
+from settings_SimPy import SimConfig
+from config_SimPy import *
+
+VOLUME_FACTOR = 100  # Order volume relative to CUST_ORDER_CYCLE
+# Daytime and weekday peaks with the same mean rate (NHPP)
+DAILY_PROFILE = [0.25] * 8 + [1.75] * 8 + [1.0] * 8
+WEEKLY_PROFILE = [1.2] * 5 + [0.5] * 2
+MEAN_BATCH_SIZE = sum(CUST_BATCH_SIZE_RANGE) / 2
+
+# (generator, arrival process, extra settings); all scenarios have the same mean order volume
+GENERATORS = {
+    'Customer (fixed cycle)': ("PER_ORDER", None, {}),
+    'Bulk fixed cycle': ("BULK", "FIXED_CYCLE", {}),
+    'Bulk Poisson': ("BULK", "POISSON", {}),
+    'Bulk NHPP': ("BULK", "NHPP", {'CUST_DAILY_PROFILE': DAILY_PROFILE, 'CUST_WEEKLY_PROFILE': WEEKLY_PROFILE}),
+    'Bulk batch Poisson': ("BULK", "BATCH_POISSON", {'CUST_ORDER_RATE': VOLUME_FACTOR / CUST_ORDER_CYCLE
+                                                     / MEAN_BATCH_SIZE}),
+}
+
+
+class CountingReceiver(OrderReceiver):
+    """Counts received orders and items without keeping them"""
+
+    def __init__(self):
+        self.num_orders = 0
+        self.num_items = 0
+
+    def receive_order(self, order):
+        self.num_orders += 1
+        self.num_items += sum(len(patient.list_items) for patient in order.list_patients)
+
+
+def generate_orders(generator, arrival_process, overrides, sim_duration, seed=RANDOM_SEED):
+    """Run only the order generator; return orders, items and run time"""
+    config = SimConfig({'CUST_ORDER_CYCLE': CUST_ORDER_CYCLE / VOLUME_FACTOR,
+                        'CUST_ORDER_RATE': VOLUME_FACTOR / CUST_ORDER_CYCLE, **overrides})
+    env = simpy.Environment()
+    receiver = CountingReceiver()
+    rng = RandomStreams(seed).stream("customer")
+
+    start_time = time.time()
+    if generator == "BULK":
+        BulkCustomer(env, receiver, None, rng, create_arrival_process(arrival_process, config),
+                     sim_duration, config)
+    else:
+        Customer(env, receiver, None, rng, config)
+    env.run(until=sim_duration)
+    return receiver.num_orders, receiver.num_items, time.time() - start_time
+
+
+def compare_generators(sim_duration=52 * 7 * 24 * 60):
+    """Order generation at VOLUME_FACTOR times today's order volume"""
+    print("================ Order Generation at Scale ================")
+    print(f"{VOLUME_FACTOR}x order volume (one order every {CUST_ORDER_CYCLE / VOLUME_FACTOR:.1f} minutes "
+          f"on average), {sim_duration // (24 * 60)} days\n")
+    reference = None
+    for name, (generator, arrival_process, overrides) in GENERATORS.items():
+        num_orders, num_items, elapsed = generate_orders(generator, arrival_process, overrides, sim_duration)
+        reference = reference or elapsed
+        print(f"{name:24s} {num_orders:6d} orders {num_items:7d} items  {elapsed:6.3f} seconds "
+              f"({elapsed / num_orders * 1e6:5.1f} us per order, x{reference / elapsed:.2f} vs Customer)")
+    print("\n================ Generation Ended ================")
+
+
+if __name__ == "__main__":
+    compare_generators()
@@ -0,0 +1,74 @@
+# main_Batching.py
+import time
+import numpy as np
+from analytic_SimPy import StationMonitor
+from context_SimPy import SimContext
+from settings_SimPy import SimConfig
+from config_SimPy import *
+
+POLICIES = ("IMMEDIATE", "FULL_OR_TIMEOUT")
+# Loads and batch capacities of the wash and dry machines
+SCENARIOS = {
+    'cycle 4h, capacity 2': {'CUST_ORDER_CYCLE': 4 * 60},
+    'cycle 12h, capacity 2': {'CUST_ORDER_CYCLE': 12 * 60},
+    'cycle 4h, capacity 4': {'CUST_ORDER_CYCLE': 4 * 60, 'CAPACITY_MACHINE_WASH': 4, 'CAPACITY_MACHINE_DRY': 4},
+    'cycle 12h, capacity 4': {'CUST_ORDER_CYCLE': 12 * 60, 'CAPACITY_MACHINE_WASH': 4, 'CAPACITY_MACHINE_DRY': 4},
+    # Six printers: wash and dry instead of build bound the line
+    'cycle 2.5h, capacity 4, 6 printers': {'CUST_ORDER_CYCLE': 150, 'NUM_MACHINES_BUILD': 6,
+                                           'CAPACITY_MACHINE_WASH': 4, 'CAPACITY_MACHINE_DRY': 4},
+}
+BATCH_NODES = ('wash', 'dry')
+
+
+def run_policy(overrides, replication, sim_duration):
+    """
+    One replication; per batch node: batch fill, jobs completed per day and average waiting time
+
+    Returns:
+        tuple: (per-node measures, average order makespan)
+    """
+    monitor = StationMonitor()
+    context = SimContext(SimConfig(overrides), replication=replication)
+    monitor.attach(context.hooks)
+    context.build(horizon=sim_duration).run(sim_duration)
+
+    measures = {}
+    for node in BATCH_NODES:
+        proc = context.manager.processes[node]
+        resources = list(proc.processor_resources.values())
+        batches = [size for res in resources for size in res.batch_sizes]
+        slots = sum(res.capacity * len(res.batch_sizes) for res in resources)
+        started = monitor.started.get(proc.name_process, 0)
+        measures[node] = {
+            'fill': sum(batches) / slots if slots else 0.0,
+            'throughput': len(proc.completed_jobs) / (sim_duration / (24 * 60)),
+            'waiting': monitor.waiting.get(proc.name_process, 0) / started if started else 0.0,
+        }
+    return measures, context.kpis()['avg_order_makespan']
+
+
+def compare_batch_policies(num_replications=3, sim_duration=8 * 7 * 24 * 60):
+    """Batch fill, throughput and waiting of wash and dry under both batch formation policies"""
+    print("================ Batch Formation Policies ================")
+    print(f"Hold time: wash {BATCH_MAX_HOLD_TIME_WASH}, dry {BATCH_MAX_HOLD_TIME_DRY} minutes; "
+          f"{num_replications} replications of {sim_duration // (24 * 60)} days\n")
+    for name, scenario in SCENARIOS.items():
+        print(f"{name}:")
+        for policy in POLICIES:
+            start_time = time.time()
+            runs = [run_policy({**scenario, 'POLICY_BATCH_FORMATION': policy}, replication, sim_duration)
+                    for replication in range(num_replications)]
+            elapsed = time.time() - start_time
+            columns = []
+            for node in BATCH_NODES:
+                fill, throughput, waiting = (np.mean([measures[node][key] for measures, _ in runs])
+                                             for key in ('fill', 'throughput', 'waiting'))
+                columns.append(f"{node} fill {fill:.2f} {throughput:5.1f} jobs/day waiting {waiting:5.1f}")
+            makespan = np.mean([makespan for _, makespan in runs if makespan is not None])
+            print(f"  {policy:15s} " + " | ".join(columns)
+                  + f" | order makespan {makespan:7.1f} ({elapsed:.1f} seconds)")
+    print("\n================ Comparison Ended ================")
+
+
+if __name__ == "__main__":
+    compare_batch_policies()
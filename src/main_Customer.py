@@ -1,7 +1,7 @@
 import simpy
 import time
-import random
 from config_SimPy import *
+from rng_SimPy import RandomStreams
 from base_Customer import Customer, SimpleOrderReceiver
 
 
@@ -21,19 +21,20 @@ class SimpleLogger:
         print(f"[{timestamp}] {event_type}: {message}")
 
 
-def run_customer_simulation(seed=None):
+def run_customer_simulation(seed=None, replication=0):
     """
     Simulate only the Customer order generation process.
 
     Args:
-        seed (int, optional): Random seed for reproducibility
+        seed (int, optional): Root seed for reproducibility
+        replication (int): Replication index
 
     Returns:
         SimpleOrderReceiver: Order receiver object with collected orders
     """
-    # Set random seed if provided
-    if seed is not None:
-        random.seed(seed)
+    # Random number streams of this replication
+    streams = RandomStreams(
+        seed if seed is not None else RANDOM_SEED, replication)
 
     # Create simulation environment
     env = simpy.Environment()
@@ -45,7 +46,7 @@ def run_customer_simulation(seed=None):
     order_receiver = SimpleOrderReceiver(env, logger)
 
     # Create and start customer
-    Customer(env, order_receiver, logger)
+    Customer(env, order_receiver, logger, streams.stream("customer"))
 
     # Start time measurement
     start_time = time.time()
@@ -0,0 +1,51 @@
+# main_Golden.py
+import os
+import sys
+from golden_SimPy import run_catalog, save_golden, check_golden, format_report
+from config_SimPy import *
+
+# Golden outputs committed with the repository (recorded with main_Golden.py record)
+GOLDEN_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_outputs.json")
+
+
+def run_golden_main(command="check", path=GOLDEN_FILE_PATH, rel_tol=0.0):
+    """
+    Record golden outputs of the reference scenarios, or check the current tree against them
+
+    Record on the trusted version, then check after a refactor or engine
+    change: KPIs and event traces must be identical (or KPIs within rel_tol).
+    Recording only happens on an explicit 'record'; checking without a
+    golden file fails.
+    """
+    print("================ Golden Output Check ================")
+    if command not in ("record", "check"):
+        raise ValueError(f"Unknown command: {command} (expected 'record' or 'check')")
+    if command == "record":
+        results = run_catalog()
+        save_golden(results, path)
+        for name, result in results.items():
+            print(f"{name:20s} {len(result['runs'])} runs  {result['runs'][0]['trace_sha256'][:16]}  "
+                  f"{result['wall_time']:.2f}s")
+        print(f"\nGolden outputs written to {path}")
+        print("\n================ Check Ended ================")
+        return True
+
+    if not os.path.exists(path):
+        print(f"No golden outputs at {path}; record them on a trusted version first")
+        print("\nFAILED")
+        print("\n================ Check Ended ================")
+        return False
+
+    report = check_golden(path, rel_tol=rel_tol)
+    print(format_report(report))
+    passed = all(row['verdict'] in ('identical', 'within tolerance') for row in report)
+    print(f"\n{'PASSED' if passed else 'FAILED'}")
+    print("\n================ Check Ended ================")
+    return passed
+
+
+if __name__ == "__main__":
+    passed = run_golden_main(sys.argv[1] if len(sys.argv) > 1 else "check",
+                             sys.argv[2] if len(sys.argv) > 2 else GOLDEN_FILE_PATH,
+                             float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
+    sys.exit(0 if passed else 1)
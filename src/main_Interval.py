@@ -0,0 +1,76 @@
+# main_Interval.py
+import time
+from context_SimPy import SimContext
+from interval_SimPy import IntervalIndex
+from settings_SimPy import SimConfig
+from config_SimPy import *
+
+# Busy line so that resources carry many intervals
+SCENARIO = {'CUST_ORDER_CYCLE': 2 * 60}
+
+
+def scan_at(processes, query_time):
+    """Reference answer of IntervalIndex.at by scanning every processing history
+
+    Returns:
+        dict: {(process name, resource name): set of job IDs}
+    """
+    result = {}
+    for proc in processes.values():
+        jobs = list(proc.completed_jobs)
+        for res in proc.processor_resources.values():
+            jobs.extend(res.current_jobs)
+        for job in jobs:
+            for step in job.processing_history:
+                end_time = step['end_time']
+                if step['start_time'] <= query_time and (end_time is None or end_time > query_time):
+                    result.setdefault((step['process'], step['resource_name']), set()).add(job.id_job)
+    return result
+
+
+def run_interval_queries(query_time=6 * 24 * 60, window=(5 * 24 * 60, 5 * 24 * 60 + 240),
+                         num_queries=200, sim_duration=4 * 7 * 24 * 60):
+    """Point-in-time and range queries over the processing trace of a run"""
+    print("================ Interval Index Queries ================")
+    context = SimContext(SimConfig(SCENARIO)).build(horizon=sim_duration).run(sim_duration)
+    processes = context.manager.get_processes()
+
+    start_time = time.time()
+    index = IntervalIndex.from_processes(processes)
+    print(f"Indexed {sum(len(starts) for starts in index.starts)} intervals on "
+          f"{len(index.resource_names)} resources ({time.time() - start_time:.3f} seconds)")
+
+    print(f"\nOn each resource at minute {query_time}:")
+    for resource, intervals in index.at(query_time).items():
+        print(f"  {resource}: " + ", ".join(
+            f"job {id_job} ({start:.0f}-{end:.0f})" for id_job, start, end in intervals))
+
+    dryer = next(name for name in index.resource_names if name.startswith("Dryer"))
+    print(f"\nJobs on {dryer} overlapping {window[0]}-{window[1]} (e.g., a maintenance window): "
+          f"{sorted(id_job for id_job, _, _ in index.overlapping(*window, dryer))}")
+
+    print("\nUtilization over the run:")
+    for resource in index.resource_names:
+        print(f"  {resource}: {index.utilization(resource, 0, sim_duration):.3f}")
+
+    # Index against linear scans over every job history
+    query_times = [sim_duration * (query + 0.5) / num_queries for query in range(num_queries)]
+    start_time = time.time()
+    indexed = [index.at(query) for query in query_times]
+    index_time = time.time() - start_time
+    start_time = time.time()
+    scanned = [scan_at(processes, query) for query in query_times]
+    scan_time = time.time() - start_time
+    keys = index.resource_keys
+    identical = all({keys[index.resource_index[resource]]: {id_job for id_job, _, _ in intervals}
+                     for resource, intervals in answer.items()} == reference
+                    for answer, reference in zip(indexed, scanned))
+    print(f"\n{num_queries} stabbing queries: index {index_time:.3f} vs scan {scan_time:.3f} seconds "
+          f"({scan_time / index_time:.0f}x, {'identical' if identical else 'DIFFERENT'} answers)")
+
+    print("\n================ Queries Ended ================")
+    return index
+
+
+if __name__ == "__main__":
+    run_interval_queries()
@@ -0,0 +1,61 @@
+# main_MultiSite.py
+import sys
+import time
+from multisite_SimPy import MultiSiteSimulation
+from settings_SimPy import SimConfig
+from config_SimPy import *
+
+# Busy sites with a short entry queue limit, so that jobs overflow between sites
+DEMO_SCENARIO = {'CUST_ORDER_CYCLE': 4 * 60, 'SITE_OVERFLOW_QUEUE_LIMIT': 3}
+
+
+def run_multisite(sim_duration=SIM_TIME, num_sites=NUM_SITES, seed=RANDOM_SEED,
+                  replication=0, parallel=True, overrides=DEMO_SCENARIO):
+    """
+    Run the multi-site farm simulation
+
+    Args:
+        sim_duration (int): Simulation duration (unit: minutes)
+        num_sites (int): Number of sites
+        seed (int): Root seed of the experiment
+        replication (int): Replication index
+        parallel (bool): Run each site in its own OS process
+        overrides (dict): config_SimPy settings of all sites
+
+    Returns:
+        list: Statistics of each site
+    """
+    print("================ Multi-Site Farm Simulation ================")
+    config = SimConfig(overrides)
+    print(f"{num_sites} sites, transfer delay (lookahead): {config.SITE_TRANSFER_DELAY} minutes, "
+          f"overflow queue limit: {config.SITE_OVERFLOW_QUEUE_LIMIT}, "
+          f"backend: {'parallel' if parallel else 'serial'}")
+
+    start_time = time.time()
+    simulation = MultiSiteSimulation(num_sites, seed, replication, parallel, config)
+    site_stats = simulation.run(sim_duration)
+    print(f"Finished in {time.time() - start_time:.3f} seconds")
+
+    for index, stats in enumerate(site_stats):
+        print(f"\nSite {index}:")
+        print(f"  Completed jobs (Build/Wash/Dry/Inspect): {stats['build_completed']}/"
+              f"{stats['wash_completed']}/{stats['dry_completed']}/{stats['inspect_completed']}")
+        print(f"  Jobs sent/received: {stats['jobs_sent']}/{stats['jobs_received']}")
+        print(f"  Completed orders: {stats['completed_orders']} (tardy: {stats['tardy_orders']})")
+        print(f"  Build queue: {stats['build_queue']}")
+
+    # Every transferred job is either received or still in flight
+    sent = sum(stats['jobs_sent'] for stats in site_stats)
+    received = sum(stats['jobs_received'] for stats in site_stats)
+    in_flight = simulation.jobs_in_flight(site_stats)
+    print(f"\nTransfers: {sent} sent = {received} received + {in_flight} in flight "
+          f"({'conserved' if sent == received + in_flight else 'NOT CONSERVED'})")
+
+    print("\n================ Simulation Ended ================")
+    return site_stats
+
+
+if __name__ == "__main__":
+    # Serial and parallel backends give identical results for the same seed
+    parallel = "--serial" not in sys.argv
+    run_multisite(parallel=parallel)
@@ -0,0 +1,36 @@
+# main_Optimizer.py
+import time
+from optimizer_SimPy import CapacityOptimizer
+from config_SimPy import *
+
+
+def run_optimizer(kpi='throughput_items_per_day', target=45.0, sense=">="):
+    """
+    Find the cheapest capacity configuration meeting a KPI target
+
+    Args:
+        kpi (str): Constrained KPI
+        target (float): KPI target
+        sense (str): ">=" or "<="
+    """
+    print("================ Capacity Optimization ================")
+    print(f"Constraint: {kpi} {sense} {target}")
+
+    start_time = time.time()
+    optimizer = CapacityOptimizer(kpi, target, sense,
+                                  fixed_overrides={'CUST_ORDER_CYCLE': 6 * 60})
+    result = optimizer.run(verbose=True)
+
+    print(f"\nBest configuration: {result['params']}")
+    print(f"  Cost: {result['cost']}")
+    print(f"  {kpi}: {result['kpi_mean']:.3f} +/- {result['kpi_half_width']:.3f} "
+          f"({result['replications']} replications, feasible: {result['feasible']})")
+    print(f"\nSimulation runs: {result['num_runs']} (full grid: {result['grid_runs']}, "
+          f"{result['grid_runs'] / result['num_runs']:.1f}x fewer), {time.time() - start_time:.1f} seconds")
+
+    print("\n================ Optimization Ended ================")
+    return result
+
+
+if __name__ == "__main__":
+    run_optimizer()
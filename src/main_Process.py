@@ -1,6 +1,5 @@
 # main_Process.py
 import simpy
-import random
 from base_Customer import Item
 from base_Job import Job
 from base_Process import Process
@@ -9,12 +8,13 @@ from log_SimPy import *
 
 
 class SimpleLogger:
-    def __init__(self):
+    def __init__(self, env=None):
+        self.env = env
         self.logs = []
 
     def log_event(self, event_type, message):
         """Log an event with a timestamp"""
-        current_time = env.now if 'env' in globals() else 0
+        current_time = self.env.now if self.env is not None else 0
         days = int(current_time // (24 * 60))
         hours = int((current_time % (24 * 60)) // 60)
         minutes = int(current_time % 60)
@@ -45,9 +45,8 @@ def run_process_validation():
     print("================ Process Class Validation Test Based on Integrated Interface ================")
 
     # Set up simulation environment
-    global env
     env = simpy.Environment()
-    logger = SimpleLogger()
+    logger = SimpleLogger(env)
 
     # Create basic processes (just 2)
     process_a = Process("Process_A", env, logger)
@@ -112,8 +111,5 @@ def run_until(env, duration):
 
 
 if __name__ == "__main__":
-    # Set random seed (for reproducible results)
-    random.seed(42)
-
     # Directly run generator function
     run_process_validation()
@@ -0,0 +1,45 @@
+# main_RareEvent.py
+import time
+from rare_SimPy import cross_entropy_tilt, estimate_miss_probability
+from config_SimPy import *
+
+
+def run_rare_event(target_relative_error=0.2, max_replications=20000, compare_crude=True):
+    """
+    Estimate the probability of a due-date miss with importance sampling
+
+    Args:
+        target_relative_error (float): Stop once the relative error reaches this value
+        max_replications (int): Replication budget of each estimator
+        compare_crude (bool): Also run crude Monte Carlo on the same budget
+    """
+    print("================ Rare Event Estimation ================")
+    print(f"Due date: {ORDER_DUE_DATE} minutes, defect rate: {DEFECT_RATE_PROC_BUILD}")
+
+    start_time = time.time()
+    tilt = cross_entropy_tilt()
+    print(f"\nCross-entropy tilt: {tilt} ({time.time() - start_time:.1f} seconds)")
+
+    estimators = [("Importance sampling", tilt)]
+    if compare_crude:
+        estimators.append(("Crude Monte Carlo", None))
+
+    results = {}
+    for name, estimator_tilt in estimators:
+        start_time = time.time()
+        result = estimate_miss_probability(estimator_tilt, target_relative_error,
+                                           max_replications=max_replications)
+        results[name] = result
+        print(f"\n{name}:")
+        print(f"  P(miss in run): {result['probability']:.3e} "
+              f"(relative error {result['relative_error']:.3f})")
+        print(f"  Order miss rate: {result['order_miss_rate']:.3e}")
+        print(f"  Replications: {result['replications']} ({result['hits']} with misses), "
+              f"{time.time() - start_time:.1f} seconds")
+
+    print("\n================ Estimation Ended ================")
+    return results
+
+
+if __name__ == "__main__":
+    run_rare_event()
@@ -0,0 +1,68 @@
+# main_Replay.py
+import os
+import sys
+import time
+from log_SimPy import Logger
+from trace_SimPy import TraceReplayer
+from stats_SimPy import StatisticsEngine
+from config_SimPy import *
+
+
+def run_replay(trace_path=TRACE_FILE_PATH):
+    """
+    Rebuild statistics and visualizations from a recorded event trace
+
+    Args:
+        trace_path (str): Path of a trace written with TRACE_RECORDING_ENABLED
+
+    Returns:
+        dict: Statistics as returned by Logger.collect_statistics (None if there is no trace)
+    """
+    print("================ Trace Replay ================")
+    if not os.path.exists(trace_path):
+        print(f"No trace at {trace_path}; record one by running main_SimPy.py with "
+              f"TRACE_RECORDING_ENABLED = True in config_SimPy.py")
+        print("\n================ Replay Ended ================")
+        return None
+
+    start_time = time.time()
+    replayer = TraceReplayer(trace_path)
+    processes = replayer.processes
+    print(f"Loaded {len(replayer.records)} events "
+          f"(end time: {replayer.env.now} minutes, {time.time() - start_time:.3f} seconds)")
+    sampled = replayer.sample is not None
+    if sampled:
+        print(f"WARNING: sampled trace ({replayer.sample['rate']:.1%} of {replayer.sample['unit'].lower()}s); "
+              f"job, batch and queue statistics below cover the sampled jobs only")
+
+    print("\nEvent totals (whole run):")
+    for name, count in replayer.event_totals().items():
+        print(f"  {name}: {count}")
+
+    # Logger works on the replayed processes exactly as on a live run
+    logger = Logger(replayer.env)
+    stats = logger.collect_statistics(processes)
+
+    suffix = " (sampled jobs only)" if sampled else ""
+    print(f"\nCompleted jobs by process{suffix}:")
+    for key, proc in processes.items():
+        print(f"  {proc.name_process}: {len(proc.completed_jobs)}")
+
+    print(f"\nStatistics{suffix}:")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
+
+    # Tail percentiles per process and resource from the columnar trace
+    engine = StatisticsEngine(replayer.records, replayer.footer)
+    print(f"\nWaiting, processing and flow time percentiles{suffix}:")
+    print(engine.percentile_table().to_string(index=False))
+
+    if GANTT_CHART_ENABLED or VIS_STAT_ENABLED:
+        logger.visualize_statistics(stats, processes)
+
+    print("\n================ Replay Ended ================")
+    return stats
+
+
+if __name__ == "__main__":
+    run_replay(sys.argv[1] if len(sys.argv) > 1 else TRACE_FILE_PATH)
@@ -0,0 +1,94 @@
+# main_Sampling.py
+import time
+from base_Customer import Item
+from context_SimPy import SimContext
+from settings_SimPy import SimConfig
+from trace_SimPy import TraceRecorder, read_trace
+from config_SimPy import *
+
+SAMPLINGS = [(1.0, "JOB"), (0.1, "JOB"), (0.01, "JOB"), (0.05, "ORDER")]
+
+
+SCENARIO = {'CUST_ORDER_CYCLE': 4 * 60}
+
+
+def run_untraced(sim_duration):
+    """Run time without tracing (reference for the tracing overhead)"""
+    context = SimContext(SimConfig(SCENARIO)).build(horizon=sim_duration)
+    start_time = time.time()
+    context.run(sim_duration)
+    return time.time() - start_time
+
+
+def recorder_overhead(rate, unit, path, num_jobs=100000, items_per_job=5):
+    """
+    Tracing cost per job outside the simulation (the run time of a whole
+    simulation is dominated by the model itself)
+
+    Returns:
+        tuple: (ns per job for job creation with the sampling decision,
+                ns per job for its job_start and job_end trace hooks)
+    """
+    context = SimContext(SimConfig({**SCENARIO, 'TRACE_SAMPLE_RATE': rate,
+                                    'TRACE_SAMPLE_UNIT': unit})).build()
+    manager = context.manager
+    recorder = TraceRecorder(context.env, path, sampler=manager.trace_sampler)
+    recorder.attach(manager)
+    proc = manager.proc_build
+    resource = next(iter(proc.processor_resources.values()))
+    items = [[Item(id_job // 3, id_job, index) for index in range(items_per_job)] for id_job in range(num_jobs)]
+
+    start_time = time.perf_counter()
+    jobs = [[manager.create_job(job_items)] for job_items in items]
+    create_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for job in jobs:
+        recorder.job_start(proc, resource, job)
+        recorder.job_end(proc, resource, job)
+    hook_time = time.perf_counter() - start_time
+    recorder.close()
+    return create_time / num_jobs * 1e9, hook_time / num_jobs * 1e9
+
+
+def run_sampled(rate, unit, path, sim_duration):
+    """Run with sampled tracing; return KPIs, trace footer, histories kept and run time"""
+    context = SimContext(SimConfig({**SCENARIO, 'TRACE_SAMPLE_RATE': rate,
+                                    'TRACE_SAMPLE_UNIT': unit})).build(horizon=sim_duration)
+    recorder = TraceRecorder(context.env, path, sampler=context.manager.trace_sampler)
+    recorder.attach(context.manager)
+    start_time = time.time()
+    context.run(sim_duration)
+    recorder.close()
+    elapsed = time.time() - start_time
+    histories = sum(len(job.processing_history) for proc in context.manager.processes.values()
+                    for job in proc.completed_jobs)
+    return context.kpis(), read_trace(path)[1], histories, elapsed
+
+
+def compare_samplings(path=TRACE_FILE_PATH, sim_duration=52 * 7 * 24 * 60):
+    """Trace size and tracing overhead of sampled tracing against full tracing, with exact KPIs and event counts"""
+    print("================ Sampled Tracing ================")
+    untraced = run_untraced(sim_duration)
+    print(f"Untraced run (full job histories): {untraced:.2f} seconds")
+    reference = None
+    for rate, unit in SAMPLINGS:
+        kpis, footer, histories, elapsed = run_sampled(rate, unit, path, sim_duration)
+        reference = reference if reference is not None else kpis
+        print(f"{unit:5s} {rate:5.0%}: {footer['num_records']:7d} trace records of "
+              f"{sum(footer['event_counts']):7d} events, {histories:6d} history steps, "
+              f"KPIs {'identical' if kpis == reference else 'DIFFERENT'} ({elapsed:.2f} seconds, "
+              f"tracing overhead {elapsed - untraced:+.2f})")
+
+    print("\nTracing cost per job outside the simulation (job start and end hooks):")
+    recorder_overhead(1.0, "JOB", path)  # Warm-up
+    full = None
+    for rate, unit in SAMPLINGS:
+        create_cost, hook_cost = recorder_overhead(rate, unit, path)
+        full = full or hook_cost
+        print(f"{unit:5s} {rate:5.0%}: hooks {hook_cost:5.0f} ns ({hook_cost / full:.2f} of full tracing), "
+              f"job creation with sampling decision {create_cost:5.0f} ns")
+    print("\n================ Sampling Ended ================")
+
+
+if __name__ == "__main__":
+    compare_samplings()
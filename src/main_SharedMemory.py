@@ -0,0 +1,67 @@
+# main_SharedMemory.py
+import math
+import time
+import pickle
+import multiprocessing
+import numpy as np
+from scenario_SimPy import run_scenario
+from shm_SimPy import SharedReplicationRunner, SharedTraceRecorder, SHARED_KPI_NAMES
+from trace_SimPy import TRACE_DTYPE
+from config_SimPy import *
+
+SCENARIO = {'CUST_ORDER_CYCLE': 4 * 60}
+TRACE_CAPACITY = 100000
+
+
+def pickled_replication(args):
+    """Baseline worker: run one replication and return KPIs and trace through the result pipe"""
+    replication, sim_duration = args
+    records = np.zeros(TRACE_CAPACITY, dtype=TRACE_DTYPE)
+    recorder = None
+
+    def attach(manager):
+        nonlocal recorder
+        recorder = SharedTraceRecorder(manager.env, records)
+        recorder.attach(manager)
+
+    kpis = run_scenario(SCENARIO, RANDOM_SEED, replication, sim_duration, attach)
+    return kpis, records[:recorder.num_records].copy(), recorder.close()
+
+
+def compare_aggregation(num_replications=16, num_workers=None, sim_duration=8 * 7 * 24 * 60):
+    """Wall time and bytes crossing the process boundary: shared memory runner against Pool.map"""
+    print("================ Shared Memory Replications ================")
+    num_workers = num_workers or multiprocessing.cpu_count()
+
+    start_time = time.time()
+    with multiprocessing.get_context().Pool(num_workers) as pool:
+        results = pool.map(pickled_replication, [(replication, sim_duration)
+                                                 for replication in range(num_replications)])
+    pool_time = time.time() - start_time
+    pool_bytes = sum(len(pickle.dumps(result)) for result in results)
+    pool_kpis = np.array([[kpis[name] if kpis.get(name) is not None else math.nan
+                           for name in SHARED_KPI_NAMES] for kpis, _, _ in results])
+
+    start_time = time.time()
+    with SharedReplicationRunner(num_replications, SCENARIO, sim_duration=sim_duration,
+                                 trace_capacity=TRACE_CAPACITY) as runner:
+        runner.run(num_workers)
+        shared_time = time.time() - start_time
+        identical = (np.array_equal(runner.kpis, pool_kpis, equal_nan=True)
+                     and all(np.array_equal(runner.trace(replication), records)
+                             for replication, (_, records, _) in enumerate(results)))
+        print(f"{num_replications} replications on {num_workers} workers "
+              f"({sum(len(records) for _, records, _ in results)} trace records)")
+        print(f"  Pool.map (pickled):  {pool_time:6.2f} seconds, {pool_bytes / 1e6:8.3f} MB transferred")
+        print(f"  Shared memory:       {shared_time:6.2f} seconds, {runner.message_bytes / 1e6:8.3f} MB transferred")
+        print(f"  KPIs and traces {'identical' if identical else 'DIFFERENT'}")
+
+        print("\nKPI summary:")
+        for name, stats in runner.summary().items():
+            print(f"  {name}: {stats['mean']:.3f} +/- {stats['half_width']:.3f} ({stats['count']} values)")
+
+    print("\n================ Comparison Ended ================")
+
+
+if __name__ == "__main__":
+    compare_aggregation()
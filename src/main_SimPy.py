@@ -1,27 +1,51 @@
 # main.py
-import simpy
-import random
-from base_Customer import Customer
-from manager import Manager
+from context_SimPy import SimContext
 from log_SimPy import Logger
+from trace_SimPy import TraceRecorder
+from timeline_SimPy import ChromeTraceExporter
+from hooks_SimPy import LiveAggregator, JsonLinesSink, ThreadedSink
 from config_SimPy import *
 
 
-def run_simulation(sim_duration=SIM_TIME):
-    """Run the manufacturing simulation"""
+def run_simulation(sim_duration=SIM_TIME, seed=RANDOM_SEED, replication=0):
+    """
+    Run the manufacturing simulation
+
+    Args:
+        sim_duration (int): Simulation duration (unit: minutes)
+        seed (int): Root seed of the experiment
+        replication (int): Replication index (selects independent random streams)
+    """
     print("================ Manufacturing Process Simulation ================")
 
-    # Setup simulation environment
-    env = simpy.Environment()
+    # Setup simulation context (environment, settings and random streams of this replication)
+    context = SimContext(seed=seed, replication=replication)
+    env = context.env
 
     # Create logger with env
     logger = Logger(env)
 
-    # Create manager and provide logger
-    manager = Manager(env, logger)
+    # Create manager and customer (order generator selected by CUST_ORDER_GENERATOR)
+    context.build(logger, horizon=sim_duration)
+    manager = context.manager
+
+    # Record event trace for later re-analysis if enabled
+    trace_recorder = None
+    if TRACE_RECORDING_ENABLED:
+        trace_recorder = TraceRecorder(env, TRACE_FILE_PATH, sampler=manager.trace_sampler)
+        trace_recorder.attach(manager)
 
-    # Create customer to generate orders
-    Customer(env, manager, logger)
+    # Stream the timeline for a trace viewer if enabled
+    timeline_exporter = None
+    if TIMELINE_EXPORT_ENABLED:
+        timeline_exporter = ChromeTraceExporter(env, TIMELINE_FILE_PATH)
+        timeline_exporter.attach(manager)
+
+    # Stream throttled live snapshots if enabled
+    live_sink = None
+    if LIVE_VIEW_ENABLED:
+        live_sink = ThreadedSink(JsonLinesSink(LIVE_VIEW_FILE_PATH))
+        LiveAggregator(env, LIVE_VIEW_INTERVAL, [live_sink]).attach(manager.hooks)
 
     # Run simulation
     print("\nStarting simulation...")
@@ -30,6 +54,18 @@ def run_simulation(sim_duration=SIM_TIME):
     # Run simulation
     env.run(until=sim_duration)
 
+    if trace_recorder is not None:
+        trace_recorder.close()
+        print(f"Event trace written to {TRACE_FILE_PATH}")
+
+    if timeline_exporter is not None:
+        timeline_exporter.close()
+        print(f"Timeline written to {TIMELINE_FILE_PATH}")
+
+    if live_sink is not None:
+        live_sink.close()
+        live_sink.sink.close()
+
     # Collect and display results
     print("\n================ Simulation Results ================")
 
@@ -45,6 +81,14 @@ def run_simulation(sim_duration=SIM_TIME):
 
     print(f"\nRemaining defective items: {manager_stats['defective_items']}")
 
+    # Order completion
+    print(f"\nCompleted orders: {manager_stats['completed_orders']} "
+          f"(tardy: {manager_stats['tardy_orders']})")
+    if manager_stats['completed_orders']:
+        print(f"  Average order makespan: {manager_stats['avg_order_makespan']:.1f} minutes")
+    if manager_stats['completed_items']:
+        print(f"  Average rework loops per item: {manager_stats['avg_rework_loops_per_item']:.3f}")
+
     # Queue statistics
     print("\nFinal queue lengths:")
     print(f"  Build queue: {manager_stats['build_queue']}")
@@ -66,8 +110,5 @@ def run_simulation(sim_duration=SIM_TIME):
 
 
 if __name__ == "__main__":
-    # Set random seed for reproducibility
-    random.seed(42)
-
-    # Run the simulation
+    # Run the simulation (reproducible from RANDOM_SEED and replication index)
     run_simulation()
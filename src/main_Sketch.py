@@ -0,0 +1,59 @@
+# main_Sketch.py
+import time
+import pickle
+import numpy as np
+from sketch_SimPy import SketchRecorder, SketchSet, run_sketched_replications
+from scenario_SimPy import run_scenario
+from config_SimPy import *
+
+SCENARIO = {'CUST_ORDER_CYCLE': 4 * 60}
+METRICS = ('order_flow_time', 'Proc_Build_waiting_time', 'Proc_Wash_flow_time', 'Proc_Inspect_waiting_time')
+
+
+def exact_check(num_replications=4, sim_duration=4 * 7 * 24 * 60):
+    """Merged sketches against exact percentiles of all samples of a few replications"""
+    merged = SketchSet()
+    samples = {}
+    for replication in range(num_replications):
+        recorder = SketchRecorder()
+
+        def attach(manager):
+            recorder.attach(manager.hooks)
+            # Keep every order makespan for the exact reference
+            manager.hooks.subscribe('order_completed', lambda order: samples.setdefault(
+                'order_flow_time', []).append(order.makespan))
+
+        run_scenario(SCENARIO, replication=replication, sim_duration=sim_duration, attach=attach)
+        merged.merge(SketchSet.from_dict(recorder.sketch_set.to_dict()))
+
+    values = np.array(samples['order_flow_time'])
+    sketch = merged.get('order_flow_time')
+    print(f"Order flow time over {len(values)} orders of {num_replications} replications (exact vs sketch):")
+    for percentile in (50, 95, 99):
+        print(f"  p{percentile}: {np.percentile(values, percentile):10.1f} vs "
+              f"{sketch.quantile(percentile / 100):10.1f}")
+
+
+def run_fleet(num_replications=64, sim_duration=4 * 7 * 24 * 60, num_workers=4):
+    """Fleet-wide percentiles from sketches merged over many replications"""
+    print("================ Quantile Sketches ================")
+    exact_check(sim_duration=sim_duration)
+
+    start_time = time.time()
+    _, merged = run_sketched_replications(num_replications, SCENARIO, sim_duration=sim_duration,
+                                          num_workers=num_workers)
+    elapsed = time.time() - start_time
+    size = len(pickle.dumps(merged.to_dict()))
+    print(f"\n{num_replications} replications on {num_workers} workers ({elapsed:.2f} seconds), "
+          f"{len(merged.sketches)} merged sketches of {size / 1024:.0f} KB:")
+    stats = merged.collect_statistics()
+    for metric in METRICS:
+        print(f"  {metric:28s} n={stats[f'{metric}_count']:7d}  p50 {stats[f'{metric}_p50']:8.1f}  "
+              f"p95 {stats[f'{metric}_p95']:8.1f}  p99 {stats[f'{metric}_p99']:8.1f}")
+
+    print("\n================ Sketches Ended ================")
+    return merged
+
+
+if __name__ == "__main__":
+    run_fleet()
@@ -0,0 +1,48 @@
+# main_Surrogate.py
+import os
+import time
+from scenario_SimPy import parameter_grid, run_sweep, load_results
+from surrogate_SimPy import GaussianProcessSurrogate, suggest_points
+from config_SimPy import *
+
+SWEEP_RESULTS_PATH = "sweep_results.jsonl"
+SPACE = {
+    'NUM_MACHINES_BUILD': [1, 2, 3, 4],
+    'NUM_MACHINES_WASH': [1, 2],
+    'NUM_MACHINES_DRY': [1, 2],
+}
+KPI = 'throughput_items_per_day'
+
+
+def run_surrogate(results_path=SWEEP_RESULTS_PATH, num_replications=2):
+    """
+    Fit a KPI surrogate on accumulated sweep results and query it
+
+    A coarse sweep is simulated first if no results have been accumulated yet.
+    """
+    print("================ KPI Surrogate ================")
+    if not os.path.exists(results_path):
+        print(f"No results in {results_path}, running a coarse sweep...")
+        run_sweep(parameter_grid(SPACE), num_replications, results_path=results_path)
+    records = load_results(results_path)
+
+    model = GaussianProcessSurrogate(list(SPACE), KPI).fit(records)
+    print(f"Fitted on {len(records)} runs (length scale {model.length_scale}, noise {model.noise})")
+
+    query = {'NUM_MACHINES_BUILD': 4, 'NUM_MACHINES_WASH': 2, 'NUM_MACHINES_DRY': 1}
+    start_time = time.perf_counter()
+    mean, std = model.predict(query)
+    elapsed = (time.perf_counter() - start_time) * 1e6
+    print(f"\n{KPI} at {query}: {mean[0]:.2f} +/- {1.96 * std[0]:.2f} ({elapsed:.0f} microseconds)")
+
+    candidates = parameter_grid({name: list(range(1, 7)) for name in SPACE})
+    print("\nSuggested points to simulate next:")
+    for point in suggest_points(model, candidates, num_points=5):
+        print(f"  {point}")
+
+    print("\n================ Surrogate Ended ================")
+    return model
+
+
+if __name__ == "__main__":
+    run_surrogate()
@@ -0,0 +1,40 @@
+# main_Sweep.py
+import os
+import sys
+import time
+from scenario_SimPy import parameter_grid
+from sweep_SimPy import SweepStore, run_sweep_queue
+from config_SimPy import *
+
+SWEEP_DATABASE_PATH = "sweep.db"
+SPACE = {
+    'NUM_MACHINES_BUILD': [1, 2, 3, 4],
+    'NUM_MACHINES_WASH': [1, 2],
+    'NUM_MACHINES_DRY': [1, 2],
+    'NUM_WORKERS_IN_INSPECT': [2, 5],
+}
+
+
+def run_sweep_main(path=SWEEP_DATABASE_PATH, num_replications=5, num_workers=os.cpu_count()):
+    """
+    Run (or resume) a parameter sweep stored in a SQLite database
+
+    Interrupting and re-running continues where the sweep stopped.
+    """
+    print("================ Parameter Sweep ================")
+    start_time = time.time()
+    progress = run_sweep_queue(path, parameter_grid(SPACE), num_replications,
+                               num_workers=num_workers)
+    print(f"Tasks: {progress} ({time.time() - start_time:.1f} seconds)")
+
+    store = SweepStore(path)
+    records = store.results()
+    store.close()
+    print(f"{len(records)} finished runs in {path}")
+
+    print("\n================ Sweep Ended ================")
+    return records
+
+
+if __name__ == "__main__":
+    run_sweep_main(sys.argv[1] if len(sys.argv) > 1 else SWEEP_DATABASE_PATH)
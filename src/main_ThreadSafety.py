@@ -0,0 +1,77 @@
+# main_ThreadSafety.py
+import time
+import hashlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from context_SimPy import run_replication
+from settings_SimPy import SimConfig
+from shm_SimPy import SharedTraceRecorder
+from trace_SimPy import TRACE_DTYPE
+from config_SimPy import *
+
+TRACE_CAPACITY = 200000
+# Scenarios run side by side; different settings in concurrent runs must not leak into each other
+SCENARIOS = [
+    {},
+    {'NUM_MACHINES_BUILD': 1, 'DEFECT_RATE_PROC_BUILD': 0.2, 'CUST_ORDER_CYCLE': 6 * 60},
+    {'NUM_MACHINES_WASH': 1, 'NUM_MACHINES_DRY': 1, 'CUST_ORDER_CYCLE': 4 * 60},
+]
+
+
+def run_fingerprinted(overrides, replication, sim_duration):
+    """Run one replication and return its KPIs and a digest of its full event trace"""
+    records = np.zeros(TRACE_CAPACITY, dtype=TRACE_DTYPE)
+    recorder = None
+
+    def attach(context):
+        nonlocal recorder
+        recorder = SharedTraceRecorder(context.env, records)
+        recorder.attach(context.manager)
+
+    kpis = run_replication(SimConfig(overrides), RANDOM_SEED, replication, sim_duration, attach)
+    if recorder.num_events > TRACE_CAPACITY:
+        raise ValueError(f"Trace of replication {replication} exceeds {TRACE_CAPACITY} records")
+    digest = hashlib.sha256(records[:recorder.num_records].tobytes()).hexdigest()
+    return kpis, recorder.num_events, digest
+
+
+def run_thread_safety_validation(num_replications=4, num_workers=8, sim_duration=SIM_TIME):
+    """
+    Check that replications on a thread pool are bit-identical to serial runs
+
+    Every (scenario, replication) pair is run serially, then all pairs are
+    run concurrently on a thread pool. KPIs must be equal and the event
+    traces (every record of every event) must have the same SHA-256 digest.
+    """
+    print("================ Thread Safety Validation ================")
+    tasks = [(overrides, replication) for overrides in SCENARIOS
+             for replication in range(num_replications)]
+
+    start_time = time.time()
+    serial = [run_fingerprinted(overrides, replication, sim_duration)
+              for overrides, replication in tasks]
+    serial_time = time.time() - start_time
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        threaded = list(executor.map(
+            lambda task: run_fingerprinted(task[0], task[1], sim_duration), tasks))
+    threaded_time = time.time() - start_time
+
+    mismatches = 0
+    for (overrides, replication), (kpis, events, digest), (kpis_t, events_t, digest_t) in zip(
+            tasks, serial, threaded):
+        identical = kpis == kpis_t and events == events_t and digest == digest_t
+        mismatches += not identical
+        print(f"{str(overrides or 'default'):70s} rep {replication}: {events:6d} events "
+              f"{digest[:12]} {'identical' if identical else 'MISMATCH'}")
+
+    print(f"\nSerial: {serial_time:.1f} seconds, thread pool ({num_workers} threads): "
+          f"{threaded_time:.1f} seconds")
+    print(f"{len(tasks) - mismatches}/{len(tasks)} runs bit-identical")
+    print("\n================ Validation Ended ================")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    run_thread_safety_validation()
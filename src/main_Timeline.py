@@ -0,0 +1,31 @@
+# main_Timeline.py
+import time
+from context_SimPy import SimContext
+from timeline_SimPy import ChromeTraceExporter
+from settings_SimPy import SimConfig
+from config_SimPy import *
+
+# Busy multi-week line with rework, so that the timeline carries many spans
+SCENARIO = {'CUST_ORDER_CYCLE': 2 * 60}
+
+
+def export_timeline(path=TIMELINE_FILE_PATH, sim_duration=4 * 7 * 24 * 60):
+    """Run a scenario and export its timeline for chrome://tracing or ui.perfetto.dev"""
+    print("================ Timeline Export ================")
+    context = SimContext(SimConfig(SCENARIO)).build(horizon=sim_duration)
+    exporter = ChromeTraceExporter(context.env, path)
+    exporter.attach(context.manager)
+
+    start_time = time.time()
+    context.run(sim_duration)
+    exporter.close()
+    print(f"Wrote {exporter.num_events} trace events to {path} "
+          f"({time.time() - start_time:.2f} seconds)")
+    print("Open the file in chrome://tracing or drop it on https://ui.perfetto.dev")
+
+    print("\n================ Export Ended ================")
+    return exporter
+
+
+if __name__ == "__main__":
+    export_timeline()
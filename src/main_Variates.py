@@ -0,0 +1,57 @@
+# main_Variates.py
+import time
+import numpy as np
+from scenario_SimPy import run_scenario
+from variates_SimPy import VariateBuffer, make_sampler
+from config_SimPy import *
+
+# Processing time scenarios (same means, increasing variability)
+SCENARIOS = {
+    'Constant': {},
+    'Lognormal cv 0.3': {'PROC_TIME_DISTRIBUTIONS': {
+        process_type: {'type': 'LOGNORMAL', 'cv': 0.3}
+        for process_type in ('Proc_Build', 'Proc_Wash', 'Proc_Dry', 'Proc_Inspect')}},
+    'Gamma cv 0.6 (build)': {'PROC_TIME_DISTRIBUTIONS': {
+        'Proc_Build': {'type': 'GAMMA', 'cv': 0.6}}},
+    'Empirical (wash log)': {'PROC_TIME_DISTRIBUTIONS': {
+        'Proc_Wash': {'type': 'EMPIRICAL', 'samples': [95, 110, 115, 120, 120, 125, 130, 150, 185]}}},
+}
+KPIS = ('completed_orders', 'avg_order_makespan', 'tardy_orders', 'wip_jobs')
+
+
+def draw_overhead(num_draws=200000):
+    """Cost per draw of a refilled buffer against one numpy call per draw"""
+    sampler = make_sampler({'type': 'LOGNORMAL', 'cv': 0.3}, PROC_TIME_BUILD)
+    rng = np.random.default_rng(RANDOM_SEED)
+    start_time = time.time()
+    for _ in range(num_draws):
+        sampler(rng, None)
+    scalar_time = time.time() - start_time
+
+    buffer = VariateBuffer(sampler, np.random.default_rng(RANDOM_SEED))
+    start_time = time.time()
+    for _ in range(num_draws):
+        buffer.next()
+    buffer_time = time.time() - start_time
+    print(f"Per draw: buffer {buffer_time / num_draws * 1e9:.0f} ns vs "
+          f"numpy call {scalar_time / num_draws * 1e9:.0f} ns")
+
+
+def compare_variability(sim_duration=8 * 7 * 24 * 60, num_replications=5):
+    """KPIs of constant and random processing times with the same means"""
+    print("================ Stochastic Processing Times ================")
+    draw_overhead()
+    print()
+    for name, overrides in SCENARIOS.items():
+        start_time = time.time()
+        runs = [run_scenario({'CUST_ORDER_CYCLE': 4 * 60, **overrides}, replication=replication,
+                             sim_duration=sim_duration) for replication in range(num_replications)]
+        elapsed = time.time() - start_time
+        means = {kpi: np.mean([run[kpi] or 0 for run in runs]) for kpi in KPIS}
+        print(f"{name:22s} " + "  ".join(f"{kpi} {value:8.1f}" for kpi, value in means.items())
+              + f"  ({elapsed:.2f} seconds)")
+    print("\n================ Comparison Ended ================")
+
+
+if __name__ == "__main__":
+    compare_variability()
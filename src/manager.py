@@ -2,6 +2,17 @@ from base_Job import Job
 from config_SimPy import *
 from specialized_Process import Proc_Build, Proc_Wash, Proc_Dry, Proc_Inspect
 from base_Customer import OrderReceiver
+from rng_SimPy import RandomStreams
+from settings_SimPy import SimConfig
+from hooks_SimPy import HookBus
+from routing_SimPy import compile_routing
+from variates_SimPy import attach_processing_times
+from sampling_SimPy import TraceSampler
+from rework_SimPy import combined_latency_statistics
+
+
+# Process types of routing graph nodes (also the default process names)
+PROCESS_TYPES = ("Proc_Build", "Proc_Wash", "Proc_Dry", "Proc_Inspect")
 
 
 class Manager(OrderReceiver):
@@ -10,41 +21,97 @@ class Manager(OrderReceiver):
 
     Attributes:
         env (simpy.Environment): Simulation environment
+        config (SimConfig): Simulation settings
         logger (Logger): Logger object for logging events
+        streams (RandomStreams): Random number streams of this replication
+        hooks (HookBus): Hook bus shared by the manager and all processes
+        trace_sampler (TraceSampler): Jobs traced in detail (None: all jobs, see TRACE_SAMPLE_RATE)
+        routing (RoutingTable): Routing table compiled from the routing graph
+        processes (dict): All processes {node name: Process}
+        proc_build (Process): Entry process (receives new and rework jobs)
+        proc_inspect (Process): First inspection process
+        inspect_processes (list): All inspection processes (each collects its own defective items)
         next_job_id (int): Next job ID counter
         completed_orders (list): List of completed orders 
+        completion_stats (dict): Online accumulators for item, patient and order completion
     """
 
-    def __init__(self, env, logger=None):
+    def __init__(self, env, logger=None, streams=None, hooks=None, routing_graph=None, config=None):
         self.env = env
+        self.config = config if config is not None else SimConfig()
         self.logger = logger
+        self.streams = streams if streams is not None else RandomStreams(self.config.RANDOM_SEED)
+        self.hooks = hooks if hooks is not None else HookBus()
+        self.routing = compile_routing(
+            routing_graph if routing_graph is not None else self.config.ROUTING_GRAPH)
 
         # Next job ID counter
         self.next_job_id = 1
 
         # Tracking completed jobs and orders
         self.completed_orders = []
+        self.completion_stats = {
+            'completed_items': 0,
+            'total_rework_loops': 0,
+            'max_rework_loops': 0,
+            'completed_patients': 0,
+            'total_patient_makespan': 0,
+            'completed_orders': 0,
+            'total_order_makespan': 0,
+            'max_order_makespan': 0,
+            'tardy_orders': 0,
+            'total_order_tardiness': 0,
+        }
 
         # When calling setup_processes, the manager (self) itself is also passed as an argument
         self.setup_processes(manager=self)
 
     def setup_processes(self, manager=None):
-        """Create and connect all manufacturing processes"""
+        """Create all processes of the routing graph and connect them through the routing table"""
         # Create processes
-        self.proc_build = Proc_Build(self.env, self.logger)
-        self.proc_wash = Proc_Wash(self.env, self.logger)
-        self.proc_dry = Proc_Dry(self.env, self.logger)
-        self.proc_inspect = Proc_Inspect(self.env, manager, self.logger)
+        self.processes = {}
+        self.trace_sampler = TraceSampler.from_config(self.config)
+        for node, process_type in zip(self.routing.node_names, self.routing.node_types):
+            self.processes[node] = self.create_process(node, process_type, manager)
+            attach_processing_times(self.processes[node], process_type, node, self.streams, self.config)
 
         # Connect processes
-        self.proc_build.connect_to_next_process(self.proc_wash)
-        self.proc_wash.connect_to_next_process(self.proc_dry)
-        self.proc_dry.connect_to_next_process(self.proc_inspect)
+        self.routing.bind(self.processes)
+
+        # Entry and inspection processes used for order and rework handling
+        self.proc_build = self.routing.entry_process()
+        self.inspect_processes = [proc for proc in self.processes.values()
+                                  if isinstance(proc, Proc_Inspect)]
+        self.proc_inspect = self.inspect_processes[0] if self.inspect_processes else None
+        self.proc_wash = self.processes.get('wash')
+        self.proc_dry = self.processes.get('dry')
 
         if self.logger:
             self.logger.log_event(
                 "Manager", "Manufacturing processes created and connected")
 
+    def process_name(self, node, process_type):
+        """Process name of a routing graph node (nodes other than the first of a type get a distinct name)"""
+        if process_type not in PROCESS_TYPES:
+            raise ValueError(f"Unknown process type: {process_type}")
+        name_process = process_type
+        if any(proc.name_process == name_process for proc in self.processes.values()):
+            name_process = f"{name_process}_{node}"
+        return name_process
+
+    def create_process(self, node, process_type, manager=None):
+        """Create the process of a routing graph node"""
+        name_process = self.process_name(node, process_type)
+
+        if process_type == "Proc_Build":
+            return Proc_Build(self.env, self.logger, self.streams.stream(f"proc_{node}"),
+                              self.hooks, name_process, self.config)
+        if process_type == "Proc_Wash":
+            return Proc_Wash(self.env, self.logger, self.hooks, name_process, self.config)
+        if process_type == "Proc_Dry":
+            return Proc_Dry(self.env, self.logger, self.hooks, name_process, self.config)
+        return Proc_Inspect(self.env, manager, self.logger, self.hooks, name_process, self.config)
+
     def receive_order(self, order):
         """Process incoming order from Customer"""
         if self.logger:
@@ -54,6 +121,9 @@ class Manager(OrderReceiver):
         # Mark order start time
         order.time_start = self.env.now
 
+        if self.hooks.order_received:
+            self.hooks.emit('order_received', order)
+
         # Convert order to jobs based on policy
         self.create_jobs_for_proc_build(order)
 
@@ -67,99 +137,190 @@ class Manager(OrderReceiver):
             patient_items = patient.list_items
 
             # If patient's items fit within PALLET_SIZE_LIMIT, create a single job
-            if len(patient_items) <= PALLET_SIZE_LIMIT:
+            if len(patient_items) <= self.config.PALLET_SIZE_LIMIT:
                 # Create a job with all items from this patient
-                job = Job(self.next_job_id, patient_items)
-                self.next_job_id += 1
+                job = self.create_job(patient_items)
 
                 # Send job to Build process
                 if self.logger:
                     self.logger.log_event(
                         "Manager", f"Created job {job.id_job} for patient {patient.id_patient} with {len(patient_items)} items")
                 
-                self.proc_build.add_to_queue(job)
+                self.release_job(job)
 
             else:
                 # Patient's items exceed PALLET_SIZE_LIMIT, apply splitting policy
-                if POLICY_ORDER_TO_JOB == "MAX_PER_JOB":
+                if self.config.POLICY_ORDER_TO_JOB == "MAX_PER_JOB":
                     # Split items into multiple jobs of roughly equal size
-                    items_per_job = PALLET_SIZE_LIMIT
+                    items_per_job = self.config.PALLET_SIZE_LIMIT
                     for i in range(0, len(patient_items), items_per_job):
                         job_items = patient_items[i:i+items_per_job]
-                        job = Job(self.next_job_id, job_items)
-                        self.next_job_id += 1
+                        job = self.create_job(job_items)
 
                         # Send job to Build process
                         if self.logger:
                             self.logger.log_event(
                                 "Manager", f"Created job {job.id_job} for patient {patient.id_patient} with {len(job_items)} items (split job)")
-                        self.proc_build.add_to_queue(job)
+                        self.release_job(job)
 
                 # Additional policies can be implemented here if needed
 
-    def create_job_for_defects(self):
-        """Create jobs for defective items that need rework"""
+    def create_job(self, items):
+        """
+        Create a job with the next job ID
+
+        Under sampled tracing, whether the job is traced is decided here, once;
+        processes and trace recorders only read Job.traced.
+        """
+        job = Job(self.next_job_id, items)
+        self.next_job_id += 1
+        if self.trace_sampler is not None:
+            job.traced = self.trace_sampler.sampled(job)
+        return job
+
+    def release_job(self, job, process=None, position=None):
+        """
+        Send a new or rework job into the line
+
+        Args:
+            job (Job): Job to release
+            process (Process): Destination process (entry process if None)
+            position (int): Queue index to insert at (None: end of queue)
+        """
+        if process is None:
+            process = self.proc_build
+        process.add_to_queue(job, position)
+
+    def create_job_for_defects(self, inspect_proc=None):
+        """
+        Create as many rework jobs as the rework pool of an inspection process allows
+        (full or aged partial batches)
+
+        Args:
+            inspect_proc (Process): Inspection process whose pool is drained (first one if None)
+        """
+        if inspect_proc is None:
+            inspect_proc = self.proc_inspect
         # Get defective items from inspection process
-        defective_items = self.proc_inspect.defective_items
+        rework_pool = inspect_proc.defective_items
 
-        if not defective_items:
+        if not rework_pool:
             return
 
-        # Log the number of defective items found
-        # if self.logger:
-        #     self.logger.log_event(
-        #         "Manager", f"Found {len(defective_items)} defective items to process")
-
-        # Check if we have enough defective items for a job
-        if len(defective_items) >= POLICY_NUM_DEFECT_PER_JOB:
-            # Take the specified number of defective items
-            items_for_job = defective_items[:POLICY_NUM_DEFECT_PER_JOB]
+        # Rework destination from the routing graph (entry process by default)
+        rework_process = self.routing.rework_process(inspect_proc)
+        if rework_process is None:
+            rework_process = self.proc_build
 
+        for items_for_job in rework_pool.take_batches():
             # Create a new job for these defective items
-            job = Job(self.next_job_id, items_for_job)
+            job = self.create_job(items_for_job)
             job.is_reprocess = True  # Mark as a rework job
-            self.next_job_id += 1
 
-            # Remove these items from the defective items list
-            self.proc_inspect.defective_items = defective_items[POLICY_NUM_DEFECT_PER_JOB:]
+            if self.hooks.rework_created:
+                self.hooks.emit('rework_created', rework_process, job)
 
             # Add the job to the Build process queue according to policy
-            if POLICY_REPROC_SEQ_IN_QUEUE == "QUEUE_LAST":
-                # Add job to the end of the queue
-                self.proc_build.add_to_queue(job)
-                if self.logger:
-                    self.logger.log_event(
-                        "Manager", f"Created rework job {job.id_job} with {len(items_for_job)} defective items (added to end of queue)")
+            position = self.rework_queue_position(rework_process)
+            self.release_job(job, rework_process, position)
+            if self.logger:
+                self.logger.log_event(
+                    "Manager", f"Created rework job {job.id_job} with {len(items_for_job)} defective items (policy: {self.config.POLICY_REPROC_SEQ_IN_QUEUE})")
+
+                self.logger.log_event(
+                    "Manager", f"Remaining defective items: {len(rework_pool)}")
+
+    def rework_queue_position(self, rework_process):
+        """Queue index for a new rework job according to POLICY_REPROC_SEQ_IN_QUEUE (None: end of queue)"""
+        if self.config.POLICY_REPROC_SEQ_IN_QUEUE == "QUEUE_FIRST":
+            return 0
+        if self.config.POLICY_REPROC_SEQ_IN_QUEUE == "PRIORITY":
+            # Behind rework jobs already waiting at the head of the queue
+            position = 0
+            for queued_job in rework_process.job_store.items:
+                if not queued_job.is_reprocess:
+                    break
+                position += 1
+            return position
+        return None
+
+    def item_completed(self, item):
+        """
+        Mark an inspected item as completed and update completion statistics
+
+        Patient and order completion are detected with remaining-item counters,
+        so each call is O(1).
+        """
+        stats = self.completion_stats
+        stats['completed_items'] += 1
+        stats['total_rework_loops'] += item.num_rework
+        if item.num_rework > stats['max_rework_loops']:
+            stats['max_rework_loops'] = item.num_rework
+
+        # Returns True only when this item completed its patient
+        if not item.check_completion(self.env):
+            return
+
+        patient = item.patient
+        stats['completed_patients'] += 1
+        stats['total_patient_makespan'] += patient.makespan
+
+        order = patient.order
+        if order is not None and order.is_completed:
+            self.order_completed(order)
+
+    def order_completed(self, order):
+        """Record a completed order (makespan and tardiness against its due date)"""
+        self.completed_orders.append(order)
+
+        stats = self.completion_stats
+        stats['completed_orders'] += 1
+        stats['total_order_makespan'] += order.makespan
+        if order.makespan > stats['max_order_makespan']:
+            stats['max_order_makespan'] = order.makespan
+        if order.tardiness > 0:
+            stats['tardy_orders'] += 1
+            stats['total_order_tardiness'] += order.tardiness
+
+        if self.logger:
+            self.logger.log_event(
+                "Order", f"Order {order.id_order} completed (makespan: {order.makespan}, tardiness: {order.tardiness})")
+
+        if self.hooks.order_completed:
+            self.hooks.emit('order_completed', order)
 
-                    self.logger.log_event(
-                        "Manager", f"Remaining defective items: {len(self.proc_inspect.defective_items)}")
-                    
     def get_processes(self):
         """Return processes as a dictionary for statistics collection"""
-        return {
-            'build': self.proc_build,
-            'wash': self.proc_wash,
-            'dry': self.proc_dry,
-            'inspect': self.proc_inspect
-        }
+        return dict(self.processes)
 
     def collect_statistics(self):
         """Collect basic statistics from processes"""
         stats = {}
 
-        # Completed jobs per process
-        stats['build_completed'] = len(self.proc_build.completed_jobs)
-        stats['wash_completed'] = len(self.proc_wash.completed_jobs)
-        stats['dry_completed'] = len(self.proc_dry.completed_jobs)
-        stats['inspect_completed'] = len(self.proc_inspect.completed_jobs)
-
-        # Queue sizes
-        stats['build_queue'] = self.proc_build.job_store.size
-        stats['wash_queue'] = self.proc_wash.job_store.size
-        stats['dry_queue'] = self.proc_dry.job_store.size
-        stats['inspect_queue'] = self.proc_inspect.job_store.size
-
-        # Defective items
-        stats['defective_items'] = len(self.proc_inspect.defective_items)
+        # Completed jobs and queue sizes per process (keyed by routing node)
+        for node, proc in self.processes.items():
+            stats[f'{node}_completed'] = len(proc.completed_jobs)
+        for node, proc in self.processes.items():
+            stats[f'{node}_queue'] = proc.job_store.size
+
+        # Defective items and rework latency (over all inspection processes)
+        rework_pools = [proc.defective_items for proc in self.inspect_processes]
+        stats['defective_items'] = sum(len(pool) for pool in rework_pools)
+        stats.update(combined_latency_statistics(rework_pools))
+
+        # Item, patient and order completion
+        completion = self.completion_stats
+        stats.update(completion)
+        if completion['completed_items']:
+            stats['avg_rework_loops_per_item'] = completion['total_rework_loops'] / \
+                completion['completed_items']
+        if completion['completed_patients']:
+            stats['avg_patient_makespan'] = completion['total_patient_makespan'] / \
+                completion['completed_patients']
+        if completion['completed_orders']:
+            stats['avg_order_makespan'] = completion['total_order_makespan'] / \
+                completion['completed_orders']
+            stats['tardy_order_rate'] = completion['tardy_orders'] / \
+                completion['completed_orders']
 
         return stats
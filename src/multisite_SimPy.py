@@ -0,0 +1,283 @@
+import multiprocessing
+import simpy
+from config_SimPy import *
+from base_Customer import Customer, Item
+from manager import Manager
+from rng_SimPy import RandomStreams
+from settings_SimPy import SimConfig
+
+
+# Message types exchanged between sites
+MSG_JOB = "JOB"              # Job transferred for processing at the destination site
+MSG_COMPLETION = "COMPLETION"  # Item finished at a remote site, returned to its origin
+
+# Seconds to wait for a site process to exit after the stop command
+SITE_JOIN_TIMEOUT = 10
+
+
+class SiteManager(Manager):
+    """
+    Manager of one site in a multi-site farm
+
+    Jobs are transferred to another site when the local entry queue exceeds
+    SITE_OVERFLOW_QUEUE_LIMIT (new jobs) or, if SITE_REWORK_TARGET is set,
+    when rework jobs are created. Items processed remotely are returned to
+    their origin site and completed there, so order tracking stays local.
+
+    Attributes:
+        site_index (int): Index of this site
+        num_sites (int): Number of sites in the farm
+        outbox (list): Messages to other sites (arrival time, destination, type, payload)
+        site_loads (list): Entry queue length of each site at the last synchronization
+        transferred_items (dict): Local items processed remotely {(id_order, id_patient, id_item): Item}
+        num_jobs_sent (int): Number of jobs transferred to other sites
+        num_jobs_received (int): Number of jobs received from other sites
+        num_jobs_arriving (int): Jobs delivered to this site whose transfer has not ended yet
+    """
+
+    def __init__(self, env, site_index, num_sites, streams=None, logger=None, config=None):
+        self.site_index = site_index
+        self.num_sites = num_sites
+        self.outbox = []
+        self.site_loads = [0] * num_sites
+        self.transferred_items = {}
+        self.num_jobs_sent = 0
+        self.num_jobs_received = 0
+        self.num_jobs_arriving = 0
+        super().__init__(env, logger, streams, config=config)
+
+    def release_job(self, job, process=None, position=None):
+        """Release a job locally or transfer it to another site"""
+        destination = self.transfer_destination(job)
+        if destination is None:
+            super().release_job(job, process, position)
+            return
+
+        payload = {
+            'is_reprocess': job.is_reprocess,
+            'items': [(item.id_order, item.id_patient, item.id_item, item.type_item,
+                       item.is_defect, item.num_rework, getattr(item, 'origin_site', self.site_index))
+                      for item in job.list_items],
+        }
+        for item in job.list_items:
+            if getattr(item, 'origin_site', self.site_index) == self.site_index:
+                self.transferred_items[(item.id_order, item.id_patient, item.id_item)] = item
+        self.send(destination, MSG_JOB, payload)
+        self.num_jobs_sent += 1
+
+    def transfer_destination(self, job):
+        """Destination site of a job (None: process locally)"""
+        if self.num_sites < 2:
+            return None
+        rework_target = self.config.SITE_REWORK_TARGET
+        if job.is_reprocess and rework_target is not None:
+            return rework_target if rework_target != self.site_index else None
+        if job.is_reprocess or self.proc_build.job_store.size < self.config.SITE_OVERFLOW_QUEUE_LIMIT:
+            return None
+        # Least loaded other site as of the last synchronization
+        others = [index for index in range(self.num_sites) if index != self.site_index]
+        return min(others, key=lambda index: self.site_loads[index])
+
+    def item_completed(self, item):
+        """Complete local items; return remote items to their origin site"""
+        origin = getattr(item, 'origin_site', self.site_index)
+        if origin == self.site_index:
+            super().item_completed(item)
+        else:
+            self.send(origin, MSG_COMPLETION,
+                      (item.id_order, item.id_patient, item.id_item, item.num_rework))
+
+    def send(self, destination, kind, payload):
+        self.outbox.append((self.env.now + self.config.SITE_TRANSFER_DELAY, destination, kind, payload))
+
+    def deliver(self, messages):
+        """Schedule incoming messages at their arrival times"""
+        for arrival_time, _, kind, payload in messages:
+            if kind == MSG_JOB:
+                self.num_jobs_arriving += 1
+            self.env.process(self.arrive(arrival_time, kind, payload))
+
+    def arrive(self, arrival_time, kind, payload):
+        yield self.env.timeout(arrival_time - self.env.now)
+
+        if kind == MSG_JOB:
+            items = []
+            for id_order, id_patient, id_item, type_item, is_defect, num_rework, origin in payload['items']:
+                key = (id_order, id_patient, id_item)
+                if origin == self.site_index and key in self.transferred_items:
+                    # Own item coming back (e.g., rework of a remote job)
+                    item = self.transferred_items.pop(key)
+                else:
+                    item = Item(id_order, id_patient, id_item)
+                    item.type_item = type_item
+                    item.origin_site = origin
+                item.is_defect = is_defect
+                item.num_rework = num_rework
+                items.append(item)
+            job = self.create_job(items)
+            job.is_reprocess = payload['is_reprocess']
+            self.num_jobs_received += 1
+            self.num_jobs_arriving -= 1
+            Manager.release_job(self, job)
+        else:
+            id_order, id_patient, id_item, num_rework = payload
+            item = self.transferred_items.pop((id_order, id_patient, id_item))
+            item.num_rework = num_rework
+            super().item_completed(item)
+
+    def take_outbox(self):
+        messages = self.outbox
+        self.outbox = []
+        return messages
+
+    def site_statistics(self):
+        stats = self.collect_statistics()
+        stats['jobs_sent'] = self.num_jobs_sent
+        stats['jobs_received'] = self.num_jobs_received
+        stats['jobs_arriving'] = self.num_jobs_arriving
+        return stats
+
+
+class Site:
+    """
+    One site of the farm: its own environment, manager and customer
+
+    Attributes:
+        site_index (int): Index of this site
+        env (simpy.Environment): Simulation environment of this site
+        manager (SiteManager): Manager of this site
+    """
+
+    def __init__(self, site_index, num_sites, seed=RANDOM_SEED, replication=0, config=None):
+        self.site_index = site_index
+        self.env = simpy.Environment()
+        streams = RandomStreams(seed, replication).child(site_index)
+        self.manager = SiteManager(self.env, site_index, num_sites, streams, config=config)
+        Customer(self.env, self.manager, None, streams.stream("customer"), self.manager.config)
+
+    def advance(self, until, messages, site_loads):
+        """Deliver messages, run until the end of the window and return outgoing messages"""
+        self.manager.site_loads = site_loads
+        self.manager.deliver(messages)
+        self.env.run(until=until)
+        return self.manager.take_outbox(), self.manager.proc_build.job_store.size
+
+
+def site_worker(connection, site_index, num_sites, seed, replication, config=None):
+    """Run one site in its own OS process, driven by commands from the coordinator"""
+    site = Site(site_index, num_sites, seed, replication, config)
+    while True:
+        command, args = connection.recv()
+        if command == "advance":
+            connection.send(site.advance(*args))
+        elif command == "stats":
+            connection.send(site.manager.site_statistics())
+        else:
+            break
+    connection.close()
+
+
+class MultiSiteSimulation:
+    """
+    Multi-site farm with conservative time-window synchronization
+
+    Every message between sites takes at least SITE_TRANSFER_DELAY, so all
+    sites can advance one window of that length independently (lookahead);
+    messages produced in a window arrive in a later window and are delivered
+    at the barrier. With parallel=True each site runs in its own OS process.
+
+    Attributes:
+        num_sites (int): Number of sites
+        seed (int): Root seed
+        replication (int): Replication index
+        parallel (bool): Run sites in separate OS processes
+        config (SimConfig): Settings shared by all sites
+        lookahead (float): Synchronization window length (unit: minutes)
+        undelivered_jobs (int): Jobs sent in the last window, not yet delivered at the end of the run
+    """
+
+    def __init__(self, num_sites=None, seed=RANDOM_SEED, replication=0, parallel=True, config=None):
+        self.config = config if config is not None else SimConfig()
+        if self.config.SITE_TRANSFER_DELAY <= 0:
+            raise ValueError("SITE_TRANSFER_DELAY must be positive (it is the synchronization lookahead)")
+        self.num_sites = num_sites if num_sites is not None else self.config.NUM_SITES
+        self.seed = seed
+        self.replication = replication
+        self.parallel = parallel
+        self.lookahead = self.config.SITE_TRANSFER_DELAY
+        self.undelivered_jobs = 0
+
+    def run(self, sim_duration=SIM_TIME):
+        """
+        Run the farm until sim_duration
+
+        Returns:
+            list: Statistics of each site
+        """
+        if self.parallel:
+            return self._run_parallel(sim_duration)
+        sites = [Site(index, self.num_sites, self.seed, self.replication, self.config)
+                 for index in range(self.num_sites)]
+
+        def advance(until, inboxes, loads):
+            return [site.advance(until, inboxes[index], loads)
+                    for index, site in enumerate(sites)]
+
+        self._synchronize(advance, sim_duration)
+        return [site.manager.site_statistics() for site in sites]
+
+    def _run_parallel(self, sim_duration):
+        context = multiprocessing.get_context()
+        connections = []
+        workers = []
+        for index in range(self.num_sites):
+            parent_end, child_end = context.Pipe()
+            worker = context.Process(
+                target=site_worker,
+                args=(child_end, index, self.num_sites, self.seed, self.replication, self.config))
+            worker.start()
+            connections.append(parent_end)
+            workers.append(worker)
+
+        def advance(until, inboxes, loads):
+            for index, connection in enumerate(connections):
+                connection.send(("advance", (until, inboxes[index], loads)))
+            return [connection.recv() for connection in connections]
+
+        try:
+            self._synchronize(advance, sim_duration)
+            for connection in connections:
+                connection.send(("stats", None))
+            stats = [connection.recv() for connection in connections]
+        finally:
+            # A site process that died has closed its pipe; do not hide the original error
+            for connection in connections:
+                try:
+                    connection.send(("stop", None))
+                except (BrokenPipeError, OSError):
+                    pass
+            for worker in workers:
+                worker.join(SITE_JOIN_TIMEOUT)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+        return stats
+
+    def jobs_in_flight(self, site_stats):
+        """Jobs sent but not yet received (sent = received + in flight once the run ends)"""
+        return self.undelivered_jobs + sum(stats['jobs_arriving'] for stats in site_stats)
+
+    def _synchronize(self, advance, sim_duration):
+        """Advance all sites window by window and route messages at each barrier"""
+        inboxes = [[] for _ in range(self.num_sites)]
+        loads = [0] * self.num_sites
+        time = 0
+        while time < sim_duration:
+            time = min(time + self.lookahead, sim_duration)
+            results = advance(time, inboxes, loads)
+            inboxes = [[] for _ in range(self.num_sites)]
+            for index, (outbox, load) in enumerate(results):
+                loads[index] = load
+                for message in outbox:
+                    inboxes[message[1]].append(message)
+        self.undelivered_jobs = sum(message[2] == MSG_JOB for inbox in inboxes for message in inbox)
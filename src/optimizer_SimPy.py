@@ -0,0 +1,193 @@
+import math
+import numpy as np
+from config_SimPy import *
+from scenario_SimPy import parameter_grid, run_scenario
+
+
+# Capacity decisions searched by the optimizer (setting name -> candidate values)
+CAPACITY_SPACE = {
+    'NUM_MACHINES_BUILD': list(range(1, 7)),
+    'NUM_MACHINES_WASH': list(range(1, 4)),
+    'NUM_MACHINES_DRY': list(range(1, 4)),
+    'NUM_WORKERS_IN_INSPECT': list(range(1, 7)),
+}
+# Cost per unit of each capacity decision (e.g., cost per week)
+CAPACITY_UNIT_COSTS = {
+    'NUM_MACHINES_BUILD': 10.0,
+    'NUM_MACHINES_WASH': 4.0,
+    'NUM_MACHINES_DRY': 4.0,
+    'NUM_WORKERS_IN_INSPECT': 6.0,
+}
+
+# Two-sided 95% Student-t quantiles by degrees of freedom (larger: normal approximation)
+T_QUANTILES_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+                  8: 2.306, 9: 2.262, 10: 2.228, 15: 2.131, 20: 2.086, 30: 2.042}
+
+
+def t_quantile_95(dof):
+    """Conservative two-sided 95% Student-t quantile (table value of the nearest lower dof)"""
+    if dof > 30:
+        return 1.96
+    return T_QUANTILES_95[max(key for key in T_QUANTILES_95 if key <= dof)]
+
+
+class Candidate:
+    """
+    Capacity configuration under evaluation
+
+    Attributes:
+        params (dict): Capacity settings
+        cost (float): Cost of the configuration
+        values (list): KPI value of each replication run so far
+    """
+
+    def __init__(self, params, cost):
+        self.params = params
+        self.cost = cost
+        self.values = []
+
+    @property
+    def mean(self):
+        return float(np.mean(self.values))
+
+    @property
+    def half_width(self):
+        """Half width of the 95% confidence interval of the mean KPI (inf with fewer than 2 runs)"""
+        if len(self.values) < 2:
+            return math.inf
+        std_error = np.std(self.values, ddof=1) / math.sqrt(len(self.values))
+        return float(t_quantile_95(len(self.values) - 1) * std_error)
+
+
+class CapacityOptimizer:
+    """
+    Minimum-cost capacity search with successive halving and racing
+
+    All candidates start with a few replications. Within each round candidates
+    are evaluated in order of increasing cost, so that once one is known to be
+    feasible the more expensive ones are eliminated without being run. After
+    each round:
+      - candidates whose confidence interval lies entirely on the wrong side
+        of the target are eliminated (racing),
+      - of the remaining ones only the best 1/eta are kept, ranked by
+        feasibility of the mean KPI, then cost (or shortfall if infeasible),
+    and the survivors get eta times more replications. Common random numbers
+    are used: replication r of every candidate uses the same streams.
+    Confidence intervals are 95% Student-t intervals of the mean KPI.
+
+    Attributes:
+        space (dict): Setting name -> candidate values
+        unit_costs (dict): Setting name -> cost per unit
+        kpi (str): Constrained KPI (from scenario_SimPy.run_scenario)
+        target (float): KPI target
+        sense (str): ">=" (e.g., throughput) or "<=" (e.g., tardy_order_rate)
+        fixed_overrides (dict): Other config_SimPy settings of the scenario
+        eta (int): Reduction factor per round
+        initial_replications (int): Replications per candidate in the first round
+        max_replications (int): Replications per candidate in the last round
+        missing_value (float): KPI value used when a run does not report the KPI
+        num_runs (int): Simulation runs used so far
+    """
+
+    def __init__(self, kpi, target, sense=">=", space=CAPACITY_SPACE, unit_costs=CAPACITY_UNIT_COSTS,
+                 fixed_overrides=None, eta=3, initial_replications=2, max_replications=18,
+                 missing_value=0.0, seed=RANDOM_SEED, sim_duration=SIM_TIME):
+        if sense not in (">=", "<="):
+            raise ValueError(f"Unknown constraint sense: {sense}")
+        self.kpi = kpi
+        self.target = target
+        self.sense = sense
+        self.space = space
+        self.unit_costs = unit_costs
+        self.fixed_overrides = fixed_overrides or {}
+        self.eta = eta
+        self.initial_replications = initial_replications
+        self.max_replications = max_replications
+        self.missing_value = missing_value
+        self.seed = seed
+        self.sim_duration = sim_duration
+        self.num_runs = 0
+
+    def cost(self, params):
+        return sum(self.unit_costs.get(name, 0.0) * value for name, value in params.items())
+
+    def shortfall(self, value):
+        """Distance of a KPI value from the target (<= 0 when the target is met)"""
+        return self.target - value if self.sense == ">=" else value - self.target
+
+    def evaluate(self, candidate, num_replications):
+        """Run replications until the candidate has num_replications values"""
+        for replication in range(len(candidate.values), num_replications):
+            overrides = dict(self.fixed_overrides, **candidate.params)
+            kpis = run_scenario(overrides, self.seed, replication, self.sim_duration)
+            value = kpis.get(self.kpi)
+            candidate.values.append(self.missing_value if value is None else value)
+            self.num_runs += 1
+
+    def surely_infeasible(self, candidate):
+        return self.shortfall(candidate.mean) - candidate.half_width > 0
+
+    def surely_feasible(self, candidate):
+        return self.shortfall(candidate.mean) + candidate.half_width <= 0
+
+    def rank_key(self, candidate):
+        shortfall = self.shortfall(candidate.mean)
+        if shortfall <= 0:
+            return (0, candidate.cost)
+        return (1, shortfall)
+
+    def run(self, verbose=False):
+        """
+        Search the capacity space
+
+        Returns:
+            dict: Best configuration, its cost and KPI statistics, and the
+                  number of runs against the full grid at max_replications
+        """
+        candidates = [Candidate(params, self.cost(params)) for params in parameter_grid(self.space)]
+        grid_runs = len(candidates) * self.max_replications
+        replications = self.initial_replications
+
+        while True:
+            # Cheapest first: candidates dearer than a surely feasible one are never run
+            candidates.sort(key=lambda c: c.cost)
+            evaluated = []
+            best_cost = math.inf
+            for candidate in candidates:
+                if candidate.cost > best_cost:
+                    break
+                self.evaluate(candidate, replications)
+                evaluated.append(candidate)
+                if self.surely_feasible(candidate):
+                    best_cost = candidate.cost
+
+            # Racing: drop candidates that are confidently infeasible
+            survivors = [c for c in evaluated if not self.surely_infeasible(c)]
+            if not survivors:
+                survivors = [min(evaluated, key=self.rank_key)]
+
+            if verbose:
+                print(f"  {replications} replications: {len(candidates)} candidates, "
+                      f"{len(candidates) - len(evaluated)} dearer than a feasible one skipped -> "
+                      f"{len(survivors)} after racing ({self.num_runs} runs so far)")
+
+            if replications >= self.max_replications or len(survivors) == 1:
+                candidates = survivors
+                break
+
+            # Successive halving: keep the best 1/eta, give them eta times more replications
+            survivors.sort(key=self.rank_key)
+            candidates = survivors[:max(1, math.ceil(len(survivors) / self.eta))]
+            replications = min(replications * self.eta, self.max_replications)
+
+        best = min(candidates, key=self.rank_key)
+        return {
+            'params': best.params,
+            'cost': best.cost,
+            'kpi_mean': best.mean,
+            'kpi_half_width': best.half_width,
+            'replications': len(best.values),
+            'feasible': self.shortfall(best.mean) <= 0,
+            'num_runs': self.num_runs,
+            'grid_runs': grid_runs,
+        }
@@ -0,0 +1,128 @@
+import csv
+import os
+import numpy as np
+from config_SimPy import *
+from base_Customer import Customer, Order
+
+
+# Binary order book: one fixed-size row per patient, sorted by time
+ORDERBOOK_DTYPE = np.dtype([
+    ('time', '<f8'),       # Release time of the order (unit: minutes)
+    ('id_order', '<u4'),   # Order ID (rows of one order are consecutive)
+    ('num_items', '<u4'),  # Number of items of the patient
+])
+
+
+def iter_rows_csv(path):
+    """Stream (time, id_order, num_items) rows from a CSV file with a header row"""
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            yield float(row['time']), int(row['id_order']), int(row['num_items'])
+
+
+def iter_rows_parquet(path, batch_size=65536):
+    """Stream (time, id_order, num_items) rows from a Parquet file batch by batch"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet order books requires pyarrow")
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(
+            batch_size=batch_size, columns=['time', 'id_order', 'num_items']):
+        columns = batch.to_pydict()
+        yield from zip(columns['time'], columns['id_order'], columns['num_items'])
+
+
+def iter_rows_binary(path, chunk_size=65536):
+    """
+    Stream rows from a memory-mapped binary order book
+
+    The file is mapped read-only, so parallel workers reading the same file
+    share the operating system page cache instead of holding private copies.
+    """
+    rows = np.memmap(path, dtype=ORDERBOOK_DTYPE, mode='r')
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        yield from zip(chunk['time'].tolist(), chunk['id_order'].tolist(),
+                       chunk['num_items'].tolist())
+
+
+def iter_rows(path):
+    """Stream order book rows, choosing the reader from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return iter_rows_csv(path)
+    if extension in ('.parquet', '.pq'):
+        return iter_rows_parquet(path)
+    if extension == '.bin':
+        return iter_rows_binary(path)
+    raise ValueError(f"Unsupported order book format: {path}")
+
+
+def iter_orders(rows):
+    """
+    Group consecutive patient rows into orders
+
+    Yields:
+        tuple: (time, id_order, list of item counts per patient)
+    """
+    current = None
+    for time, id_order, num_items in rows:
+        if current is not None and id_order != current[1]:
+            yield current
+            current = None
+        if current is None:
+            current = (time, id_order, [])
+        current[2].append(num_items)
+    if current is not None:
+        yield current
+
+
+def convert_orderbook_to_binary(src_path, dst_path, chunk_size=65536):
+    """Convert a CSV or Parquet order book to the binary format in fixed-size chunks"""
+    buffer = np.zeros(chunk_size, dtype=ORDERBOOK_DTYPE)
+    count = 0
+    with open(dst_path, 'wb') as f:
+        for row in iter_rows(src_path):
+            buffer[count] = row
+            count += 1
+            if count == chunk_size:
+                buffer.tofile(f)
+                count = 0
+        buffer[:count].tofile(f)
+
+
+class TraceCustomer(Customer):
+    """
+    Customer that replays a historical order book
+
+    Orders are read lazily from the source and released at their recorded
+    time, so the order book is never loaded into memory as a whole.
+
+    Attributes:
+        source: Order book path or iterable of (time, id_order, num_items) rows
+        orders_released (int): Number of orders released so far
+    """
+
+    def __init__(self, env, order_receiver, logger, source=None, rng=None, config=None):
+        super().__init__(env, order_receiver, logger, rng, config)
+        self.source = source if source is not None else self.config.CUST_ORDER_TRACE_PATH
+        self.orders_released = 0
+
+    def create_order(self):
+        """Release orders from the order book at their timestamps"""
+        rows = iter_rows(self.source) if isinstance(self.source, str) else self.source
+
+        for time, id_order, items_per_patient in iter_orders(rows):
+            delay = time - self.env.now
+            if delay < 0:
+                raise ValueError(
+                    f"Order book is not sorted by time (order {id_order} at {time})")
+            if delay > 0:
+                yield self.env.timeout(delay)
+
+            order = Order(self.env, id_order, self.rng, items_per_patient, self.config)
+            order.time_start = self.env.now
+            self.orders_released += 1
+            self.send_order(order)
@@ -0,0 +1,237 @@
+import math
+import numpy as np
+import simpy
+from config_SimPy import *
+from base_Customer import Customer
+from arrival_SimPy import BulkCustomer, PoissonArrivals
+from manager import Manager
+from rng_SimPy import RandomStreams
+from settings_SimPy import SimConfig
+from specialized_Process import Proc_Build
+
+
+# Parameters of the sampling model (None: nominal value)
+#   defect_rate: defect rate of new jobs at build
+#   rework_defect_rate: defect rate of rework jobs at build
+#   arrival_rate: Poisson order rate (BULK generator with POISSON arrivals only)
+TILT_PARAMETERS = ('defect_rate', 'rework_defect_rate', 'arrival_rate')
+
+
+class DueDateObserver:
+    """
+    Records received orders to count due-date misses at the end of a run
+
+    An order misses its due date if it completed with tardiness, or if it
+    is still open after its due date has passed.
+
+    Attributes:
+        orders (list): Orders received so far
+    """
+
+    def __init__(self):
+        self.orders = []
+
+    def attach(self, hooks):
+        hooks.subscribe('order_received', self.orders.append)
+
+    def missed_orders(self, now, release_horizon):
+        """
+        Count orders released before release_horizon that missed their due date
+
+        Returns:
+            tuple: (missed orders, released orders, maximum lateness), where the
+                   lateness of an open order is measured up to `now`
+        """
+        released = missed = 0
+        max_lateness = -math.inf
+        for order in self.orders:
+            if order.time_start is None or order.time_start >= release_horizon:
+                continue
+            released += 1
+            flow_time = order.makespan if order.is_completed else now - order.time_start
+            lateness = flow_time - order.due_date
+            missed += lateness > 0
+            max_lateness = max(max_lateness, lateness)
+        return missed, released, max_lateness
+
+
+def poisson_arrivals_enabled(config):
+    """Check if orders follow a homogeneous Poisson process (arrival rate tilting possible)"""
+    return config.CUST_ORDER_GENERATOR == "BULK" and config.CUST_ARRIVAL_PROCESS == "POISSON"
+
+
+def bernoulli_log_lr(successes, trials, nominal, sampling):
+    """Log likelihood ratio of `successes` in `trials` Bernoulli draws (nominal / sampling)"""
+    if sampling == nominal:
+        return 0.0
+    return (successes * math.log(nominal / sampling)
+            + (trials - successes) * math.log((1 - nominal) / (1 - sampling)))
+
+
+def run_tilted(tilt=None, seed=RANDOM_SEED, replication=0, sim_duration=SIM_TIME, config=None):
+    """
+    Run one replication under a tilted sampling model
+
+    Orders are released for sim_duration minutes and the run continues until
+    the due date of the last of them, so every order can be judged.
+
+    Args:
+        tilt (dict): Sampling parameters (see TILT_PARAMETERS; None: nominal model)
+        seed (int): Root seed of the experiment
+        replication (int): Replication index
+        sim_duration (int): Order release horizon (unit: minutes)
+        config (SimConfig): Nominal model settings (None: current config_SimPy)
+
+    Returns:
+        dict: Missed and released orders, maximum lateness, the log likelihood
+              ratio of the nominal against the sampling model, and defect counts
+    """
+    tilt = tilt or {}
+    unknown = set(tilt) - set(TILT_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown tilt parameters: {sorted(unknown)}")
+
+    config = config if config is not None else SimConfig()
+    env = simpy.Environment()
+    streams = RandomStreams(seed, replication)
+    manager = Manager(env, None, streams, config=config)
+    observer = DueDateObserver()
+    observer.attach(manager.hooks)
+
+    builds = [proc for proc in manager.processes.values() if isinstance(proc, Proc_Build)]
+    for proc in builds:
+        if tilt.get('defect_rate') is not None:
+            proc.defect_rate = tilt['defect_rate']
+        if tilt.get('rework_defect_rate') is not None:
+            proc.rework_defect_rate = tilt['rework_defect_rate']
+
+    customer = None
+    arrival_rate = tilt.get('arrival_rate')
+    if poisson_arrivals_enabled(config):
+        customer = BulkCustomer(env, manager, None, streams.stream("customer"),
+                                PoissonArrivals(arrival_rate or config.CUST_ORDER_RATE),
+                                horizon=sim_duration, config=config)
+    elif arrival_rate is not None:
+        raise ValueError("Arrival rate tilting requires Poisson arrivals (BULK generator, POISSON process)")
+    else:
+        Customer(env, manager, None, streams.stream("customer"), config)
+
+    env.run(until=sim_duration + config.ORDER_DUE_DATE)
+    missed, released, max_lateness = observer.missed_orders(env.now, sim_duration)
+
+    # Likelihood ratio of the nominal model against the sampling model
+    log_lr = 0.0
+    for proc in builds:
+        log_lr += bernoulli_log_lr(proc.num_defects, proc.num_defect_draws,
+                                   config.DEFECT_RATE_PROC_BUILD, proc.defect_rate)
+        log_lr += bernoulli_log_lr(proc.num_rework_defects, proc.num_rework_defect_draws,
+                                   config.DEFECT_RATE_PROC_BUILD, proc.rework_defect_rate)
+    if customer is not None and arrival_rate is not None:
+        nominal_rate = config.CUST_ORDER_RATE
+        log_lr += (len(customer.plan) * math.log(nominal_rate / arrival_rate)
+                   - (nominal_rate - arrival_rate) * sim_duration)
+
+    return {
+        'missed_orders': missed,
+        'released_orders': released,
+        'max_lateness': max_lateness,
+        'log_likelihood_ratio': log_lr,
+        'defect_draws': sum(proc.num_defect_draws for proc in builds),
+        'defects': sum(proc.num_defects for proc in builds),
+        'rework_defect_draws': sum(proc.num_rework_defect_draws for proc in builds),
+        'rework_defects': sum(proc.num_rework_defects for proc in builds),
+        'sampled_orders': len(customer.plan) if customer is not None else None,
+    }
+
+
+def estimate_miss_probability(tilt=None, target_relative_error=0.1, min_replications=100,
+                              max_replications=100000, overrides=None, seed=RANDOM_SEED,
+                              sim_duration=SIM_TIME, first_replication=0):
+    """
+    Estimate the probability that a run has at least one due-date miss
+
+    With a tilt this is importance sampling: each replication is weighted by
+    its likelihood ratio. Without one it is crude Monte Carlo. Replications
+    stop once the relative error (standard error over estimate) reaches
+    target_relative_error.
+
+    Returns:
+        dict: Estimate, relative error, replications used and number of hits,
+              plus the per-order miss rate (ratio estimator)
+    """
+    weighted = []
+    weighted_missed = 0.0
+    weighted_released = 0.0
+    hits = 0
+    config = SimConfig(overrides)
+    for index in range(max_replications):
+        run = run_tilted(tilt, seed, first_replication + index, sim_duration, config)
+        weight = math.exp(run['log_likelihood_ratio'])
+        hit = run['missed_orders'] > 0
+        hits += hit
+        weighted.append(weight * hit)
+        weighted_missed += weight * run['missed_orders']
+        weighted_released += weight * run['released_orders']
+
+        # Check the relative error every min_replications runs
+        if (index + 1) % min_replications == 0 and hits > 1:
+            values = np.asarray(weighted)
+            if values.std(ddof=1) / math.sqrt(len(values)) / values.mean() <= target_relative_error:
+                break
+
+    values = np.asarray(weighted)
+    estimate = float(values.mean())
+    relative_error = float(values.std(ddof=1) / math.sqrt(len(values)) / estimate) if estimate > 0 else math.inf
+    return {
+        'probability': estimate,
+        'relative_error': relative_error,
+        'order_miss_rate': weighted_missed / weighted_released if weighted_released > 0 else math.nan,
+        'replications': len(values),
+        'hits': hits,
+        'tilt': dict(tilt or {}),
+    }
+
+
+def cross_entropy_tilt(num_pilot=100, rarity=0.1, max_iterations=10, smoothing=0.7, overrides=None,
+                       seed=RANDOM_SEED, sim_duration=SIM_TIME):
+    """
+    Choose the sampling defect rates with the cross-entropy method
+
+    Pilot runs are scored by their maximum order lateness (a miss when > 0).
+    While misses are rare, the rates are fitted to the latest `rarity`
+    fraction of runs (an intermediate level); once at least that fraction of
+    runs misses, the likelihood-ratio weighted defect frequencies of the
+    missing runs are used. Levels never decrease and updates are smoothed
+    (rate = smoothing * fitted + (1 - smoothing) * previous), which keeps the
+    noisy weighted fits from oscillating. Misses are mostly caused by items
+    failing again and again, so new and rework jobs get separate rates.
+
+    Returns:
+        dict: Tilt for importance sampling (defect_rate, rework_defect_rate)
+    """
+    config = SimConfig(overrides)
+    nominal_rate = config.DEFECT_RATE_PROC_BUILD
+    tilt = {'defect_rate': nominal_rate, 'rework_defect_rate': nominal_rate}
+    replication = 10 ** 6  # Pilot streams are disjoint from estimation streams
+    level = -math.inf
+    for _ in range(max_iterations):
+        runs = [run_tilted(tilt, seed, replication + index, sim_duration, config)
+                for index in range(num_pilot)]
+        replication += num_pilot
+        scores = np.array([run['max_lateness'] for run in runs])
+        level = max(level, min(np.quantile(scores, 1 - rarity), 0.0))
+        elite = [run for run, score in zip(runs, scores) if score >= level]
+        if not elite:
+            continue
+        weights = np.array([math.exp(run['log_likelihood_ratio']) for run in elite])
+
+        for rate, defects, draws in (('defect_rate', 'defects', 'defect_draws'),
+                                     ('rework_defect_rate', 'rework_defects', 'rework_defect_draws')):
+            total_draws = (weights * [run[draws] for run in elite]).sum()
+            if total_draws > 0:
+                updated = (weights * [run[defects] for run in elite]).sum() / total_draws
+                updated = smoothing * updated + (1 - smoothing) * tilt[rate]
+                tilt[rate] = float(min(max(updated, nominal_rate), 0.95))
+        if level >= 0.0:
+            break
+    return tilt
@@ -0,0 +1,139 @@
+import math
+from collections import deque
+
+
+class ReworkPool:
+    """
+    Pool of defective items waiting to be grouped into rework jobs
+
+    Items are kept in a deque in detection order, so taking a batch from the
+    front is O(batch size). Full batches are emitted as soon as they are
+    available; a partial batch is flushed once its oldest item has waited
+    max_age minutes.
+
+    Attributes:
+        env (simpy.Environment): Simulation environment
+        batch_size (int): Number of items per rework job
+        max_age (float): Maximum waiting time before a partial batch is flushed (None: never)
+        on_ready (callable): Called when aged items should be flushed (e.g., Manager.create_job_for_defects)
+        items (deque): Waiting (item, time added) pairs
+        wakeup_time (float): Time of the pending aging wake-up (None if not scheduled)
+        num_batches (int): Number of batches taken
+        num_partial_batches (int): Number of partial batches flushed by aging
+        latency_count (int): Number of items taken
+        latency_sum (float): Sum of waiting times of taken items
+        latency_sum_sq (float): Sum of squared waiting times of taken items
+        latency_max (float): Maximum waiting time of a taken item
+    """
+
+    def __init__(self, env, batch_size, max_age=None, on_ready=None):
+        self.env = env
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.on_ready = on_ready
+        self.items = deque()
+        self.wakeup_time = None
+
+        # Rework latency statistics (detection to rework job creation)
+        self.num_batches = 0
+        self.num_partial_batches = 0
+        self.latency_count = 0
+        self.latency_sum = 0
+        self.latency_sum_sq = 0
+        self.latency_max = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return (item for item, _ in self.items)
+
+    def extend(self, items):
+        """Add defective items detected at the current time"""
+        now = self.env.now
+        for item in items:
+            self.items.append((item, now))
+        self.schedule_wakeup()
+
+    def take_batches(self):
+        """
+        Take as many full batches as possible, plus partial batches whose oldest item has aged out
+
+        Returns:
+            list: Lists of items, one per rework job
+        """
+        batches = []
+        while len(self.items) >= self.batch_size:
+            batches.append(self.take(self.batch_size))
+        while self.items and self.is_aged():
+            batches.append(self.take(len(self.items)))
+            self.num_partial_batches += 1
+        self.schedule_wakeup()
+        return batches
+
+    def take(self, count):
+        """Remove up to `count` items from the front and record their latency"""
+        now = self.env.now
+        batch = []
+        for _ in range(min(count, self.batch_size)):
+            item, time_added = self.items.popleft()
+            latency = now - time_added
+            self.latency_count += 1
+            self.latency_sum += latency
+            self.latency_sum_sq += latency * latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+            batch.append(item)
+        self.num_batches += 1
+        return batch
+
+    def is_aged(self):
+        """Check if the oldest waiting item has reached max_age"""
+        if self.max_age is None or not self.items:
+            return False
+        return self.env.now - self.items[0][1] >= self.max_age
+
+    def schedule_wakeup(self):
+        """Schedule a wake-up at the aging deadline of the oldest item (at most one pending)"""
+        if self.max_age is None or not self.items or self.on_ready is None:
+            return
+        deadline = self.items[0][1] + self.max_age
+        if self.wakeup_time is not None and self.wakeup_time <= deadline:
+            return
+        self.wakeup_time = deadline
+        self.env.process(self.wakeup(deadline))
+
+    def wakeup(self, deadline):
+        """Flush aged items at the deadline"""
+        # The deadline may already be past (items left aged by an earlier on_ready)
+        yield self.env.timeout(max(0, deadline - self.env.now))
+        if self.wakeup_time != deadline:
+            return
+        self.wakeup_time = None
+        if self.is_aged():
+            # on_ready takes the aged items and reschedules through take_batches; if it
+            # left them in the pool, another wake-up would fire again at once
+            self.on_ready()
+        else:
+            self.schedule_wakeup()
+
+    def latency_statistics(self):
+        """Rework latency statistics (detection to rework job creation)"""
+        return combined_latency_statistics([self])
+
+
+def combined_latency_statistics(pools):
+    """Rework latency statistics over the items taken from several pools"""
+    count = sum(pool.latency_count for pool in pools)
+    stats = {
+        'rework_jobs_created': sum(pool.num_batches for pool in pools),
+        'rework_partial_flushes': sum(pool.num_partial_batches for pool in pools),
+        'rework_items_taken': count,
+    }
+    if count:
+        mean = sum(pool.latency_sum for pool in pools) / count
+        variance = max(0, sum(pool.latency_sum_sq for pool in pools) / count - mean * mean)
+        stats['rework_latency_avg'] = mean
+        stats['rework_latency_std'] = math.sqrt(variance)
+        stats['rework_latency_max'] = max(pool.latency_max for pool in pools)
+    return stats
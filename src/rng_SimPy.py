@@ -0,0 +1,75 @@
+import zlib
+import numpy as np
+from config_SimPy import *
+
+
+class RandomStreams:
+    """
+    Independent random number streams for one simulation replication
+
+    Streams are derived with numpy SeedSequence spawning: the root seed spawns
+    one child per replication, and each replication spawns one child per
+    component. Any replication can be re-run in isolation from
+    (root_seed, replication), and streams of different replications or
+    components never overlap.
+
+    Attributes:
+        root_seed (int): Root seed of the experiment
+        replication (int): Replication index
+        seed_seq (np.random.SeedSequence): Seed sequence of this replication
+        streams (dict): Generators created so far {component: np.random.Generator}
+    """
+
+    def __init__(self, root_seed=RANDOM_SEED, replication=0):
+        self.root_seed = root_seed
+        self.replication = replication
+        # Equivalent to SeedSequence(root_seed).spawn(...)[replication]
+        self.seed_seq = np.random.SeedSequence(
+            root_seed, spawn_key=(replication,))
+        self.streams = {}
+
+    def stream(self, component):
+        """
+        Return the generator of a component, creating it on first use
+
+        Args:
+            component (str): Component name (e.g., "customer", "proc_build")
+        """
+        rng = self.streams.get(component)
+        if rng is None:
+            child = np.random.SeedSequence(
+                self.root_seed,
+                spawn_key=self.seed_seq.spawn_key + (component_key(component),))
+            rng = np.random.Generator(np.random.PCG64(child))
+            self.streams[component] = rng
+        return rng
+
+    def child(self, index):
+        """
+        Independent set of streams for a sub-model of this replication (e.g., one site)
+
+        Args:
+            index (int): Index of the sub-model
+        """
+        streams = RandomStreams(self.root_seed, self.replication)
+        streams.seed_seq = np.random.SeedSequence(
+            self.root_seed, spawn_key=self.seed_seq.spawn_key + (index,))
+        return streams
+
+
+def component_key(component):
+    """Stable integer spawn key for a component name"""
+    return zlib.crc32(component.encode("utf-8"))
+
+
+def spawn_replications(root_seed, num_replications, start=0):
+    """
+    Create random streams for a range of replications
+
+    Args:
+        root_seed (int): Root seed of the experiment
+        num_replications (int): Number of replications
+        start (int): Index of the first replication
+    """
+    return [RandomStreams(root_seed, index)
+            for index in range(start, start + num_replications)]
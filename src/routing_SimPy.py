@@ -0,0 +1,135 @@
+class RoutingTable:
+    """
+    Routing graph compiled into integer-indexed lookup tables
+
+    Every routing decision is a list lookup by (item type index, node index).
+    A node with several successors routes to the alternative parallel
+    station with the shortest queue.
+
+    Attributes:
+        node_names (list): Node names in index order
+        node_index (dict): {node name: node index}
+        node_types (list): Process type of each node
+        entry (int): Index of the entry node
+        type_index (dict): {item type: row in successors} (row 0 is the default route)
+        successors (list): successors[type][node] -> tuple of successor node indices
+        rework_target (list): Rework destination node index of each node (-1 if none)
+        processes (list): Process object of each node (set by bind)
+    """
+
+    def __init__(self, node_names, node_types, entry, type_index, successors, rework_target):
+        self.node_names = node_names
+        self.node_index = {name: index for index, name in enumerate(node_names)}
+        self.node_types = node_types
+        self.entry = entry
+        self.type_index = type_index
+        self.successors = successors
+        self.rework_target = rework_target
+        self.processes = [None] * len(node_names)
+
+    def bind(self, processes):
+        """
+        Attach process objects to nodes and register upstream links
+
+        Args:
+            processes (dict): {node name: Process}
+        """
+        for name, proc in processes.items():
+            index = self.node_index[name]
+            self.processes[index] = proc
+            proc.router = self
+            proc.route_index = index
+
+        # Upstream links (all item types) are used by batch formation
+        for table in self.successors:
+            for index, targets in enumerate(table):
+                for target in targets:
+                    upstream = self.processes[index]
+                    downstream = self.processes[target].upstream_processes
+                    if upstream not in downstream:
+                        downstream.append(upstream)
+
+    def next_process(self, process, job):
+        """Return the next process of a job after `process` (None if final)"""
+        row = 0
+        if self.type_index and job.list_items:
+            row = self.type_index.get(job.list_items[0].type_item, 0)
+        targets = self.successors[row][process.route_index]
+
+        if not targets:
+            return None
+        if len(targets) == 1:
+            return self.processes[targets[0]]
+
+        # Alternative parallel stations: shortest queue first
+        best = None
+        for target in targets:
+            candidate = self.processes[target]
+            if best is None or candidate.job_store.size < best.job_store.size:
+                best = candidate
+        return best
+
+    def entry_process(self):
+        return self.processes[self.entry]
+
+    def rework_process(self, process):
+        """Return the rework destination of defects found in `process` (None if not defined)"""
+        target = self.rework_target[process.route_index]
+        return self.processes[target] if target >= 0 else None
+
+    def downstream_nodes(self, node):
+        """Indices of all nodes reachable from `node` along process routes (any item type)"""
+        start = self.node_index[node] if isinstance(node, str) else node
+        reached = set()
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            for table in self.successors:
+                for target in table[index]:
+                    if target not in reached:
+                        reached.add(target)
+                        stack.append(target)
+        return reached
+
+
+def compile_routing(graph):
+    """
+    Compile a declarative routing graph into a RoutingTable
+
+    Args:
+        graph (dict): Routing graph with keys
+            'nodes': {node name: process type}  (insertion order is kept)
+            'entry': entry node name
+            'routes': {node name: [successor node names]}  (several = alternatives)
+            'item_routes': {item type: {node name: [successor node names]}}  (optional)
+            'rework': {node name: rework destination node name}  (optional)
+    """
+    nodes = graph['nodes']
+    node_names = list(nodes.keys())
+    node_index = {name: index for index, name in enumerate(node_names)}
+    node_types = [nodes[name] for name in node_names]
+
+    def resolve(name):
+        if name not in node_index:
+            raise ValueError(f"Routing graph refers to unknown node: {name}")
+        return node_index[name]
+
+    def compile_routes(routes, default=None):
+        table = list(default) if default is not None else [()] * len(node_names)
+        for name, targets in routes.items():
+            table[resolve(name)] = tuple(resolve(target) for target in targets)
+        return table
+
+    # Row 0: default routes; one additional row per item type
+    successors = [compile_routes(graph.get('routes', {}))]
+    type_index = {}
+    for type_item, routes in graph.get('item_routes', {}).items():
+        type_index[type_item] = len(successors)
+        successors.append(compile_routes(routes, successors[0]))
+
+    rework_target = [-1] * len(node_names)
+    for name, target in graph.get('rework', {}).items():
+        rework_target[resolve(name)] = resolve(target)
+
+    return RoutingTable(node_names, node_types, resolve(graph['entry']),
+                        type_index, successors, rework_target)
@@ -0,0 +1,72 @@
+from config_SimPy import *
+
+# Sampling units of TraceSampler
+SAMPLE_UNITS = ("JOB", "ORDER")
+
+_MASK64 = (1 << 64) - 1
+
+
+def mix64(value):
+    """SplitMix64 finalizer: well-spread 64-bit hash of an integer, stable across runs and processes"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class TraceSampler:
+    """
+    Deterministic sample of jobs or orders for detailed tracing
+
+    A job (or order) is sampled when the hash of its ID falls below
+    rate * 2^64, so the same IDs are sampled in every run and every worker
+    process, whatever the event order. Sampling by ORDER keeps every job
+    carrying an item of a sampled order, so whole orders can be followed
+    (rework jobs mixing orders are kept if any of their orders is sampled).
+
+    Attributes:
+        rate (float): Fraction of jobs or orders sampled
+        unit (str): Sampling unit (one of SAMPLE_UNITS)
+        salt (int): Salt of the hash (another salt: another sample)
+    """
+
+    def __init__(self, rate, unit="JOB", salt=0):
+        if unit not in SAMPLE_UNITS:
+            raise ValueError(f"Unknown sampling unit: {unit} (expected one of {SAMPLE_UNITS})")
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Sample rate must be in [0, 1]: {rate}")
+        self.rate = rate
+        self.unit = unit
+        self.salt = salt
+        self._threshold = int(rate * (1 << 64))
+        self._salt_hash = mix64(salt)
+
+    @classmethod
+    def from_config(cls, config):
+        """Sampler of TRACE_SAMPLE_RATE and TRACE_SAMPLE_UNIT (None: trace everything)"""
+        if config.TRACE_SAMPLE_RATE >= 1.0:
+            return None
+        return cls(config.TRACE_SAMPLE_RATE, config.TRACE_SAMPLE_UNIT)
+
+    def sampled_id(self, key):
+        return mix64(key ^ self._salt_hash) < self._threshold
+
+    def sampled(self, job):
+        """Check if the detailed history of a job is recorded"""
+        if self.unit == "JOB":
+            return self.sampled_id(job.id_job)
+        # Items of one order are adjacent in a job; hash each order once
+        id_order = None
+        for item in job.list_items:
+            if item.id_order != id_order:
+                id_order = item.id_order
+                if self.sampled_id(id_order):
+                    return True
+        return False
+
+    def keeps_order(self, order):
+        """Check if the arrival of an order is recorded (all orders when sampling jobs)"""
+        return self.unit == "JOB" or self.sampled_id(order.id_order)
+
+    def describe(self):
+        return {'rate': self.rate, 'unit': self.unit, 'salt': self.salt}
@@ -0,0 +1,79 @@
+import json
+import itertools
+from config_SimPy import *
+from context_SimPy import run_replication
+from settings_SimPy import SimConfig
+
+
+# Parameters of config_SimPy that scenarios typically vary
+SCENARIO_PARAMETERS = ('NUM_MACHINES_BUILD', 'NUM_MACHINES_WASH', 'NUM_MACHINES_DRY',
+                       'NUM_WORKERS_IN_INSPECT', 'DEFECT_RATE_PROC_BUILD', 'CUST_ORDER_CYCLE')
+
+
+def run_scenario(overrides=None, seed=RANDOM_SEED, replication=0, sim_duration=SIM_TIME, attach=None):
+    """
+    Run one replication of a scenario without logging and return its KPIs
+
+    The scenario runs on its own SimConfig, so scenarios can run concurrently.
+
+    Args:
+        overrides (dict): config_SimPy settings of the scenario
+        seed (int): Root seed of the experiment
+        replication (int): Replication index
+        sim_duration (int): Simulation duration (unit: minutes)
+        attach (callable): Called with the manager before the run (e.g., to subscribe recorders)
+
+    Returns:
+        dict: Manager statistics plus throughput and WIP
+    """
+    return run_replication(SimConfig(overrides), seed, replication, sim_duration,
+                           (lambda context: attach(context.manager)) if attach is not None else None)
+
+
+def parameter_grid(space):
+    """
+    All combinations of a parameter space
+
+    Args:
+        space (dict): Setting name -> list of values
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def run_sweep(points, num_replications=1, seed=RANDOM_SEED, sim_duration=SIM_TIME, results_path=None):
+    """
+    Run all scenarios for a number of replications
+
+    Args:
+        points (list): Scenario overrides (e.g., from parameter_grid)
+        num_replications (int): Replications per scenario
+        seed (int): Root seed of the experiment
+        sim_duration (int): Simulation duration (unit: minutes)
+        results_path (str): JSON lines file the results are appended to (None: not saved)
+
+    Returns:
+        list: Result records {'params', 'seed', 'replication', 'kpis'}
+    """
+    records = []
+    for params in points:
+        for replication in range(num_replications):
+            kpis = run_scenario(params, seed, replication, sim_duration)
+            records.append({'params': dict(params), 'seed': seed,
+                            'replication': replication, 'kpis': kpis})
+    if results_path is not None:
+        save_results(records, results_path)
+    return records
+
+
+def save_results(records, path):
+    """Append result records to a JSON lines file"""
+    with open(path, 'a') as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+
+def load_results(path):
+    """Load result records accumulated with save_results"""
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
@@ -0,0 +1,44 @@
+import copy
+import config_SimPy
+
+
+class SimConfig:
+    """
+    Settings of one simulation run
+
+    A snapshot of the upper-case settings of config_SimPy taken at creation,
+    with scenario overrides applied. Model objects read their settings from
+    the SimConfig they are given instead of module globals, so runs with
+    different settings can execute concurrently (e.g., on a thread pool).
+    Mutable settings (routing graph, profiles) are deep-copied per snapshot.
+
+    Example:
+        config = SimConfig({'NUM_MACHINES_BUILD': 4})
+        config.NUM_MACHINES_BUILD  # 4
+    """
+
+    def __init__(self, overrides=None):
+        for name, value in vars(config_SimPy).items():
+            if name.isupper() and not callable(value):
+                setattr(self, name, copy.deepcopy(value))
+        for name, value in (overrides or {}).items():
+            if not hasattr(self, name):
+                raise KeyError(f"Unknown setting: {name}")
+            setattr(self, name, value)
+
+    def replace(self, overrides):
+        """Copy of this configuration with further overrides"""
+        config = copy.deepcopy(self)
+        for name, value in overrides.items():
+            if not hasattr(config, name):
+                raise KeyError(f"Unknown setting: {name}")
+            setattr(config, name, value)
+        return config
+
+    def num_patients_per_order(self, rng):
+        """Sample the number of patients of an order (uniform on NUM_PATIENTS_PER_ORDER_RANGE)"""
+        return int(rng.integers(*self.NUM_PATIENTS_PER_ORDER_RANGE, endpoint=True))
+
+    def num_items_per_patient(self, rng):
+        """Sample the number of items of a patient (uniform on NUM_ITEMS_PER_PATIENT_RANGE)"""
+        return int(rng.integers(*self.NUM_ITEMS_PER_PATIENT_RANGE, endpoint=True))
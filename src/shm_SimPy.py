@@ -0,0 +1,281 @@
+import math
+import queue
+import pickle
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from config_SimPy import *
+from scenario_SimPy import run_scenario
+from trace_SimPy import TraceRecorder, TRACE_DTYPE, NUM_EVENT_KINDS
+
+# KPIs stored per replication (missing KPIs are stored as NaN)
+SHARED_KPI_NAMES = (
+    'completed_items', 'completed_patients', 'completed_orders', 'tardy_orders',
+    'avg_order_makespan', 'avg_patient_makespan', 'avg_rework_loops_per_item',
+    'throughput_items_per_day', 'wip_jobs', 'defective_items',
+)
+
+# Seconds between checks that workers are still alive while waiting for results
+RESULT_POLL_INTERVAL = 1.0
+
+
+class SharedArray:
+    """
+    numpy array backed by a multiprocessing.shared_memory block
+
+    The creating process owns the block and unlinks it; other processes
+    attach by name with the small descriptor (name, shape, dtype).
+
+    Attributes:
+        shm (shared_memory.SharedMemory): Shared memory block
+        array (np.ndarray): Array view of the block (no copy)
+    """
+
+    def __init__(self, shm, shape, dtype, owner):
+        self.shm = shm
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        self.owner = owner
+
+    @classmethod
+    def create(cls, shape, dtype, fill=0):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, True)
+        shared.array[...] = fill
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor):
+        name, shape, dtype = descriptor
+        return cls(shared_memory.SharedMemory(name=name), shape, np.dtype(dtype), False)
+
+    @property
+    def descriptor(self):
+        """Small picklable description used to attach from another process"""
+        return (self.shm.name, self.array.shape, self.array.dtype.descr
+                if self.array.dtype.names else self.array.dtype.str)
+
+    def close(self):
+        # Drop the view before closing, the buffer cannot be released while exported
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedTraceRecorder(TraceRecorder):
+    """
+    TraceRecorder writing records into a preallocated array instead of a file
+
+    Records beyond the capacity are counted but dropped.
+
+    Attributes:
+        records (np.ndarray): Record array with TRACE_DTYPE (e.g., a shared memory row)
+        num_events (int): Number of records seen (may exceed the capacity)
+    """
+
+    def __init__(self, env, records, sampler=None):
+        self.env = env
+        self.records = records
+        self.processes = []
+        self.resources = []
+        self.num_events = 0
+        self.sampler = sampler
+        self.event_counts = [0] * NUM_EVENT_KINDS
+        self._registered = []
+
+    @property
+    def num_records(self):
+        return min(self.num_events, len(self.records))
+
+    def record(self, kind, process_index, resource_index, id_job, value):
+        if self.num_events < len(self.records):
+            self.records[self.num_events] = (self.env.now, kind, process_index,
+                                             resource_index, id_job, value)
+        self.num_events += 1
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Footer dict of the trace (same content as a trace file footer)"""
+        return self.footer()
+
+
+def replication_worker(tasks, results, kpi_descriptor, trace_descriptor, kpi_names,
+                       overrides, seed, sim_duration):
+    """
+    Run replications taken from a queue, writing KPIs and traces to shared memory
+
+    Only replication indices and (index, number of events, footer or error)
+    messages cross the process boundary.
+    """
+    kpis_shared = SharedArray.attach(kpi_descriptor)
+    trace_shared = SharedArray.attach(trace_descriptor) if trace_descriptor else None
+    footer_sent = False
+    try:
+        while True:
+            replication = tasks.get()
+            if replication is None:
+                break
+            recorder = None
+
+            def attach(manager):
+                nonlocal recorder
+                recorder = SharedTraceRecorder(manager.env, trace_shared.array[replication])
+                recorder.attach(manager)
+
+            try:
+                kpis = run_scenario(overrides, seed, replication, sim_duration,
+                                    attach if trace_shared is not None else None)
+                kpis_shared.array[replication] = [
+                    kpis[name] if kpis.get(name) is not None else math.nan for name in kpi_names]
+                footer = recorder.close() if recorder is not None else None
+                # The footer tables are the same for all replications; each worker
+                # sends them with its first successful replication
+                results.put((replication, recorder.num_events if recorder else 0,
+                             None if footer_sent else footer, None))
+                footer_sent = footer is not None
+            except Exception:
+                results.put((replication, 0, None, traceback.format_exc()))
+    finally:
+        kpis_shared.close()
+        if trace_shared is not None:
+            trace_shared.close()
+
+
+class SharedReplicationRunner:
+    """
+    Parallel replications aggregated through shared memory
+
+    Workers write one KPI vector per replication into a shared
+    (replications x KPIs) matrix and, optionally, their event trace into a
+    shared (replications x trace_capacity) record array. The parent reads the
+    results in place; no job lists, histories or dicts are pickled.
+
+    Attributes:
+        num_replications (int): Number of replications
+        kpi_names (tuple): KPI column names
+        trace_capacity (int): Trace records kept per replication (0: no traces)
+        kpis (np.ndarray): Shared KPI matrix (valid after run)
+        trace_counts (np.ndarray): Number of trace events per replication
+        footer (dict): Process and resource tables of the traces
+        errors (dict): Tracebacks of failed replications (or the exit codes of
+                       the workers, for replications lost with a worker process)
+        message_bytes (int): Pickled size of the result messages received from workers
+    """
+
+    def __init__(self, num_replications, overrides=None, seed=RANDOM_SEED, sim_duration=SIM_TIME,
+                 kpi_names=SHARED_KPI_NAMES, trace_capacity=0):
+        self.num_replications = num_replications
+        self.overrides = overrides or {}
+        self.seed = seed
+        self.sim_duration = sim_duration
+        self.kpi_names = tuple(kpi_names)
+        self.trace_capacity = trace_capacity
+
+        self._kpis = SharedArray.create((num_replications, len(self.kpi_names)), np.float64, math.nan)
+        self._traces = (SharedArray.create((num_replications, trace_capacity), TRACE_DTYPE)
+                        if trace_capacity else None)
+        self.trace_counts = np.zeros(num_replications, dtype=np.int64)
+        self.footer = None
+        self.errors = {}
+        self.message_bytes = 0
+
+    @property
+    def kpis(self):
+        return self._kpis.array
+
+    def run(self, num_workers=None):
+        """Run all replications on num_workers processes (default: CPU count)"""
+        context = multiprocessing.get_context()
+        tasks = context.Queue()
+        results = context.Queue()
+        num_workers = min(num_workers or multiprocessing.cpu_count(), self.num_replications)
+
+        for replication in range(self.num_replications):
+            tasks.put(replication)
+        for _ in range(num_workers):
+            tasks.put(None)
+
+        workers = [context.Process(target=replication_worker, args=(
+            tasks, results, self._kpis.descriptor,
+            self._traces.descriptor if self._traces is not None else None,
+            self.kpi_names, self.overrides, self.seed, self.sim_duration))
+            for _ in range(num_workers)]
+        for worker in workers:
+            worker.start()
+
+        pending = set(range(self.num_replications))
+        exited = False
+        while pending:
+            try:
+                message = results.get(timeout=RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                if any(worker.is_alive() for worker in workers):
+                    continue
+                if exited:
+                    break
+                # Wait once more for results posted just before the last worker exited
+                exited = True
+                continue
+            replication, num_events, footer, error = message
+            self.message_bytes += len(pickle.dumps(message))
+            pending.discard(replication)
+            self.trace_counts[replication] = num_events
+            if footer is not None and self.footer is None:
+                self.footer = footer
+            if error is not None:
+                self.errors[replication] = error
+        for replication in sorted(pending):
+            self.errors[replication] = (f"Worker exited without reporting the replication "
+                                        f"(exit codes {[worker.exitcode for worker in workers]})")
+        for worker in workers:
+            worker.join()
+        return self
+
+    def kpi(self, name):
+        """Column of one KPI across replications (view, no copy)"""
+        return self.kpis[:, self.kpi_names.index(name)]
+
+    def trace(self, replication):
+        """Trace records of one replication (view, no copy)"""
+        if self._traces is None:
+            raise ValueError("Traces were not recorded (trace_capacity=0)")
+        count = min(self.trace_counts[replication], self.trace_capacity)
+        return self._traces.array[replication, :count]
+
+    def summary(self):
+        """
+        Mean, standard deviation and 95% confidence half width of each KPI
+
+        NaN values (failed replications, undefined KPIs) are left out. The
+        half width is inf with fewer than 2 values; with none, the mean and
+        standard deviation are NaN.
+
+        Returns:
+            dict: KPI name -> {'mean', 'std', 'half_width', 'count'}
+        """
+        summary = {}
+        for index, name in enumerate(self.kpi_names):
+            values = self.kpis[:, index]
+            values = values[~np.isnan(values)]
+            count = len(values)
+            std = float(np.std(values, ddof=1)) if count > 1 else (0.0 if count else math.nan)
+            summary[name] = {'mean': float(np.mean(values)) if count else math.nan, 'std': std,
+                             'half_width': 1.96 * std / math.sqrt(count) if count > 1 else math.inf,
+                             'count': count}
+        return summary
+
+    def close(self):
+        """Release the shared memory (views returned earlier become invalid)"""
+        self._kpis.close()
+        if self._traces is not None:
+            self._traces.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,309 @@
+import math
+import multiprocessing
+import numpy as np
+from config_SimPy import *
+from scenario_SimPy import run_scenario
+from stats_SimPy import STAT_PERCENTILES
+
+# Compression of the t-digests (more centroids: more accurate quantiles)
+SKETCH_COMPRESSION = 200
+
+
+class TDigest:
+    """
+    Mergeable streaming quantile sketch (merging t-digest)
+
+    Values are buffered and periodically merged into at most about
+    compression * pi / 2 centroids. Centroids are small near both tails
+    (arcsine scale function), so p95/p99 stay accurate while the memory
+    footprint is fixed whatever the number of values. Two digests merge by
+    merging their centroids, so digests of separate replications combine into
+    the digest of all their values.
+
+    Attributes:
+        compression (float): Compression parameter (delta)
+        count (float): Number of values added
+        min, max (float): Smallest and largest value added
+        means, weights (np.ndarray): Centroids sorted by mean (after compression)
+    """
+
+    def __init__(self, compression=SKETCH_COMPRESSION):
+        self.compression = compression
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []
+        self._buffer_size = int(5 * compression)
+
+    def add(self, value):
+        """Add one value"""
+        self._buffer.append(value)
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+    def add_many(self, values):
+        """Add an array of values"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            self._compress(values, np.ones(len(values)))
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q_limit(self, q):
+        """Largest quantile a centroid starting at quantile q may reach"""
+        k = self._k(q) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compress(self, means=None, weights=None):
+        """Merge buffered values (and extra centroids) into the centroids"""
+        parts_means, parts_weights = [self.means], [self.weights]
+        if self._buffer:
+            parts_means.append(np.asarray(self._buffer, dtype=np.float64))
+            parts_weights.append(np.ones(len(self._buffer)))
+            self._buffer = []
+        if means is not None:
+            parts_means.append(means)
+            parts_weights.append(weights)
+        if len(parts_means) == 1:
+            return
+        means = np.concatenate(parts_means)
+        weights = np.concatenate(parts_weights)
+        added = slice(len(self.means), None)
+        self.count += float(weights[added].sum())
+        self.min = min(self.min, float(means[added].min()))
+        self.max = max(self.max, float(means[added].max()))
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order].tolist(), weights[order].tolist()
+        total = self.count
+        merged_means, merged_weights = [], []
+        current_mean, current_weight = means[0], weights[0]
+        weight_before = 0.0
+        q_limit = self._q_limit(0.0)
+        for mean, weight in zip(means[1:], weights[1:]):
+            if (weight_before + current_weight + weight) / total <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                weight_before += current_weight
+                q_limit = self._q_limit(weight_before / total)
+                current_mean, current_weight = mean, weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def merge(self, other):
+        """Add all values summarized by another digest"""
+        other._compress()
+        if other.count:
+            self._compress(other.means, other.weights)
+            # Extremes of the other digest may be hidden inside its centroids
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Estimated q-quantile (q in [0, 1]), NaN if empty"""
+        self._compress()
+        if not self.count:
+            return math.nan
+        if len(self.means) == 1:
+            return float(self.means[0])
+        # Centroid means at the middle of their weight, extremes at both ends; with
+        # single-value centroids this is numpy's linear interpolation of order statistics
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [self.count]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(q * (self.count - 1) + 0.5, positions, values))
+
+    def percentiles(self, percentiles=STAT_PERCENTILES):
+        return [self.quantile(percentile / 100) for percentile in percentiles]
+
+    @property
+    def num_centroids(self):
+        self._compress()
+        return len(self.means)
+
+    def to_dict(self):
+        """Plain (JSON- and pickle-friendly) representation"""
+        self._compress()
+        return {'compression': self.compression, 'count': self.count,
+                'min': self.min, 'max': self.max,
+                'means': self.means.tolist(), 'weights': self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data['compression'])
+        digest.count = data['count']
+        digest.min = data['min']
+        digest.max = data['max']
+        digest.means = np.array(data['means'], dtype=np.float64)
+        digest.weights = np.array(data['weights'], dtype=np.float64)
+        return digest
+
+
+class SketchSet:
+    """
+    Named t-digests that merge and serialize together
+
+    Attributes:
+        compression (float): Compression of new digests
+        sketches (dict): {name: TDigest}
+    """
+
+    def __init__(self, compression=SKETCH_COMPRESSION):
+        self.compression = compression
+        self.sketches = {}
+
+    def get(self, name):
+        """Digest of a name (created empty on first use)"""
+        sketch = self.sketches.get(name)
+        if sketch is None:
+            sketch = self.sketches[name] = TDigest(self.compression)
+        return sketch
+
+    def merge(self, other):
+        for name, sketch in other.sketches.items():
+            self.get(name).merge(sketch)
+        return self
+
+    def to_dict(self):
+        return {'compression': self.compression,
+                'sketches': {name: sketch.to_dict() for name, sketch in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch_set = cls(data['compression'])
+        sketch_set.sketches = {name: TDigest.from_dict(sketch)
+                               for name, sketch in data['sketches'].items()}
+        return sketch_set
+
+    def collect_statistics(self, percentiles=STAT_PERCENTILES):
+        """Flat statistics dictionary (same key style as StatisticsEngine.collect_statistics)"""
+        stats = {}
+        for name, sketch in self.sketches.items():
+            stats[f"{name}_count"] = int(sketch.count)
+            for percentile, value in zip(percentiles, sketch.percentiles(percentiles)):
+                stats[f"{name}_p{percentile}"] = value
+        return stats
+
+
+class SketchRecorder:
+    """
+    Hook subscriber keeping quantile sketches of waiting, processing and flow times
+
+    Per process (keys '<process>_waiting_time', '_processing_time',
+    '_flow_time'): one value per job step, flow being queue entry to end of
+    processing. Per order ('order_waiting_time', 'order_processing_time',
+    'order_flow_time'): the time the jobs carrying items of the order spent
+    waiting and in process, summed over their steps, and the order makespan.
+
+    Attributes:
+        sketch_set (SketchSet): Sketches of the run
+        open_orders (dict): {id_order: [waiting time, processing time]} of orders in progress
+    """
+
+    def __init__(self, compression=SKETCH_COMPRESSION):
+        self.sketch_set = SketchSet(compression)
+        self.open_orders = {}
+        self._process_sketches = {}
+
+    def attach(self, hooks):
+        """Subscribe to the hooks of a HookBus"""
+        hooks.subscribe('job_start', self.on_job_start)
+        hooks.subscribe('job_end', self.on_job_end)
+        hooks.subscribe('order_received', self.on_order_received)
+        hooks.subscribe('order_completed', self.on_order_completed)
+
+    def sketches_of(self, process):
+        sketches = self._process_sketches.get(id(process))
+        if sketches is None:
+            sketches = self._process_sketches[id(process)] = tuple(
+                self.sketch_set.get(f"{process.name_process}_{metric}")
+                for metric in ('waiting_time', 'processing_time', 'flow_time'))
+        return sketches
+
+    def on_order_received(self, order):
+        self.open_orders[order.id_order] = [0.0, 0.0]
+
+    def on_job_start(self, process, processor_resource, jobs):
+        waiting = self.sketches_of(process)[0]
+        for job in jobs:
+            waiting_time = job.time_waiting_end - job.time_waiting_start
+            waiting.add(waiting_time)
+            self.credit_orders(job, 0, waiting_time)
+
+    def on_job_end(self, process, processor_resource, jobs):
+        _, processing, flow = self.sketches_of(process)
+        for job in jobs:
+            processing_time = job.time_processing_end - job.time_processing_start
+            processing.add(processing_time)
+            flow.add(job.time_processing_end - job.time_waiting_start)
+            self.credit_orders(job, 1, processing_time)
+
+    def credit_orders(self, job, column, time):
+        for id_order in {item.id_order for item in job.list_items}:
+            totals = self.open_orders.get(id_order)
+            if totals is not None:
+                totals[column] += time
+
+    def on_order_completed(self, order):
+        waiting_time, processing_time = self.open_orders.pop(order.id_order, (0.0, 0.0))
+        self.sketch_set.get('order_waiting_time').add(waiting_time)
+        self.sketch_set.get('order_processing_time').add(processing_time)
+        self.sketch_set.get('order_flow_time').add(order.makespan)
+
+
+def sketch_replication(overrides=None, seed=RANDOM_SEED, replication=0, sim_duration=SIM_TIME,
+                       compression=SKETCH_COMPRESSION):
+    """
+    Run one replication with a SketchRecorder
+
+    Returns:
+        tuple: (KPIs, sketches as a plain dict for transfer to the parent)
+    """
+    recorder = SketchRecorder(compression)
+    kpis = run_scenario(overrides, seed, replication, sim_duration,
+                        lambda manager: recorder.attach(manager.hooks))
+    return kpis, recorder.sketch_set.to_dict()
+
+
+def _sketch_task(args):
+    return sketch_replication(*args)
+
+
+def run_sketched_replications(num_replications, overrides=None, seed=RANDOM_SEED,
+                              sim_duration=SIM_TIME, compression=SKETCH_COMPRESSION, num_workers=1):
+    """
+    Fleet-wide sketches over many replications
+
+    Each worker process sends back only its KPIs and a few kilobytes of
+    centroids per replication. Sketches are merged in replication order, so
+    the result does not depend on the number of workers.
+
+    Args:
+        num_workers (int): Worker processes (1: run in this process)
+
+    Returns:
+        tuple: (list of KPIs per replication, merged SketchSet)
+    """
+    tasks = [(overrides, seed, replication, sim_duration, compression)
+             for replication in range(num_replications)]
+    if num_workers == 1:
+        results = [_sketch_task(task) for task in tasks]
+    else:
+        with multiprocessing.get_context().Pool(num_workers) as pool:
+            results = pool.map(_sketch_task, tasks)
+
+    merged = SketchSet(compression)
+    for _, sketches in results:
+        merged.merge(SketchSet.from_dict(sketches))
+    return [kpis for kpis, _ in results], merged
@@ -1,6 +1,8 @@
-import random
 from config_SimPy import *
+from rng_SimPy import RandomStreams
+from settings_SimPy import SimConfig
 from base_Process import Process
+from rework_SimPy import ReworkPool
 from specialized_Processor import Mach_3DPrint, Mach_Wash, Mach_Dry, Worker_Inspect
 
 
@@ -10,19 +12,42 @@ class Proc_Build(Process):
     inherits from Process class  
     """
 
-    def __init__(self, env, logger=None):
-        super().__init__("Proc_Build", env, logger)
+    def __init__(self, env, logger=None, rng=None, hooks=None, name_process="Proc_Build", config=None):
+        super().__init__(name_process, env, logger, hooks)
+        config = config if config is not None else SimConfig()
+
+        # Random number stream for defect occurrence
+        self.rng = rng if rng is not None else RandomStreams().stream("proc_build")
+        # Sampling defect rates of new and reworked items
+        # (differ from DEFECT_RATE_PROC_BUILD only under importance sampling)
+        self.defect_rate = config.DEFECT_RATE_PROC_BUILD
+        self.rework_defect_rate = config.DEFECT_RATE_PROC_BUILD
+        # Number of defect draws and defects of new and reworked items (for likelihood ratios)
+        self.num_defect_draws = 0
+        self.num_defects = 0
+        self.num_rework_defect_draws = 0
+        self.num_rework_defects = 0
 
         # Initialize 3D printing machines
-        for i in range(NUM_MACHINES_BUILD):
-            self.register_processor(Mach_3DPrint(i+1))
+        for i in range(config.NUM_MACHINES_BUILD):
+            self.register_processor(Mach_3DPrint(i+1, config))
 
     def apply_special_processing(self, processor, jobs):
         """3D Printing special processing - possibility of defects"""
         for job in jobs:
+            if job.is_reprocess:
+                defect_rate = self.rework_defect_rate
+                self.num_rework_defect_draws += len(job.list_items)
+            else:
+                defect_rate = self.defect_rate
+                self.num_defect_draws += len(job.list_items)
             for item in job.list_items:
-                if random.random() < DEFECT_RATE_PROC_BUILD:
+                if self.rng.random() < defect_rate:
                     item.is_defect = True
+                    if job.is_reprocess:
+                        self.num_rework_defects += 1
+                    else:
+                        self.num_defects += 1
                 else:
                     item.is_defect = False
         return True
@@ -34,12 +59,13 @@ class Proc_Wash(Process):
     inherits from Process class   
     """
 
-    def __init__(self, env, logger=None):
-        super().__init__("Proc_Wash", env, logger)
+    def __init__(self, env, logger=None, hooks=None, name_process="Proc_Wash", config=None):
+        super().__init__(name_process, env, logger, hooks)
+        config = config if config is not None else SimConfig()
 
         # Initialize wash machines
-        for i in range(NUM_MACHINES_WASH):
-            self.register_processor(Mach_Wash(i+1))
+        for i in range(config.NUM_MACHINES_WASH):
+            self.register_processor(Mach_Wash(i+1, config))
 
 
 class Proc_Dry(Process):
@@ -48,12 +74,13 @@ class Proc_Dry(Process):
     inherits from Process class
     """
 
-    def __init__(self, env, logger=None):
-        super().__init__("Proc_Dry", env, logger)
+    def __init__(self, env, logger=None, hooks=None, name_process="Proc_Dry", config=None):
+        super().__init__(name_process, env, logger, hooks)
+        config = config if config is not None else SimConfig()
 
         # Initialize dry machines
-        for i in range(NUM_MACHINES_DRY):
-            self.register_processor(Mach_Dry(i+1))
+        for i in range(config.NUM_MACHINES_DRY):
+            self.register_processor(Mach_Dry(i+1, config))
 
 
 class Proc_Inspect(Process):
@@ -62,17 +89,20 @@ class Proc_Inspect(Process):
     inherits from Process class
     """
 
-    def __init__(self, env, manager=None, logger=None):
-        super().__init__("Proc_Inspect", env, logger)
+    def __init__(self, env, manager=None, logger=None, hooks=None, name_process="Proc_Inspect", config=None):
+        super().__init__(name_process, env, logger, hooks)
+        config = config if config is not None else SimConfig()
 
         self.manager = manager
 
         # Initialize inspection workers
-        for i in range(NUM_WORKERS_IN_INSPECT):
-            self.register_processor(Worker_Inspect(i+1))
+        for i in range(config.NUM_WORKERS_IN_INSPECT):
+            self.register_processor(Worker_Inspect(i+1, config))
 
-        # Defective items repository
-        self.defective_items = []
+        # Defective items repository (flushes aged partial batches through the manager)
+        self.defective_items = ReworkPool(
+            env, config.POLICY_NUM_DEFECT_PER_JOB, config.REWORK_MAX_AGE,
+            (lambda: manager.create_job_for_defects(self)) if manager is not None else None)
 
     def apply_special_processing(self, processor, jobs):
         """Inspection process special processing - defect identification"""
@@ -85,14 +115,18 @@ class Proc_Inspect(Process):
                     # Identify defects
                     if item.is_defect:
                         defective_items.append(item)
+                        item.num_rework += 1
                         # validation code
                         if self.logger:
                            self.logger.log_event(
                             "Defects Validation", f"Added item {item.id_item} of patient {item.id_patient} to defective items")
                 
                     else:
-                        # Mark normal items as completed
-                        item.is_completed = True
+                        # Mark normal items as completed (updates patient and order counters)
+                        if self.manager is not None:
+                            self.manager.item_completed(item)
+                        else:
+                            item.check_completion(self.env)
                         
                                 
                 # Process defective items
@@ -100,15 +134,19 @@ class Proc_Inspect(Process):
                     # Store defective items
                     self.defective_items.extend(defective_items)
 
+                    if self.hooks.defects_found:
+                        self.hooks.emit(
+                            'defects_found', self, job, defective_items)
+
                     if self.logger:
                         self.logger.log_event(
                             "Inspection", f"Found {len(defective_items)} defective items in job {job.id_job}")
                         
 
                     # Check if enough defective items to create a new job
-                    if len(self.defective_items) >= POLICY_NUM_DEFECT_PER_JOB:
+                    if len(self.defective_items) >= self.defective_items.batch_size:
                         # Create a job for the defective items
-                        self.manager.create_job_for_defects()
+                        self.manager.create_job_for_defects(self)
                 
 
 
@@ -1,26 +1,41 @@
 from base_Processor import Worker, Machine
 from config_SimPy import *
+from settings_SimPy import SimConfig
 
 
 class Worker_Inspect(Worker):
-    def __init__(self, id_worker):
+    def __init__(self, id_worker, config=None):
+        config = config if config is not None else SimConfig()
         super().__init__(
-            id_worker, f"Inspector_{id_worker}", PROC_TIME_INSPECT)
+            id_worker, f"Inspector_{id_worker}", config.PROC_TIME_INSPECT)
 
 
 class Mach_3DPrint(Machine):
-    def __init__(self, id_machine):
+    def __init__(self, id_machine, config=None):
+        config = config if config is not None else SimConfig()
         super().__init__(id_machine, "Proc_Build",
-                         f"3DPrinter_{id_machine}", PROC_TIME_BUILD, CAPACITY_MACHINE_BUILD)
+                         f"3DPrinter_{id_machine}", config.PROC_TIME_BUILD, config.CAPACITY_MACHINE_BUILD)
 
 
 class Mach_Wash(Machine):
-    def __init__(self, id_machine):
+    def __init__(self, id_machine, config=None):
+        config = config if config is not None else SimConfig()
         super().__init__(id_machine, "Proc_Wash",
-                         f"Washer_{id_machine}", PROC_TIME_WASH, CAPACITY_MACHINE_WASH)
+                         f"Washer_{id_machine}", config.PROC_TIME_WASH, config.CAPACITY_MACHINE_WASH,
+                         batch_hold_time(config.BATCH_MAX_HOLD_TIME_WASH, config))
 
 
 class Mach_Dry(Machine):
-    def __init__(self, id_machine):
+    def __init__(self, id_machine, config=None):
+        config = config if config is not None else SimConfig()
         super().__init__(id_machine, "Proc_Dry",
-                         f"Dryer_{id_machine}", PROC_TIME_DRY, CAPACITY_MACHINE_DRY)
+                         f"Dryer_{id_machine}", config.PROC_TIME_DRY, config.CAPACITY_MACHINE_DRY,
+                         batch_hold_time(config.BATCH_MAX_HOLD_TIME_DRY, config))
+
+
+def batch_hold_time(max_hold_time, config=None):
+    """Return the batch hold time for the configured batch formation policy"""
+    config = config if config is not None else SimConfig()
+    if config.POLICY_BATCH_FORMATION == "FULL_OR_TIMEOUT":
+        return max_hold_time
+    return None
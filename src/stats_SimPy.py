@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+from trace_SimPy import (read_trace, EVENT_QUEUE_PUT, EVENT_QUEUE_GET,
+                         EVENT_START, EVENT_END)
+
+
+# Percentiles reported for waiting, processing and flow times
+STAT_PERCENTILES = (50, 90, 95, 99)
+
+
+def grouped_percentiles(groups, values, percentiles=STAT_PERCENTILES, num_groups=None):
+    """
+    Percentiles of values per group in one vectorized pass
+
+    Uses linear interpolation between order statistics (numpy's default method).
+
+    Args:
+        groups (np.ndarray): Non-negative integer group of each value
+        values (np.ndarray): Values
+        percentiles (tuple): Percentiles in [0, 100]
+        num_groups (int): Number of groups (max group + 1 if None)
+
+    Returns:
+        tuple: (counts per group, array [num_groups, len(percentiles)] with NaN for empty groups)
+    """
+    if num_groups is None:
+        num_groups = int(groups.max()) + 1 if len(groups) else 0
+    counts = np.bincount(groups, minlength=num_groups)
+    result = np.full((num_groups, len(percentiles)), np.nan)
+    if len(values) == 0:
+        return counts, result
+
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    nonempty = counts > 0
+    for column, percentile in enumerate(percentiles):
+        position = starts[nonempty] + (percentile / 100) * (counts[nonempty] - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        result[nonempty, column] = (sorted_values[lower] * (1 - fraction)
+                                    + sorted_values[upper] * fraction)
+    return counts, result
+
+
+def visit_keys(records):
+    """
+    Unique key per (process, job, visit number) for each record
+
+    Records must be in time order; the n-th put, start and end of a job in a
+    process get the same key.
+    """
+    pair = (records['process'].astype(np.int64) << 32) | records['job'].astype(np.int64)
+    order = np.argsort(pair, kind='stable')
+    sorted_pair = pair[order]
+    new_group = np.concatenate(([True], sorted_pair[1:] != sorted_pair[:-1]))
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(pair)), 0))
+    visit = np.empty(len(pair), dtype=np.int64)
+    visit[order] = np.arange(len(pair)) - group_start
+    return (pair << 16) | visit
+
+
+def time_weighted_queue_stats(times, lengths, end_time, start_time=0.0):
+    """
+    Time-weighted average and maximum of a queue length step function
+
+    Args:
+        times (np.ndarray): Times of queue length changes (sorted)
+        lengths (np.ndarray): Queue length after each change
+        end_time (float): End of the observation period
+        start_time (float): Start of the observation period (queue empty before first change)
+    """
+    if len(times) == 0 or end_time <= start_time:
+        return 0.0, 0
+    durations = np.diff(np.append(times, max(end_time, times[-1])))
+    average = float(np.dot(lengths, durations)) / (end_time - start_time)
+    return average, int(lengths.max())
+
+
+class StatisticsEngine:
+    """
+    Vectorized statistics over the columnar event trace
+
+    Job steps (one row per job visit of a process) are assembled from the
+    trace with array operations only, then summarized per process and per
+    resource with grouped percentiles.
+
+    Attributes:
+        footer (dict): Trace footer with process and resource tables
+        end_time (float): End time of the recorded run
+        steps (dict): Columnar job steps {'process', 'resource', 'job', 'put', 'start', 'end'}
+        queue_events (np.ndarray): Queue put/get records
+    """
+
+    def __init__(self, records, footer):
+        self.footer = footer
+        self.end_time = footer['end_time']
+        self.steps = self.build_steps(records)
+        kinds = records['kind']
+        self.queue_events = records[(kinds == EVENT_QUEUE_PUT) | (kinds == EVENT_QUEUE_GET)]
+
+    @classmethod
+    def from_trace(cls, path):
+        records, footer = read_trace(path)
+        return cls(records, footer)
+
+    def build_steps(self, records):
+        """Match queue put, start and end records of each job visit"""
+        kinds = records['kind']
+        puts = records[kinds == EVENT_QUEUE_PUT]
+        starts = records[kinds == EVENT_START]
+        ends = records[kinds == EVENT_END]
+
+        # Completed visits: start and end records with the same visit key
+        _, start_index, end_index = np.intersect1d(
+            visit_keys(starts), visit_keys(ends), assume_unique=True, return_indices=True)
+        starts = starts[start_index]
+        ends = ends[end_index]
+
+        # Queue entry of each completed visit
+        put_time = np.full(len(starts), np.nan)
+        _, put_index, step_index = np.intersect1d(
+            visit_keys(puts), visit_keys(starts), assume_unique=True, return_indices=True)
+        put_time[step_index] = puts['time'][put_index]
+
+        return {
+            'process': starts['process'].astype(np.int64),
+            'resource': starts['resource'].astype(np.int64),
+            'job': starts['job'].astype(np.int64),
+            'put': put_time,
+            'start': starts['time'],
+            'end': ends['time'],
+        }
+
+    def step_times(self):
+        """Waiting, processing and flow (queue entry to end) time of each step"""
+        steps = self.steps
+        return {
+            'waiting_time': steps['start'] - steps['put'],
+            'processing_time': steps['end'] - steps['start'],
+            'flow_time': steps['end'] - steps['put'],
+        }
+
+    def job_flow_times(self):
+        """System flow time of each job (first queue entry to last end)"""
+        steps = self.steps
+        valid = ~np.isnan(steps['put'])
+        jobs, inverse = np.unique(steps['job'][valid], return_inverse=True)
+        first_put = np.full(len(jobs), np.inf)
+        last_end = np.full(len(jobs), -np.inf)
+        np.minimum.at(first_put, inverse, steps['put'][valid])
+        np.maximum.at(last_end, inverse, steps['end'][valid])
+        return jobs, last_end - first_put
+
+    def percentile_table(self, percentiles=STAT_PERCENTILES):
+        """
+        Percentiles of waiting, processing and flow times per process and per resource
+
+        Returns:
+            pd.DataFrame: One row per (level, name, metric)
+        """
+        process_names = [info['name'] for info in self.footer['processes']]
+        resource_names = [info['name'] for info in self.footer['resources']]
+        rows = []
+        for metric, values in self.step_times().items():
+            valid = ~np.isnan(values)
+            for level, groups, names in (
+                    ('process', self.steps['process'], process_names),
+                    ('resource', self.steps['resource'], resource_names)):
+                counts, table = grouped_percentiles(
+                    groups[valid], values[valid], percentiles, len(names))
+                sums = np.bincount(groups[valid], weights=values[valid], minlength=len(names))
+                for index, name in enumerate(names):
+                    if counts[index] == 0:
+                        continue
+                    row = {'level': level, 'name': name, 'metric': metric,
+                           'count': int(counts[index]), 'mean': sums[index] / counts[index]}
+                    for column, percentile in enumerate(percentiles):
+                        row[f'p{percentile}'] = table[index, column]
+                    rows.append(row)
+        return pd.DataFrame(rows)
+
+    def queue_statistics(self):
+        """Time-weighted average and maximum queue length per process"""
+        stats = {}
+        events = self.queue_events
+        for index, info in enumerate(self.footer['processes']):
+            mask = events['process'] == index
+            average, maximum = time_weighted_queue_stats(
+                events['time'][mask], events['value'][mask], self.end_time)
+            stats[f"{info['name']}_avg_queue_length"] = average
+            stats[f"{info['name']}_max_queue_length"] = maximum
+        return stats
+
+    def collect_statistics(self, percentiles=STAT_PERCENTILES):
+        """Flat statistics dictionary (same key style as Logger.collect_statistics)"""
+        stats = {}
+        table = self.percentile_table(percentiles)
+        for row in table.itertuples(index=False):
+            prefix = f"{row.name}_{row.metric}"
+            stats[f"{prefix}_avg"] = row.mean
+            for percentile in percentiles:
+                stats[f"{prefix}_p{percentile}"] = getattr(row, f"p{percentile}")
+        _, flow_times = self.job_flow_times()
+        if len(flow_times):
+            _, table = grouped_percentiles(
+                np.zeros(len(flow_times), dtype=np.int64), flow_times, percentiles, 1)
+            stats['job_flow_time_avg'] = float(flow_times.mean())
+            for column, percentile in enumerate(percentiles):
+                stats[f'job_flow_time_p{percentile}'] = table[0, column]
+        stats.update(self.queue_statistics())
+        return stats
@@ -0,0 +1,232 @@
+import itertools
+import numpy as np
+
+
+def records_to_arrays(records, parameters, kpi):
+    """
+    Design matrix and KPI vector from sweep records (see scenario_SimPy.run_sweep)
+
+    Records without the KPI (e.g., no completed orders for avg_order_makespan) are skipped.
+
+    Args:
+        records (list): Result records {'params', 'kpis', ...}
+        parameters (list): Setting names used as inputs
+        kpi (str): KPI name used as output
+    """
+    rows = [record for record in records if record['kpis'].get(kpi) is not None]
+    X = np.array([[record['params'][name] for name in parameters] for record in rows], dtype=float)
+    y = np.array([record['kpis'][kpi] for record in rows], dtype=float)
+    return X.reshape(len(rows), len(parameters)), y
+
+
+class Surrogate:
+    """
+    Base class of the KPI surrogates
+
+    Inputs are scaled to [0, 1] with the ranges of the training data and the
+    KPI is standardized; subclasses work on the scaled values only.
+
+    Attributes:
+        parameters (list): Setting names used as inputs
+        kpi (str): KPI name used as output
+        x_min (np.ndarray): Minimum of each input in the training data
+        x_scale (np.ndarray): Range of each input in the training data
+        y_mean (float): Mean of the KPI in the training data
+        y_std (float): Standard deviation of the KPI in the training data
+    """
+
+    def __init__(self, parameters, kpi):
+        self.parameters = list(parameters)
+        self.kpi = kpi
+        self.x_min = None
+        self.x_scale = None
+        self.y_mean = 0.0
+        self.y_std = 1.0
+
+    def fit(self, records):
+        """Fit the model to sweep records"""
+        X, y = records_to_arrays(records, self.parameters, self.kpi)
+        if len(y) == 0:
+            raise ValueError(f"No records with KPI {self.kpi}")
+        self.x_min = X.min(axis=0)
+        self.x_scale = np.where(X.max(axis=0) > self.x_min, X.max(axis=0) - self.x_min, 1.0)
+        self.y_mean = y.mean()
+        self.y_std = y.std() if y.std() > 0 else 1.0
+        self._fit_scaled(self._scale(X), (y - self.y_mean) / self.y_std)
+        return self
+
+    def predict(self, points):
+        """
+        KPI prediction with uncertainty
+
+        Args:
+            points: Scenario dicts, or an array with one column per parameter
+
+        Returns:
+            tuple: (mean, std) arrays in KPI units
+        """
+        mean, std = self._predict_scaled(self._scale(self._as_matrix(points)))
+        return self.y_mean + self.y_std * mean, self.y_std * std
+
+    def with_observations(self, points):
+        """
+        Copy of the model conditioned on extra points at their predicted means
+
+        The mean is unchanged, while the uncertainty around the points shrinks
+        as if they had been simulated (used to spread batch suggestions).
+        """
+        Z = self._scale(self._as_matrix(points))
+        mean, _ = self._predict_scaled(Z)
+        model = self._copy()
+        model._fit_scaled(np.vstack([self.Z, Z]), np.concatenate([self.t, mean]), refit=False)
+        return model
+
+    def _as_matrix(self, points):
+        if isinstance(points, dict):
+            points = [points]
+        if len(points) and isinstance(points[0], dict):
+            points = [[point[name] for name in self.parameters] for point in points]
+        return np.asarray(points, dtype=float).reshape(-1, len(self.parameters))
+
+    def _scale(self, X):
+        return (X - self.x_min) / self.x_scale
+
+    def _copy(self):
+        model = object.__new__(type(self))
+        model.__dict__.update(self.__dict__)
+        return model
+
+
+class PolynomialSurrogate(Surrogate):
+    """
+    Polynomial ridge regression surrogate
+
+    The uncertainty is the standard error of prediction of the linear model,
+    sigma * sqrt(1 + phi' A^-1 phi), with sigma estimated from the residuals.
+
+    Attributes:
+        degree (int): Maximum total degree of the monomials
+        ridge (float): Ridge penalty on the coefficients
+        coefficients (np.ndarray): Fitted coefficients
+    """
+
+    def __init__(self, parameters, kpi, degree=2, ridge=1e-3):
+        super().__init__(parameters, kpi)
+        self.degree = degree
+        self.ridge = ridge
+        self.terms = [combo for d in range(degree + 1)
+                      for combo in itertools.combinations_with_replacement(range(len(self.parameters)), d)]
+
+    def features(self, Z):
+        """Monomials of the scaled inputs, one column per term"""
+        columns = [np.prod(Z[:, list(term)], axis=1) if term else np.ones(len(Z))
+                   for term in self.terms]
+        return np.column_stack(columns)
+
+    def _fit_scaled(self, Z, t, refit=True):
+        self.Z, self.t = Z, t
+        Phi = self.features(Z)
+        A = Phi.T @ Phi + self.ridge * np.eye(Phi.shape[1])
+        self.A_inv = np.linalg.inv(A)
+        if refit:
+            self.coefficients = self.A_inv @ Phi.T @ t
+            residuals = t - Phi @ self.coefficients
+            dof = len(t) - Phi.shape[1]
+            self.sigma = np.sqrt(residuals @ residuals / dof) if dof > 0 else 1.0
+
+    def _predict_scaled(self, Z):
+        Phi = self.features(Z)
+        leverage = np.einsum('ij,jk,ik->i', Phi, self.A_inv, Phi)
+        return Phi @ self.coefficients, self.sigma * np.sqrt(1 + leverage)
+
+
+class GaussianProcessSurrogate(Surrogate):
+    """
+    Gaussian-process regression surrogate (squared exponential kernel)
+
+    The length scale and noise level are selected from a small grid by the
+    log marginal likelihood; the kernel variance is 1 on the standardized KPI.
+    The uncertainty is the posterior standard deviation of the mean KPI, so it
+    shrinks towards zero at well-replicated points.
+
+    Attributes:
+        length_scales (tuple): Candidate length scales (on inputs scaled to [0, 1])
+        noise_levels (tuple): Candidate noise variances (on the standardized KPI)
+        length_scale (float): Selected length scale
+        noise (float): Selected noise variance
+    """
+
+    def __init__(self, parameters, kpi, length_scales=(0.1, 0.2, 0.5, 1.0, 2.0),
+                 noise_levels=(1e-4, 1e-3, 1e-2, 1e-1, 0.5)):
+        super().__init__(parameters, kpi)
+        self.length_scales = length_scales
+        self.noise_levels = noise_levels
+        self.length_scale = None
+        self.noise = None
+
+    def kernel(self, Z1, Z2, length_scale):
+        sq_dist = ((Z1[:, None, :] - Z2[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * sq_dist / length_scale ** 2)
+
+    def _fit_scaled(self, Z, t, refit=True):
+        self.Z, self.t = Z, t
+        if refit:
+            best = None
+            for length_scale in self.length_scales:
+                K = self.kernel(Z, Z, length_scale)
+                for noise in self.noise_levels:
+                    factor = self._factorize(K, noise, t)
+                    if factor is None:
+                        continue
+                    L, alpha = factor
+                    # log p(t) up to a constant
+                    log_likelihood = -0.5 * t @ alpha - np.log(np.diag(L)).sum()
+                    if best is None or log_likelihood > best[0]:
+                        best = (log_likelihood, length_scale, noise)
+            _, self.length_scale, self.noise = best
+        K = self.kernel(Z, Z, self.length_scale)
+        self.L, self.alpha = self._factorize(K, self.noise, t)
+
+    def _factorize(self, K, noise, t):
+        try:
+            L = np.linalg.cholesky(K + noise * np.eye(len(K)))
+        except np.linalg.LinAlgError:
+            return None
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, t))
+        return L, alpha
+
+    def _predict_scaled(self, Z):
+        K_star = self.kernel(Z, self.Z, self.length_scale)
+        v = np.linalg.solve(self.L, K_star.T)
+        variance = np.maximum(1.0 - (v * v).sum(axis=0), 0.0)
+        return K_star @ self.alpha, np.sqrt(variance)
+
+
+def suggest_points(model, candidates, num_points=1, target=None):
+    """
+    Recommend candidate scenarios to simulate next
+
+    Without a target the most uncertain candidates are chosen. With a target
+    (e.g., a throughput requirement) candidates whose prediction interval
+    straddles the target score highest (1.96 * std - |mean - target|), so
+    simulation effort goes where it decides feasibility. Batches are built
+    greedily, conditioning the model on each chosen point.
+
+    Args:
+        model (Surrogate): Fitted surrogate
+        candidates (list): Candidate scenario dicts
+        num_points (int): Number of points to suggest
+        target (float): KPI level of interest (None: pure uncertainty reduction)
+
+    Returns:
+        list: Suggested scenario dicts
+    """
+    remaining = list(candidates)
+    chosen = []
+    while remaining and len(chosen) < num_points:
+        mean, std = model.predict(remaining)
+        score = std if target is None else 1.96 * std - np.abs(mean - target)
+        best = remaining.pop(int(np.argmax(score)))
+        chosen.append(best)
+        model = model.with_observations([best])
+    return chosen
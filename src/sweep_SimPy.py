@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import sqlite3
+import traceback
+import multiprocessing
+from config_SimPy import *
+from scenario_SimPy import run_scenario
+
+# Task states
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    scenario TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    replication INTEGER NOT NULL,
+    sim_duration REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL,
+    finished_at REAL,
+    kpis TEXT,
+    error TEXT,
+    UNIQUE (scenario, seed, replication, sim_duration)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+"""
+
+
+def scenario_key(params):
+    """Canonical text form of scenario overrides (identical scenarios map to the same task)"""
+    return json.dumps(params, sort_keys=True)
+
+
+def worker_name():
+    """Default worker name: host name and process ID"""
+    return f"{os.uname().nodename}:{os.getpid()}"
+
+
+def worker_alive(worker):
+    """
+    Check if a worker may still be running
+
+    Workers named by worker_name() on this host are looked up by process ID;
+    workers of other hosts, or with other names, are assumed alive (their
+    tasks are only requeued after a lease timeout).
+    """
+    host, _, pid = (worker or "").rpartition(":")
+    if host != os.uname().nodename or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SweepStore:
+    """
+    SQLite work queue and result store for parameter sweeps
+
+    Each task is one (scenario, seed, replication) run. The database is
+    opened in WAL mode so workers can write while others read, and results
+    are written in batches, one transaction per claimed batch. Enqueuing is
+    idempotent, so re-running a sweep only adds tasks that do not exist yet.
+
+    Attributes:
+        path (str): Database file path
+        connection (sqlite3.Connection): Connection of this process
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def transaction(self):
+        """Write transaction that takes the database write lock up front"""
+        return _Transaction(self.connection)
+
+    def add_tasks(self, points, num_replications=1, seed=RANDOM_SEED, sim_duration=SIM_TIME):
+        """
+        Enqueue runs of all scenarios (tasks that already exist are kept as they are)
+
+        Returns:
+            int: Number of tasks added
+        """
+        rows = [(scenario_key(params), seed, replication, sim_duration)
+                for params in points for replication in range(num_replications)]
+        with self.transaction():
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO tasks (scenario, seed, replication, sim_duration) VALUES (?, ?, ?, ?)",
+                rows)
+            return self.connection.total_changes - before
+
+    def recover(self, lease_timeout=None, max_attempts=3):
+        """
+        Requeue interrupted and failed tasks
+
+        A running task is requeued when its worker has died (checked for
+        workers of this host, see worker_alive) or when it was claimed more
+        than lease_timeout seconds ago, so tasks of live workers sharing the
+        database are not run twice.
+
+        Args:
+            lease_timeout (float): Requeue running tasks claimed more than this many
+                                   seconds ago (None: only tasks of dead workers)
+            max_attempts (int): Failed tasks with fewer attempts are retried
+
+        Returns:
+            int: Number of requeued tasks
+        """
+        with self.transaction():
+            before = self.connection.total_changes
+            expired = time.time() - lease_timeout if lease_timeout is not None else None
+            self.connection.executemany(
+                "UPDATE tasks SET status = ?, worker = NULL WHERE id = ?",
+                [(TASK_PENDING, task_id) for task_id, worker, claimed_at in self.connection.execute(
+                    "SELECT id, worker, claimed_at FROM tasks WHERE status = ?", (TASK_RUNNING,)).fetchall()
+                 if not worker_alive(worker) or (expired is not None and claimed_at < expired)])
+            self.connection.execute(
+                "UPDATE tasks SET status = ? WHERE status = ? AND attempts < ?",
+                (TASK_PENDING, TASK_FAILED, max_attempts))
+            return self.connection.total_changes - before
+
+    def claim(self, worker, batch_size=1):
+        """
+        Claim up to batch_size pending tasks
+
+        Returns:
+            list: (task id, scenario overrides, seed, replication, sim_duration) tuples
+        """
+        with self.transaction():
+            rows = self.connection.execute(
+                "SELECT id, scenario, seed, replication, sim_duration FROM tasks "
+                "WHERE status = ? ORDER BY id LIMIT ?", (TASK_PENDING, batch_size)).fetchall()
+            self.connection.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(TASK_RUNNING, worker, time.time(), row[0]) for row in rows])
+        return [(task_id, json.loads(scenario), seed, replication, sim_duration)
+                for task_id, scenario, seed, replication, sim_duration in rows]
+
+    def complete(self, results):
+        """
+        Store results of finished tasks in one transaction
+
+        Args:
+            results (list): (task id, KPI dict or None, error text or None) tuples
+        """
+        now = time.time()
+        with self.transaction():
+            self.connection.executemany(
+                "UPDATE tasks SET status = ?, finished_at = ?, kpis = ?, error = ? WHERE id = ?",
+                [(TASK_DONE if error is None else TASK_FAILED, now,
+                  json.dumps(kpis, default=float) if kpis is not None else None, error, task_id)
+                 for task_id, kpis, error in results])
+
+    def progress(self):
+        """Number of tasks in each state"""
+        counts = {TASK_PENDING: 0, TASK_RUNNING: 0, TASK_DONE: 0, TASK_FAILED: 0}
+        for status, count in self.connection.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def results(self):
+        """
+        Finished runs as result records (same format as scenario_SimPy.run_sweep)
+
+        Returns:
+            list: Records {'params', 'seed', 'replication', 'kpis'}
+        """
+        return [{'params': json.loads(scenario), 'seed': seed,
+                 'replication': replication, 'kpis': json.loads(kpis)}
+                for scenario, seed, replication, kpis in self.connection.execute(
+                    "SELECT scenario, seed, replication, kpis FROM tasks WHERE status = ? ORDER BY id",
+                    (TASK_DONE,))]
+
+
+class _Transaction:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+def sweep_worker(path, worker=None, batch_size=4):
+    """
+    Claim and run tasks until the queue is empty
+
+    Any number of workers (in this or other OS processes) can run on the same
+    database. Results of each claimed batch are written in one transaction.
+
+    Returns:
+        int: Number of tasks run by this worker
+    """
+    worker = worker or worker_name()
+    store = SweepStore(path)
+    num_tasks = 0
+    try:
+        while True:
+            tasks = store.claim(worker, batch_size)
+            if not tasks:
+                break
+            results = []
+            for task_id, params, seed, replication, sim_duration in tasks:
+                try:
+                    kpis = run_scenario(params, seed, replication, sim_duration)
+                    results.append((task_id, kpis, None))
+                except Exception:
+                    results.append((task_id, None, traceback.format_exc()))
+            store.complete(results)
+            num_tasks += len(tasks)
+    finally:
+        store.close()
+    return num_tasks
+
+
+def run_sweep_queue(path, points, num_replications=1, seed=RANDOM_SEED, sim_duration=SIM_TIME,
+                    num_workers=os.cpu_count(), batch_size=4, lease_timeout=None):
+    """
+    Run a sweep through the SQLite work queue with local worker processes
+
+    Re-running with the same arguments resumes an interrupted sweep: tasks
+    of workers that died are requeued and finished tasks are skipped. Tasks
+    of workers still running on the database (e.g., sweep_worker in other
+    OS processes) are left to them.
+
+    Args:
+        path (str): Database file path
+        points (list): Scenario overrides (e.g., from scenario_SimPy.parameter_grid)
+        num_replications (int): Replications per scenario
+        num_workers (int): Worker processes (0: run in this process)
+        batch_size (int): Tasks claimed (and results written) at a time
+        lease_timeout (float): Also requeue running tasks claimed more than this many
+                               seconds ago (for workers of other hosts that died)
+
+    Returns:
+        dict: Number of tasks in each state after the sweep
+    """
+    store = SweepStore(path)
+    store.add_tasks(points, num_replications, seed, sim_duration)
+    store.recover(lease_timeout)
+
+    if num_workers:
+        context = multiprocessing.get_context()
+        workers = [context.Process(target=sweep_worker, args=(path, None, batch_size))
+                   for _ in range(num_workers)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+    else:
+        sweep_worker(path, None, batch_size)
+
+    progress = store.progress()
+    store.close()
+    return progress
@@ -0,0 +1,158 @@
+import gzip
+import json
+
+# Trace-event timestamps are microseconds; one simulated minute is shown as one minute
+MICROSECONDS_PER_MINUTE = 60 * 10 ** 6
+# Process ID of the order track (simulation processes start at 1)
+ORDER_TRACK_PID = 0
+
+
+class ChromeTraceExporter:
+    """
+    Streams the simulation timeline as Chrome trace-event JSON
+
+    The file opens in chrome://tracing and in the Perfetto UI
+    (ui.perfetto.dev), which handle millions of spans. Events are written
+    while the run progresses, in buffered chunks, so memory use does not
+    grow with the run length; a path ending in .gz is written gzip-compressed.
+
+    Layout:
+        one process per simulation process, one thread per resource slot
+        (a machine of capacity 2 has two slots) with a span per job,
+        async spans per job for queue waits, a queue length counter,
+        instant events for defects found and rework jobs created, and
+        async spans per order on the "Orders" track.
+
+    Attributes:
+        env (simpy.Environment): Simulation environment
+        path (str): Output file path
+        flush_every (int): Number of buffered events before writing to file
+        num_events (int): Number of events written
+    """
+
+    def __init__(self, env, path, flush_every=16384):
+        self.env = env
+        self.path = path
+        self.flush_every = flush_every
+        self.num_events = 0
+
+        self._file = gzip.open(path, 'wt') if path.endswith('.gz') else open(path, 'w')
+        self._file.write('[')
+        self._buffer = []
+        self._pids = {}
+        self._slots = {}
+        self._num_threads = 0
+        self._running = {}
+        self._add(ph='M', pid=ORDER_TRACK_PID, name='process_name', args={'name': 'Orders'})
+
+    def attach(self, manager):
+        """Register all processes of a manager and subscribe to its hook bus"""
+        for proc in manager.get_processes().values():
+            self.register_process(proc)
+        self.subscribe(manager.hooks)
+
+    def subscribe(self, hooks):
+        """Subscribe to the hooks of a HookBus"""
+        hooks.subscribe('order_received', self.order_received)
+        hooks.subscribe('order_completed', self.order_completed)
+        hooks.subscribe('queue_put', self.queue_put)
+        hooks.subscribe('queue_get', self.queue_get)
+        hooks.subscribe('job_start', self.job_start)
+        hooks.subscribe('job_end', self.job_end)
+        hooks.subscribe('defects_found', self.defects_found)
+        hooks.subscribe('rework_created', self.rework_created)
+
+    def register_process(self, proc):
+        """Name the track of a process and the threads of its resource slots"""
+        pid = len(self._pids) + 1
+        self._pids[id(proc)] = pid
+        self._add(ph='M', pid=pid, name='process_name', args={'name': proc.name_process})
+        self._add(ph='M', pid=pid, name='process_sort_index', args={'sort_index': pid})
+        for res in proc.processor_resources.values():
+            tids = []
+            for slot in range(res.capacity):
+                self._num_threads += 1
+                tid = self._num_threads
+                name = res.name if res.capacity == 1 else f"{res.name} #{slot + 1}"
+                self._add(ph='M', pid=pid, tid=tid, name='thread_name', args={'name': name})
+                tids.append(tid)
+            # Free slot threads of the resource (None: free)
+            self._slots[id(res)] = [tids, [None] * res.capacity]
+
+    @staticmethod
+    def timestamp(time):
+        return int(round(time * MICROSECONDS_PER_MINUTE))
+
+    def _add(self, **event):
+        self._buffer.append(json.dumps(event, separators=(',', ':')))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def order_received(self, order):
+        num_items = sum(len(patient.list_items) for patient in order.list_patients)
+        self._add(ph='b', cat='order', name=f"Order {order.id_order}", id=order.id_order,
+                  pid=ORDER_TRACK_PID, ts=self.timestamp(self.env.now),
+                  args={'patients': order.num_patients, 'items': num_items})
+
+    def order_completed(self, order):
+        self._add(ph='e', cat='order', name=f"Order {order.id_order}", id=order.id_order,
+                  pid=ORDER_TRACK_PID, ts=self.timestamp(self.env.now),
+                  args={'makespan': order.makespan, 'tardiness': order.tardiness})
+
+    def queue_put(self, proc, job):
+        pid = self._pids[id(proc)]
+        now = self.timestamp(self.env.now)
+        self._add(ph='b', cat='queue', name=f"Job {job.id_job}", id=job.id_job, pid=pid, ts=now,
+                  args={'rework': job.is_reprocess})
+        self._add(ph='C', name='queue', pid=pid, ts=now, args={'jobs': proc.job_store.size})
+
+    def queue_get(self, proc, job):
+        pid = self._pids[id(proc)]
+        now = self.timestamp(self.env.now)
+        self._add(ph='e', cat='queue', name=f"Job {job.id_job}", id=job.id_job, pid=pid, ts=now)
+        self._add(ph='C', name='queue', pid=pid, ts=now, args={'jobs': proc.job_store.size})
+
+    def job_start(self, proc, processor_resource, jobs):
+        tids, occupants = self._slots[id(processor_resource)]
+        for job in jobs:
+            slot = occupants.index(None)
+            occupants[slot] = job.id_job
+            self._running[(id(processor_resource), job.id_job)] = (
+                proc, tids[slot], slot, self.env.now)
+
+    def job_end(self, proc, processor_resource, jobs):
+        occupants = self._slots[id(processor_resource)][1]
+        for job in jobs:
+            _, tid, slot, start = self._running.pop((id(processor_resource), job.id_job))
+            occupants[slot] = None
+            self._add(ph='X', cat='job', name=f"Job {job.id_job}", pid=self._pids[id(proc)], tid=tid,
+                      ts=self.timestamp(start), dur=self.timestamp(self.env.now) - self.timestamp(start),
+                      args={'items': len(job.list_items), 'rework': job.is_reprocess})
+
+    def defects_found(self, proc, job, defective_items):
+        self._add(ph='i', s='p', cat='defect', name="Defects found", pid=self._pids[id(proc)],
+                  ts=self.timestamp(self.env.now), args={'job': job.id_job, 'items': len(defective_items)})
+
+    def rework_created(self, target_proc, job):
+        self._add(ph='i', s='p', cat='rework', name="Rework job created",
+                  pid=self._pids[id(target_proc)], ts=self.timestamp(self.env.now),
+                  args={'job': job.id_job, 'items': len(job.list_items)})
+
+    def flush(self):
+        """Write buffered events to file"""
+        if self._buffer:
+            separator = ',\n' if self.num_events else '\n'
+            self._file.write(separator + ',\n'.join(self._buffer))
+            self.num_events += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """Write jobs still in process as spans up to now and complete the JSON array"""
+        for (_, id_job), (proc, tid, _, start) in self._running.items():
+            self._add(ph='X', cat='job', name=f"Job {id_job}", pid=self._pids[id(proc)], tid=tid,
+                      ts=self.timestamp(start), dur=self.timestamp(self.env.now) - self.timestamp(start),
+                      args={'unfinished': True})
+        self._running = {}
+        self.flush()
+        self._file.write('\n]\n')
+        self._file.close()
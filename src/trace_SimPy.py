@@ -0,0 +1,395 @@
+import json
+import struct
+import numpy as np
+from base_Job import Job
+from base_Processor import Machine, Worker
+
+
+# Trace file layout: MAGIC | fixed-size records | JSON footer | footer length (uint64)
+TRACE_MAGIC = b"SIMTRC01"
+
+# One record per event (20 bytes)
+TRACE_DTYPE = np.dtype([
+    ('time', '<f8'),      # Simulation time
+    ('kind', 'u1'),       # Event type (EVENT_*)
+    ('process', 'u1'),    # Process index in footer['processes']
+    ('resource', '<u2'),  # Resource index in footer['resources']
+    ('job', '<u4'),       # Job ID (order ID for EVENT_ARRIVAL)
+    ('value', '<i4'),     # Event-specific value (see below)
+])
+_RECORD = struct.Struct('<dBBHIi')
+
+# Event types and meaning of 'value'
+EVENT_ARRIVAL = 0    # Order received: number of items
+EVENT_QUEUE_PUT = 1  # Job added to queue: queue length after put
+EVENT_QUEUE_GET = 2  # Job taken from queue: queue length after get
+EVENT_START = 3      # Job started on resource: number of items
+EVENT_END = 4        # Job finished on resource: number of items
+EVENT_DEFECT = 5     # Defects found in job: number of defective items
+EVENT_REWORK = 6     # Rework job created: number of items
+NUM_EVENT_KINDS = 7
+EVENT_NAMES = ('order_arrivals', 'queue_puts', 'queue_gets', 'job_starts', 'job_ends', 'defect_findings', 'rework_jobs')
+
+NO_RESOURCE = 0xFFFF
+
+
+class TraceRecorder:
+    """
+    Records a compact binary event trace of a simulation run
+
+    Attributes:
+        env (simpy.Environment): Simulation environment
+        path (str): Output file path
+        flush_every (int): Number of buffered records before writing to file
+        processes (list): Process table [{'key', 'name', 'type'}] (type: process class, e.g. Proc_Inspect)
+        resources (list): Resource table [{'process', 'type', 'id', 'name', 'capacity', 'processing_time'}]
+        num_records (int): Number of records written
+        sampler (TraceSampler): Sampling of the run; events of jobs outside the sample
+                                (Job.traced False) are only counted (None: all jobs)
+        event_counts (list): Number of events of each kind, recorded or not
+    """
+
+    def __init__(self, env, path, flush_every=65536, sampler=None):
+        self.env = env
+        self.path = path
+        self.flush_every = flush_every
+        self.processes = []
+        self.resources = []
+        self.num_records = 0
+        self.sampler = sampler
+        self.event_counts = [0] * NUM_EVENT_KINDS
+        self._registered = []
+
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._file = open(path, 'wb')
+        self._file.write(TRACE_MAGIC)
+
+    def attach(self, manager):
+        """Register all processes of a manager and subscribe to its hook bus"""
+        for key, proc in manager.get_processes().items():
+            self.register_process(key, proc)
+        self.subscribe(manager.hooks)
+
+    def subscribe(self, hooks):
+        """Subscribe to the hooks of a HookBus"""
+        hooks.subscribe('order_received', self.order_arrival)
+        hooks.subscribe('queue_put', self.queue_put)
+        hooks.subscribe('queue_get', self.queue_get)
+        hooks.subscribe('job_start', self.job_start)
+        hooks.subscribe('job_end', self.job_end)
+        hooks.subscribe('defects_found', self.defects_found)
+        hooks.subscribe('rework_created', self.rework_created)
+
+    def register_process(self, key, proc):
+        """Register a process and its resources in the trace tables"""
+        proc.trace_index = len(self.processes)
+        self.processes.append({'key': key, 'name': proc.name_process, 'type': type(proc).__name__})
+        self._registered.append(proc)
+
+        for processor, res in zip(proc.list_processors, proc.processor_resources.values()):
+            res.trace_index = len(self.resources)
+            self.resources.append({
+                'process': proc.trace_index,
+                'type': res.processor_type,
+                'id': res.id,
+                'name': res.name,
+                'capacity': res.capacity,
+                'processing_time': processor.processing_time,
+            })
+
+    def record(self, kind, process_index, resource_index, id_job, value):
+        """Append one event record at the current simulation time"""
+        self._buffer += _RECORD.pack(
+            self.env.now, kind, process_index, resource_index, id_job, value)
+        self._buffered += 1
+        if self._buffered >= self.flush_every:
+            self.flush()
+
+    def order_arrival(self, order):
+        self.event_counts[EVENT_ARRIVAL] += 1
+        if self.sampler is None or self.sampler.keeps_order(order):
+            num_items = sum(len(patient.list_items) for patient in order.list_patients)
+            self.record(EVENT_ARRIVAL, 0, NO_RESOURCE, order.id_order, num_items)
+
+    def queue_put(self, proc, job):
+        self.event_counts[EVENT_QUEUE_PUT] += 1
+        if job.traced or self.sampler is None:
+            self.record(EVENT_QUEUE_PUT, proc.trace_index, NO_RESOURCE,
+                        job.id_job, proc.job_store.queue_length_history[-1][1])
+
+    def queue_get(self, proc, job):
+        self.event_counts[EVENT_QUEUE_GET] += 1
+        if job.traced or self.sampler is None:
+            self.record(EVENT_QUEUE_GET, proc.trace_index, NO_RESOURCE,
+                        job.id_job, proc.job_store.queue_length_history[-1][1])
+
+    def job_start(self, proc, processor_resource, jobs):
+        self.event_counts[EVENT_START] += len(jobs)
+        for job in jobs:
+            if job.traced or self.sampler is None:
+                self.record(EVENT_START, proc.trace_index, processor_resource.trace_index,
+                            job.id_job, len(job.list_items))
+
+    def job_end(self, proc, processor_resource, jobs):
+        self.event_counts[EVENT_END] += len(jobs)
+        for job in jobs:
+            if job.traced or self.sampler is None:
+                self.record(EVENT_END, proc.trace_index, processor_resource.trace_index,
+                            job.id_job, len(job.list_items))
+
+    def defects_found(self, proc, job, defective_items):
+        self.event_counts[EVENT_DEFECT] += 1
+        if job.traced or self.sampler is None:
+            self.record(EVENT_DEFECT, proc.trace_index, NO_RESOURCE,
+                        job.id_job, len(defective_items))
+
+    def rework_created(self, target_proc, job):
+        self.event_counts[EVENT_REWORK] += 1
+        if job.traced or self.sampler is None:
+            self.record(EVENT_REWORK, target_proc.trace_index, NO_RESOURCE,
+                        job.id_job, len(job.list_items))
+
+    def footer(self):
+        """
+        Name tables, record count, exact event counts and sampling of the trace
+
+        Also holds the number of defective items still waiting for rework in
+        each inspection process at the end of the run ('pending_defects'), which
+        the records cannot tell once several inspection nodes share a rework target.
+        """
+        return {
+            'num_records': self.num_records,
+            'end_time': self.env.now,
+            'processes': self.processes,
+            'resources': self.resources,
+            'event_counts': self.event_counts,
+            'sample': self.sampler.describe() if self.sampler is not None else None,
+            'pending_defects': {info['key']: len(proc.defective_items)
+                                for info, proc in zip(self.processes, self._registered)
+                                if hasattr(proc, 'defective_items')},
+        }
+
+    def flush(self):
+        """Write buffered records to file"""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self.num_records += self._buffered
+            self._buffer = bytearray()
+            self._buffered = 0
+
+    def close(self):
+        """Flush records and write the footer with the name tables"""
+        self.flush()
+        footer = json.dumps(self.footer()).encode('utf-8')
+        self._file.write(footer)
+        self._file.write(struct.pack('<Q', len(footer)))
+        self._file.close()
+
+
+def read_trace(path):
+    """
+    Read a trace file without copying the records
+
+    Returns:
+        tuple: (records as np.memmap with TRACE_DTYPE, footer dict)
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"{path} is not a simulation trace file")
+        f.seek(-8, 2)
+        footer_length = struct.unpack('<Q', f.read(8))[0]
+        f.seek(-8 - footer_length, 2)
+        footer = json.loads(f.read(footer_length).decode('utf-8'))
+
+    num_records = footer['num_records']
+    if num_records == 0:
+        return np.zeros(0, dtype=TRACE_DTYPE), footer
+    records = np.memmap(path, dtype=TRACE_DTYPE, mode='r',
+                        offset=len(TRACE_MAGIC), shape=(num_records,))
+    return records, footer
+
+
+class ReplayEnvironment:
+    """Stand-in for simpy.Environment frozen at the end time of a recorded run"""
+
+    def __init__(self, now):
+        self.now = now
+
+
+class ReplayJobStore:
+    """Queue history of a replayed process (mirrors JobStore attributes used in analysis)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.queue_length_history = []
+        self.items = []
+
+    @property
+    def is_empty(self):
+        return len(self.items) == 0
+
+    @property
+    def size(self):
+        return len(self.items)
+
+
+class ReplayResource:
+    """Processor resource of a replayed process (mirrors ProcessorResource attributes used in analysis)"""
+
+    def __init__(self, info):
+        self.processor_type = info['type']
+        self.id = info['id']
+        self.name = info['name']
+        self.capacity = info['capacity']
+        self.processing_time = info['processing_time']
+        self.batch_sizes = []
+
+
+class ReplayProcess:
+    """
+    Process rebuilt from a trace, with the attributes used by Logger statistics and visualization
+
+    Attributes:
+        name_process (str): Process identifier
+        list_processors (list): Machines or workers of the process
+        processor_resources (dict): Replayed processor resources
+        job_store (ReplayJobStore): Queue history
+        completed_jobs (list): Jobs completed in this process (in completion order)
+    """
+
+    def __init__(self, name_process):
+        self.name_process = name_process
+        self.list_processors = []
+        self.processor_resources = {}
+        self.job_store = ReplayJobStore(f"{name_process}_JobStore")
+        self.completed_jobs = []
+
+
+class TraceReplayer:
+    """
+    Rebuilds process state from a recorded trace without re-simulating
+
+    The rebuilt processes can be passed to Logger.collect_statistics and
+    Logger.visualize_statistics in place of Manager.get_processes().
+
+    A sampled trace (TRACE_SAMPLE_RATE below 1) holds the events of the
+    sampled jobs only: the rebuilt jobs, batch sizes, queue histories and
+    defective items then describe the sample, not the whole run. Exact
+    totals are kept in the footer and returned by event_totals.
+
+    Attributes:
+        records (np.ndarray): Trace records (TRACE_DTYPE)
+        footer (dict): Trace footer with name tables
+        sample (dict): Sampling of the trace {'rate', 'unit', 'salt'} (None: complete trace)
+        env (ReplayEnvironment): Environment frozen at the recorded end time
+        processes (dict): Rebuilt processes {key: ReplayProcess}
+        jobs (dict): Rebuilt jobs {id_job: Job}
+    """
+
+    def __init__(self, path):
+        self.records, self.footer = read_trace(path)
+        self.sample = self.footer['sample']
+        self.env = ReplayEnvironment(self.footer['end_time'])
+        self.processes = {}
+        self.jobs = {}
+        self.rebuild()
+
+    def rebuild(self):
+        """Rebuild processes, queue histories and jobs from the records"""
+        records = self.records
+        proc_list = []
+        for info in self.footer['processes']:
+            proc = ReplayProcess(info['name'])
+            self.processes[info['key']] = proc
+            proc_list.append(proc)
+
+        res_list = []
+        for info in self.footer['resources']:
+            proc = proc_list[info['process']]
+            res = ReplayResource(info)
+            if info['type'] == "Machine":
+                proc.list_processors.append(Machine(
+                    info['id'], proc.name_process, info['name'],
+                    info['processing_time'], info['capacity']))
+                proc.processor_resources[f"Machine_{info['id']}"] = res
+            else:
+                proc.list_processors.append(Worker(
+                    info['id'], info['name'], info['processing_time']))
+                proc.processor_resources[f"Worker_{info['id']}"] = res
+            res_list.append(res)
+
+        # Queue histories (vectorized per process)
+        kinds = records['kind']
+        is_queue = (kinds == EVENT_QUEUE_PUT) | (kinds == EVENT_QUEUE_GET)
+        for index, proc in enumerate(proc_list):
+            mask = is_queue & (records['process'] == index)
+            proc.job_store.queue_length_history = list(zip(
+                records['time'][mask].tolist(), records['value'][mask].tolist()))
+
+        # Job state (only job-related events are visited)
+        job_events = records[(kinds != EVENT_ARRIVAL) & (kinds != EVENT_QUEUE_GET) & (kinds != EVENT_DEFECT)]
+        last_batch = (None, None)
+        for time, kind, p, r, id_job, value in job_events.tolist():
+            job = self.jobs.get(id_job)
+            if job is None:
+                job = Job(id_job, [])
+                self.jobs[id_job] = job
+            proc = proc_list[p]
+
+            if kind == EVENT_QUEUE_PUT:
+                job.time_waiting_start = time
+                job.workstation["Process"] = proc.name_process
+            elif kind == EVENT_START:
+                res = res_list[r]
+                if len(job.list_items) != value:
+                    job.list_items = [None] * value
+                job.time_waiting_end = time
+                job.time_processing_start = time
+                job.workstation[res.processor_type] = res.id
+                job.processing_history.append({
+                    'process': proc.name_process,
+                    'resource_type': res.processor_type,
+                    'resource_id': res.id,
+                    'resource_name': res.name,
+                    'start_time': time,
+                    'end_time': None,
+                    'duration': None
+                })
+                # Jobs started together on one resource form one batch
+                if last_batch == (r, time):
+                    res.batch_sizes[-1] += 1
+                else:
+                    res.batch_sizes.append(1)
+                    last_batch = (r, time)
+            elif kind == EVENT_END:
+                job.time_processing_end = time
+                for step in job.processing_history:
+                    if step['process'] == proc.name_process and step['end_time'] is None:
+                        step['end_time'] = time
+                        step['duration'] = time - step['start_time']
+                proc.completed_jobs.append(job)
+            elif kind == EVENT_REWORK:
+                job.is_reprocess = True
+                job.list_items = [None] * value
+
+        # Defective items still waiting for rework in each inspection node of the
+        # routing graph (item identities are not recorded)
+        for info in self.footer['processes']:
+            if info['type'] == "Proc_Inspect":
+                self.processes[info['key']].defective_items = (
+                    [None] * self.footer['pending_defects'].get(info['key'], 0))
+
+    def event_totals(self):
+        """
+        Number of events of each kind in the recorded run (exact for sampled traces too)
+
+        Returns:
+            dict: Event name (EVENT_NAMES) -> count
+        """
+        return dict(zip(EVENT_NAMES, self.footer['event_counts']))
+
+    def order_arrivals(self):
+        """Return (time, id_order, num_items) arrays of received orders"""
+        arrivals = self.records[self.records['kind'] == EVENT_ARRIVAL]
+        return arrivals['time'], arrivals['job'], arrivals['value']
@@ -0,0 +1,108 @@
+import math
+import numpy as np
+from config_SimPy import *
+
+# Distribution types of PROC_TIME_DISTRIBUTIONS
+DISTRIBUTION_TYPES = ("LOGNORMAL", "GAMMA", "EMPIRICAL")
+# Mean processing time setting of each process type
+PROC_TIME_SETTINGS = {
+    "Proc_Build": "PROC_TIME_BUILD",
+    "Proc_Wash": "PROC_TIME_WASH",
+    "Proc_Dry": "PROC_TIME_DRY",
+    "Proc_Inspect": "PROC_TIME_INSPECT",
+}
+
+
+class VariateBuffer:
+    """
+    Random variates drawn in blocks and handed out one at a time
+
+    A numpy call costs about as much for a few thousand variates as for one,
+    so the buffer samples a whole block at once and the simulation only pays
+    a list lookup per draw.
+
+    Attributes:
+        sampler (callable): sampler(rng, size) -> np.ndarray of variates
+        rng (np.random.Generator): Random number stream of the buffer
+        block_size (int): Number of variates sampled per refill
+        num_refills (int): Number of blocks sampled so far
+    """
+
+    def __init__(self, sampler, rng, block_size=VARIATE_BLOCK_SIZE):
+        self.sampler = sampler
+        self.rng = rng
+        self.block_size = block_size
+        self.num_refills = 0
+        self._values = []
+        self._next = 0
+
+    def next(self):
+        """Next variate"""
+        if self._next >= len(self._values):
+            self.refill()
+        value = self._values[self._next]
+        self._next += 1
+        return value
+
+    def refill(self):
+        self._values = self.sampler(self.rng, self.block_size).tolist()
+        self._next = 0
+        self.num_refills += 1
+
+
+def make_sampler(spec, mean):
+    """
+    Block sampler of a processing time distribution
+
+    Args:
+        spec (dict): {'type': 'LOGNORMAL' or 'GAMMA', 'cv': coefficient of variation}
+                     or {'type': 'EMPIRICAL', 'samples': observed times} or
+                     {'type': 'EMPIRICAL', 'path': text/CSV file with one observed time per line}
+        mean (float): Mean processing time of LOGNORMAL and GAMMA (unit: minutes)
+
+    Returns:
+        callable: sampler(rng, size) -> np.ndarray
+    """
+    dist_type = spec.get('type')
+    if dist_type == "LOGNORMAL":
+        sigma = math.sqrt(math.log(1 + spec['cv'] ** 2))
+        mu = math.log(mean) - sigma ** 2 / 2
+        return lambda rng, size: rng.lognormal(mu, sigma, size)
+    if dist_type == "GAMMA":
+        shape = 1 / spec['cv'] ** 2
+        scale = mean / shape
+        return lambda rng, size: rng.gamma(shape, scale, size)
+    if dist_type == "EMPIRICAL":
+        if 'samples' in spec:
+            samples = np.asarray(spec['samples'], dtype=np.float64)
+        else:
+            samples = np.loadtxt(spec['path'], delimiter=',', ndmin=1)
+        if len(samples) == 0 or np.any(samples < 0):
+            raise ValueError("Empirical processing times must be non-empty and non-negative")
+        return lambda rng, size: samples[rng.integers(0, len(samples), size)]
+    raise ValueError(f"Unknown processing time distribution: {dist_type} "
+                     f"(expected one of {DISTRIBUTION_TYPES})")
+
+
+def attach_processing_times(process, process_type, node, streams, config):
+    """
+    Give each processor of a process its own buffer of processing times
+
+    Processes whose type is not in PROC_TIME_DISTRIBUTIONS keep the constant
+    processing time. Each processor draws from its own stream, so adding or
+    removing machines does not shift the draws of the others.
+
+    Args:
+        process (Process): Process of a routing graph node
+        process_type (str): Process type of the node
+        node (str): Routing graph node name
+        streams (RandomStreams): Random number streams of the replication
+        config (SimConfig): Settings of the run
+    """
+    spec = config.PROC_TIME_DISTRIBUTIONS.get(process_type)
+    if spec is None:
+        return
+    sampler = make_sampler(spec, getattr(config, PROC_TIME_SETTINGS[process_type]))
+    for resource in process.processor_resources.values():
+        resource.processing_time_variates = VariateBuffer(
+            sampler, streams.stream(f"proc_time_{node}_{resource.name}"), config.VARIATE_BLOCK_SIZE)